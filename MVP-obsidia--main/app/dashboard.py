@@ -28,8 +28,8 @@ if str(Path(__file__).parent.parent) not in sys.path:
 
 from app.config import BASE_DIR, BUILD_VERSION, BUILD_HASH
 from app.database import (
-    init_database, create_run, complete_run, save_features, save_simulation,
-    save_decision, save_intent, get_all_runs, get_statistics, get_run,
+    init_database, create_run, complete_run, persist_stage, stage_hash,
+    get_all_runs, get_statistics, get_run,
     get_features, get_simulation, get_decision, get_intent
 )
 from app.auth import (
@@ -113,6 +113,15 @@ def init_session_state():
 
 init_session_state()
 
+
+def persist_once(stage: str, payload: dict) -> None:
+    """Sauvegarde une étape du run courant sans doublon entre les reruns."""
+    key = (st.session_state["run_id"], stage, stage_hash(payload))
+    persisted = st.session_state.setdefault("persisted_stages", set())
+    if key not in persisted:
+        persist_stage(key[0], stage, payload, content_hash=key[2])
+        persisted.add(key)
+
 # ============================================================
 # SIDEBAR NAVIGATION
 # ============================================================
@@ -341,7 +350,7 @@ def page_analyse():
         st.session_state["pipeline_status"]["simulation"] = "pending"
         
         # Sauvegarder dans la base de données
-        save_features(st.session_state["run_id"], st.session_state["features"])
+        persist_once("features", st.session_state["features"])
         
         st.success("✅ Analyse complétée et sauvegardée ! Vous pouvez passer à la Simulation.")
         if st.button("➡️ Passer à la Simulation", type="primary"):
@@ -397,7 +406,7 @@ def page_simulation():
         st.session_state["pipeline_status"]["decision"] = "pending"
         
         # Sauvegarder dans la base de données
-        save_simulation(st.session_state["run_id"], st.session_state["simulation"])
+        persist_once("simulation", st.session_state["simulation"])
         
         st.success("✅ Simulation complétée et sauvegardée ! Vous pouvez passer à la Décision.")
         if st.button("➡️ Passer à la Décision", type="primary"):
@@ -451,7 +460,7 @@ def page_decision():
         gates_result = st.session_state["gates_result"]
         
         # Sauvegarder dans la base de données
-        save_decision(st.session_state["run_id"], gates_result)
+        persist_once("decision", gates_result)
         
         # Mettre à jour le status
         st.session_state["pipeline_status"]["decision"] = "completed"
@@ -462,7 +471,7 @@ def page_decision():
             user = get_current_user()
             if user and st.session_state.get("intent_emitted"):
                 # Sauvegarder l'intent
-                save_intent(st.session_state["run_id"], st.session_state["intent_emitted"])
+                persist_once("intent", st.session_state["intent_emitted"])
                 
                 # Envoyer notification
                 notify_execute_decision(
@@ -2,23 +2,166 @@
 Module de base de données pour Obsidia
 ======================================
 Gestion de l'historique des runs, utilisateurs et artefacts.
+
+Toutes les fonctions passent par le ConnectionManager (_db) : une connexion
+par thread, journal WAL. Chemin de la base : OBSIDIA_DB_PATH ou data/obsidia.db.
 """
+import os
 import sqlite3
 import json
 import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 import pandas as pd
 
-DB_PATH = Path(__file__).parent.parent / "data" / "obsidia.db"
+DB_PATH = Path(os.environ.get("OBSIDIA_DB_PATH", Path(__file__).parent.parent / "data" / "obsidia.db"))
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
+# ============================================================
+# CONNEXIONS
+# ============================================================
+
+class ConnectionManager:
+    """Connexions SQLite réutilisables, une par thread.
+
+    Chaque thread (session Streamlit, worker) garde sa connexion ouverte au
+    lieu d'un connect/close par requête. La base passe en WAL : les lectures
+    ne bloquent plus l'écrivain, et les écrivains concurrents attendent
+    jusqu'à `busy_timeout` au lieu d'échouer sur "database is locked".
+    """
+
+    PRAGMAS = {
+        "synchronous": "NORMAL",   # sûr en WAL, un fsync par checkpoint
+        "cache_size": -16000,      # 16 Mo de cache de pages
+        "temp_store": "MEMORY",
+    }
+
+    def __init__(self, db_path: Path, busy_timeout: float = 10.0, begin_retries: int = 3):
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self.begin_retries = begin_retries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: Dict[threading.Thread, sqlite3.Connection] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        # autocommit : les transactions sont ouvertes explicitement par transaction()
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant (ouverte au premier appel)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                # Streamlit crée un thread par exécution du script : on ferme
+                # les connexions des threads terminés
+                for t in [t for t in self._conns if not t.is_alive()]:
+                    self._conns.pop(t).close()
+                self._conns[threading.current_thread()] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE ... COMMIT (ROLLBACK en cas d'exception)."""
+        conn = self.connection()
+        for attempt in range(self.begin_retries + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == self.begin_retries:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close_all(self) -> None:
+        """Ferme toutes les connexions (tests, changement de DB_PATH)."""
+        with self._lock:
+            conns, self._conns = self._conns, {}
+        for conn in conns.values():
+            conn.close()
+        self._local = threading.local()
+
+
+_db = ConnectionManager(DB_PATH)
+
+
+def get_connection() -> sqlite3.Connection:
+    """Connexion SQLite du thread courant."""
+    return _db.connection()
+
+
+def transaction():
+    """Transaction d'écriture sur la connexion du thread courant."""
+    return _db.transaction()
+
+
 def init_database():
     """Initialise la base de données avec les tables nécessaires."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with transaction() as conn:
+        _create_schema(conn.cursor())
+        migrate(conn)
+
+
+# Migrations du schéma, appliquées dans l'ordre ; PRAGMA user_version = nombre
+# de migrations déjà appliquées. Ne jamais modifier une entrée existante.
+MIGRATIONS: List[List[str]] = [
+    # v1 : index secondaires des requêtes chaudes
+    [
+        "CREATE INDEX IF NOT EXISTS idx_features_run_id ON features(run_id)",
+        "CREATE INDEX IF NOT EXISTS idx_simulations_run_id ON simulations(run_id)",
+        "CREATE INDEX IF NOT EXISTS idx_decisions_run_id ON decisions(run_id)",
+        "CREATE INDEX IF NOT EXISTS idx_intents_run_id ON intents(run_id)",
+        "CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id, is_read)",
+        "CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at)",
+        "CREATE INDEX IF NOT EXISTS idx_runs_user_started ON runs(user_id, started_at)",
+        "CREATE INDEX IF NOT EXISTS idx_runs_final_decision ON runs(final_decision)",
+    ],
+    # v2 : étapes déjà persistées, voir persist_stage()
+    [
+        """
+        CREATE TABLE IF NOT EXISTS stage_writes (
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            persisted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, stage, content_hash)
+        ) WITHOUT ROWID
+        """,
+    ],
+]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Applique les migrations manquantes, retourne la version du schéma."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for v in range(version, len(MIGRATIONS)):
+        for stmt in MIGRATIONS[v]:
+            conn.execute(stmt)
+        conn.execute(f"PRAGMA user_version = {v + 1}")
+    return max(version, len(MIGRATIONS))
+
+
+def _create_schema(cursor: sqlite3.Cursor):
     
     # Table des utilisateurs
     cursor.execute("""
@@ -138,9 +281,6 @@ def init_database():
         INSERT OR IGNORE INTO users (username, email, password_hash, role)
         VALUES (?, ?, ?, ?)
     """, ("admin", "admin@obsidia.local", admin_hash, "admin"))
-    
-    conn.commit()
-    conn.close()
 
 
 # ============================================================
@@ -149,7 +289,7 @@ def init_database():
 
 def create_user(username: str, email: str, password: str, role: str = "user") -> bool:
     """Crée un nouvel utilisateur."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     password_hash = hashlib.sha256(password.encode()).hexdigest()
@@ -159,17 +299,14 @@ def create_user(username: str, email: str, password: str, role: str = "user") ->
             INSERT INTO users (username, email, password_hash, role)
             VALUES (?, ?, ?, ?)
         """, (username, email, password_hash, role))
-        conn.commit()
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 
 def authenticate_user(username: str, password: str) -> Optional[Dict]:
     """Authentifie un utilisateur et retourne ses infos."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     password_hash = hashlib.sha256(password.encode()).hexdigest()
@@ -187,9 +324,7 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
         cursor.execute("""
             UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
         """, (result[0],))
-        conn.commit()
         
-        conn.close()
         return {
             "id": result[0],
             "username": result[1],
@@ -198,13 +333,12 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
             "created_at": result[4]
         }
     
-    conn.close()
     return None
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict]:
     """Récupère un utilisateur par son ID."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -213,7 +347,6 @@ def get_user_by_id(user_id: int) -> Optional[Dict]:
     """, (user_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -229,7 +362,7 @@ def get_user_by_id(user_id: int) -> Optional[Dict]:
 
 def get_all_users() -> List[Dict]:
     """Récupère tous les utilisateurs."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -238,7 +371,6 @@ def get_all_users() -> List[Dict]:
     """)
     
     results = cursor.fetchall()
-    conn.close()
     
     return [
         {
@@ -258,43 +390,43 @@ def get_all_users() -> List[Dict]:
 # FONCTIONS RUNS
 # ============================================================
 
+_INSERT_RUN = """
+    INSERT INTO runs (run_id, user_id, domain, seed, tau)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_COMPLETE_RUN = """
+    UPDATE runs 
+    SET status = 'completed', completed_at = CURRENT_TIMESTAMP, final_decision = ?
+    WHERE run_id = ?
+"""
+
+
 def create_run(run_id: str, user_id: Optional[int], domain: str, seed: int, tau: float) -> bool:
     """Crée un nouveau run."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            INSERT INTO runs (run_id, user_id, domain, seed, tau)
-            VALUES (?, ?, ?, ?, ?)
-        """, (run_id, user_id, domain, seed, tau))
-        conn.commit()
+        cursor.execute(_INSERT_RUN, (run_id, user_id, domain, seed, tau))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 
 def complete_run(run_id: str, final_decision: str) -> bool:
     """Marque un run comme complété."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        UPDATE runs 
-        SET status = 'completed', completed_at = CURRENT_TIMESTAMP, final_decision = ?
-        WHERE run_id = ?
-    """, (final_decision, run_id))
+    cursor.execute(_COMPLETE_RUN, (final_decision, run_id))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_run(run_id: str) -> Optional[Dict]:
     """Récupère un run par son ID."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -305,7 +437,6 @@ def get_run(run_id: str) -> Optional[Dict]:
     """, (run_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -326,7 +457,7 @@ def get_run(run_id: str) -> Optional[Dict]:
 
 def get_user_runs(user_id: int, limit: int = 50) -> List[Dict]:
     """Récupère les runs d'un utilisateur."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -338,7 +469,6 @@ def get_user_runs(user_id: int, limit: int = 50) -> List[Dict]:
     """, (user_id, limit))
     
     results = cursor.fetchall()
-    conn.close()
     
     return [
         {
@@ -357,7 +487,7 @@ def get_user_runs(user_id: int, limit: int = 50) -> List[Dict]:
 
 def get_all_runs(limit: int = 100) -> pd.DataFrame:
     """Récupère tous les runs sous forme de DataFrame."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     
     query = """
         SELECT 
@@ -377,7 +507,6 @@ def get_all_runs(limit: int = 100) -> pd.DataFrame:
     """
     
     df = pd.read_sql_query(query, conn, params=(limit,))
-    conn.close()
     
     return df
 
@@ -386,30 +515,35 @@ def get_all_runs(limit: int = 100) -> pd.DataFrame:
 # FONCTIONS FEATURES
 # ============================================================
 
-def save_features(run_id: str, features: Dict[str, Any]) -> bool:
-    """Sauvegarde les features d'un run."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO features (run_id, volatility, coherence, friction, regime)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
+_INSERT_FEATURES = """
+    INSERT INTO features (run_id, volatility, coherence, friction, regime)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _features_row(run_id: str, features: Dict[str, Any]) -> tuple:
+    return (
         run_id,
         features.get("volatility"),
         features.get("coherence"),
         features.get("friction"),
         features.get("regime")
-    ))
+    )
+
+
+def save_features(run_id: str, features: Dict[str, Any]) -> bool:
+    """Sauvegarde les features d'un run."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute(_INSERT_FEATURES, _features_row(run_id, features))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_features(run_id: str) -> Optional[Dict]:
     """Récupère les features d'un run."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -418,7 +552,6 @@ def get_features(run_id: str) -> Optional[Dict]:
     """, (run_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -435,16 +568,15 @@ def get_features(run_id: str) -> Optional[Dict]:
 # FONCTIONS SIMULATIONS
 # ============================================================
 
-def save_simulation(run_id: str, sim_result: Dict[str, Any]) -> bool:
-    """Sauvegarde les résultats de simulation."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO simulations 
-        (run_id, mu, sigma, p_ruin, p_dd, cvar_95, verdict, n_sims, horizon)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+_INSERT_SIMULATION = """
+    INSERT INTO simulations 
+    (run_id, mu, sigma, p_ruin, p_dd, cvar_95, verdict, n_sims, horizon)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _simulation_row(run_id: str, sim_result: Dict[str, Any]) -> tuple:
+    return (
         run_id,
         sim_result.get("mu"),
         sim_result.get("sigma"),
@@ -454,16 +586,22 @@ def save_simulation(run_id: str, sim_result: Dict[str, Any]) -> bool:
         sim_result.get("verdict"),
         sim_result.get("n_sims"),
         sim_result.get("horizon")
-    ))
+    )
+
+
+def save_simulation(run_id: str, sim_result: Dict[str, Any]) -> bool:
+    """Sauvegarde les résultats de simulation."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute(_INSERT_SIMULATION, _simulation_row(run_id, sim_result))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_simulation(run_id: str) -> Optional[Dict]:
     """Récupère les résultats de simulation d'un run."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -472,7 +610,6 @@ def get_simulation(run_id: str) -> Optional[Dict]:
     """, (run_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -493,21 +630,19 @@ def get_simulation(run_id: str) -> Optional[Dict]:
 # FONCTIONS DÉCISIONS
 # ============================================================
 
-def save_decision(run_id: str, gates_result: Dict[str, Any]) -> bool:
-    """Sauvegarde la décision des gates."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+_INSERT_DECISION = """
+    INSERT INTO decisions 
+    (run_id, gate1_ok, gate1_reason, gate2_ok, gate2_reason, 
+     gate3_ok, gate3_reason, final_decision, decision_reason)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _decision_row(run_id: str, gates_result: Dict[str, Any]) -> tuple:
     gate1 = gates_result.get("gate1", {})
     gate2 = gates_result.get("gate2", {})
     gate3 = gates_result.get("gate3", {})
-    
-    cursor.execute("""
-        INSERT INTO decisions 
-        (run_id, gate1_ok, gate1_reason, gate2_ok, gate2_reason, 
-         gate3_ok, gate3_reason, final_decision, decision_reason)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    return (
         run_id,
         gate1.get("ok"),
         gate1.get("reason"),
@@ -517,16 +652,22 @@ def save_decision(run_id: str, gates_result: Dict[str, Any]) -> bool:
         gate3.get("reason"),
         gates_result.get("decision"),
         gates_result.get("reason")
-    ))
+    )
+
+
+def save_decision(run_id: str, gates_result: Dict[str, Any]) -> bool:
+    """Sauvegarde la décision des gates."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute(_INSERT_DECISION, _decision_row(run_id, gates_result))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_decision(run_id: str) -> Optional[Dict]:
     """Récupère la décision d'un run."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -536,7 +677,6 @@ def get_decision(run_id: str) -> Optional[Dict]:
     """, (run_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -554,15 +694,14 @@ def get_decision(run_id: str) -> Optional[Dict]:
 # FONCTIONS INTENTS
 # ============================================================
 
-def save_intent(run_id: str, intent: Dict[str, Any]) -> bool:
-    """Sauvegarde un intent ERC-8004."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO intents (run_id, asset, side, amount, irreversible, timestamp, metadata)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
+_INSERT_INTENT = """
+    INSERT INTO intents (run_id, asset, side, amount, irreversible, timestamp, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _intent_row(run_id: str, intent: Dict[str, Any]) -> tuple:
+    return (
         run_id,
         intent.get("asset"),
         intent.get("side"),
@@ -570,16 +709,22 @@ def save_intent(run_id: str, intent: Dict[str, Any]) -> bool:
         intent.get("irreversible"),
         intent.get("timestamp"),
         json.dumps(intent.get("metadata", {}))
-    ))
+    )
+
+
+def save_intent(run_id: str, intent: Dict[str, Any]) -> bool:
+    """Sauvegarde un intent ERC-8004."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute(_INSERT_INTENT, _intent_row(run_id, intent))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_intent(run_id: str) -> Optional[Dict]:
     """Récupère l'intent d'un run."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -588,7 +733,6 @@ def get_intent(run_id: str) -> Optional[Dict]:
     """, (run_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
@@ -603,13 +747,127 @@ def get_intent(run_id: str) -> Optional[Dict]:
     return None
 
 
+# ============================================================
+# ENREGISTREMENT GROUPÉ (UNIT OF WORK)
+# ============================================================
+
+class RunRecorder:
+    """Accumule toutes les étapes d'un run et les écrit en une transaction.
+
+    Remplace la suite create_run / save_* / complete_run (un commit, donc
+    un fsync, par appel) :
+
+        rec = RunRecorder(run_id, user_id, "trading", seed, tau)
+        rec.features(features).simulation(sim).decision(gates).intent(intent)
+        rec.complete("EXECUTE")
+        rec.commit()
+    """
+
+    def __init__(self, run_id: str, user_id: Optional[int], domain: str, seed: int, tau: float):
+        self.run_id = run_id
+        self.run_row = (run_id, user_id, domain, seed, tau)
+        self.rows: Dict[str, List[tuple]] = {"features": [], "simulations": [], "decisions": [], "intents": []}
+        self.final_decision: Optional[str] = None
+
+    def features(self, features: Dict[str, Any]) -> "RunRecorder":
+        self.rows["features"].append(_features_row(self.run_id, features))
+        return self
+
+    def simulation(self, sim_result: Dict[str, Any]) -> "RunRecorder":
+        self.rows["simulations"].append(_simulation_row(self.run_id, sim_result))
+        return self
+
+    def decision(self, gates_result: Dict[str, Any]) -> "RunRecorder":
+        self.rows["decisions"].append(_decision_row(self.run_id, gates_result))
+        return self
+
+    def intent(self, intent: Dict[str, Any]) -> "RunRecorder":
+        self.rows["intents"].append(_intent_row(self.run_id, intent))
+        return self
+
+    def complete(self, final_decision: str) -> "RunRecorder":
+        self.final_decision = final_decision
+        return self
+
+    def commit(self) -> bool:
+        """Écrit le run ; False (rien n'est écrit) si le run_id existe déjà."""
+        try:
+            import_runs([self])
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+
+_STAGE_INSERTS = {
+    "features": _INSERT_FEATURES,
+    "simulations": _INSERT_SIMULATION,
+    "decisions": _INSERT_DECISION,
+    "intents": _INSERT_INTENT,
+}
+
+
+def import_runs(recorders: Iterable[RunRecorder]) -> int:
+    """Import en masse (backtests) : un executemany par table, une seule transaction.
+
+    Tout ou rien : sqlite3.IntegrityError si un run_id existe déjà.
+    """
+    recorders = list(recorders)
+    with transaction() as conn:
+        conn.executemany(_INSERT_RUN, [r.run_row for r in recorders])
+        for table, sql in _STAGE_INSERTS.items():
+            rows = [row for r in recorders for row in r.rows[table]]
+            if rows:
+                conn.executemany(sql, rows)
+        completed = [(r.final_decision, r.run_id) for r in recorders if r.final_decision is not None]
+        if completed:
+            conn.executemany(_COMPLETE_RUN, completed)
+    return len(recorders)
+
+
+# ============================================================
+# PERSISTANCE IDEMPOTENTE DES ÉTAPES
+# ============================================================
+
+_STAGES = {
+    "features": (_INSERT_FEATURES, _features_row),
+    "simulation": (_INSERT_SIMULATION, _simulation_row),
+    "decision": (_INSERT_DECISION, _decision_row),
+    "intent": (_INSERT_INTENT, _intent_row),
+}
+
+
+def stage_hash(payload: Dict[str, Any]) -> str:
+    """Empreinte du contenu d'une étape (clés triées)."""
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def persist_stage(run_id: str, stage: str, payload: Dict[str, Any], content_hash: Optional[str] = None) -> bool:
+    """Sauvegarde une étape une seule fois par (run_id, stage, content_hash).
+
+    Retourne True si la ligne a été écrite, False si ce contenu était déjà
+    persisté pour ce run (rerun Streamlit, double clic...).
+    """
+    sql, make_row = _STAGES[stage]
+    content_hash = content_hash or stage_hash(payload)
+    with transaction() as conn:
+        cur = conn.execute("""
+            INSERT INTO stage_writes (run_id, stage, content_hash) VALUES (?, ?, ?)
+            ON CONFLICT (run_id, stage, content_hash) DO NOTHING
+        """, (run_id, stage, content_hash))
+        if cur.rowcount == 0:
+            return False
+        conn.execute(sql, make_row(run_id, payload))
+    return True
+
+
 # ============================================================
 # FONCTIONS NOTIFICATIONS
 # ============================================================
 
 def create_notification(user_id: int, run_id: str, notif_type: str, message: str) -> bool:
     """Crée une notification pour un utilisateur."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -617,14 +875,12 @@ def create_notification(user_id: int, run_id: str, notif_type: str, message: str
         VALUES (?, ?, ?, ?)
     """, (user_id, run_id, notif_type, message))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_notifications(user_id: int, unread_only: bool = False) -> List[Dict]:
     """Récupère les notifications d'un utilisateur."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     query = """
@@ -641,7 +897,6 @@ def get_notifications(user_id: int, unread_only: bool = False) -> List[Dict]:
     
     cursor.execute(query, (user_id,))
     results = cursor.fetchall()
-    conn.close()
     
     return [
         {
@@ -659,21 +914,19 @@ def get_notifications(user_id: int, unread_only: bool = False) -> List[Dict]:
 
 def mark_notification_read(notification_id: int) -> bool:
     """Marque une notification comme lue."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
         UPDATE notifications SET is_read = 1 WHERE id = ?
     """, (notification_id,))
     
-    conn.commit()
-    conn.close()
     return True
 
 
 def get_unread_count(user_id: int) -> int:
     """Compte les notifications non lues."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -681,7 +934,6 @@ def get_unread_count(user_id: int) -> int:
     """, (user_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     return result[0] if result else 0
 
@@ -692,7 +944,7 @@ def get_unread_count(user_id: int) -> int:
 
 def get_statistics() -> Dict[str, Any]:
     """Récupère les statistiques globales."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     stats = {}
@@ -714,10 +966,10 @@ def get_statistics() -> Dict[str, Any]:
     """)
     stats["decisions"] = {row[0]: row[1] for row in cursor.fetchall()}
     
-    # Runs aujourd'hui
+    # Runs aujourd'hui (plage sur started_at : utilise idx_runs_started_at)
     cursor.execute("""
         SELECT COUNT(*) FROM runs 
-        WHERE date(started_at) = date('now')
+        WHERE started_at >= date('now') AND started_at < date('now', '+1 day')
     """)
     stats["runs_today"] = cursor.fetchone()[0]
     
@@ -735,7 +987,6 @@ def get_statistics() -> Dict[str, Any]:
         "final_decision": result[2]
     } if result else None
     
-    conn.close()
     return stats
 
 
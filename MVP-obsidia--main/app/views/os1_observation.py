@@ -5,6 +5,7 @@ import numpy as np
 from pathlib import Path
 
 from src.core_pipeline import run_observation
+from src.data import load_price_series
 from src.score.human_algebra import features_summary
 from src.visualization import plot_market_with_decision, plot_features_radar
 from src.explainer import explain_features_realtime
@@ -41,7 +42,8 @@ def render(base_dir: Path, config: dict):
     @st.cache_data(show_spinner=False)
     def load_market_data(domain: str, seed: int):
         if data_path.exists() and domain == "Trading (ERC-8004)":
-            return pd.read_csv(data_path)
+            # cache binaire .npy mappé en mémoire (src/data.py), pas de re-parse du CSV
+            return load_price_series(data_path).to_frame()
         else:
             return generate_domain_specific_data(domain, seed)
     
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrence SQLite
+===============================
+N sessions (threads) enregistrent des runs complets en parallèle
+(run + features + simulation + décision + intent), d'abord avec une
+connexion par requête (ancien schéma, journal DELETE), puis via le
+ConnectionManager de app/database.py (connexion par thread, WAL), puis avec
+RunRecorder (une transaction par run) ; enfin import_runs en masse.
+
+Usage: python bench_database.py --sessions 8 --runs 50
+La base de test est créée dans un répertoire temporaire.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+FEATURES = {"volatility": 0.012, "coherence": 0.71, "friction": 0.1, "regime": "calme"}
+SIM = {"mu": 0.002, "sigma": 0.03, "p_ruin": 0.01, "p_dd": 0.1, "cvar_95": -0.05,
+       "verdict": "OK", "n_sims": 200, "horizon": 20}
+GATES = {"gate1": {"ok": True, "reason": "ok"}, "gate2": {"ok": True, "reason": "ok"},
+         "gate3": {"ok": True, "reason": "ok"}, "decision": "ALLOW", "reason": "ok"}
+INTENT = {"asset": "BTC", "side": "BUY", "amount": 0.15, "irreversible": True,
+          "timestamp": 0.0, "metadata": {"score": 0.4}}
+
+
+def record_run(db, run_id: str):
+    db.create_run(run_id, 1, "trading", 42, 10.0)
+    db.save_features(run_id, FEATURES)
+    db.save_simulation(run_id, SIM)
+    db.save_decision(run_id, GATES)
+    db.save_intent(run_id, INTENT)
+    db.complete_run(run_id, "ALLOW")
+
+
+def recorder(db, run_id: str):
+    rec = db.RunRecorder(run_id, 1, "trading", 42, 10.0)
+    rec.features(FEATURES).simulation(SIM).decision(GATES).intent(INTENT)
+    return rec.complete("ALLOW")
+
+
+def record_run_uow(db, run_id: str):
+    recorder(db, run_id).commit()
+
+
+class ConnectPerCall:
+    """Ancien comportement : une connexion neuve par requête, journal DELETE."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+
+    def connection(self) -> sqlite3.Connection:
+        # fermée par le ramasse-miettes à la sortie de la fonction appelante
+        return sqlite3.connect(self.db_path, isolation_level=None)
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def run_sessions(db, sessions: int, runs: int, prefix: str, record=record_run):
+    errors = []
+
+    def session(i):
+        try:
+            for k in range(runs):
+                record(db, f"{prefix}-{i}-{k}")
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, errors
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--runs", type=int, default=50, help="runs par session")
+    ap.add_argument("--bulk", type=int, default=5000, help="runs importés en une fois")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["OBSIDIA_DB_PATH"] = str(Path(tmp) / "bench.db")
+        sys.path.insert(0, str(Path(__file__).parent))
+        from app import database as db
+
+        total = args.sessions * args.runs
+        pooled = db._db
+        db._db = ConnectPerCall(Path(tmp) / "legacy.db")
+        db.init_database()
+        dt, errors = run_sessions(db, args.sessions, args.runs, "legacy")
+        print(f"connexion par requête: {total / dt:8,.0f} runs/sec  ({dt:.2f}s, {len(errors)} erreurs 'locked')")
+
+        db._db = pooled
+        dt, errors = run_sessions(db, args.sessions, args.runs, "pooled")
+        print(f"connexion par thread : {total / dt:8,.0f} runs/sec  ({dt:.2f}s, {len(errors)} erreurs 'locked')")
+
+        dt, errors = run_sessions(db, args.sessions, args.runs, "uow", record=record_run_uow)
+        print(f"RunRecorder          : {total / dt:8,.0f} runs/sec  ({dt:.2f}s, {len(errors)} erreurs 'locked')")
+
+        recs = [recorder(db, f"bulk-{k}") for k in range(args.bulk)]
+        t0 = time.perf_counter()
+        db.import_runs(recs)
+        dt = time.perf_counter() - t0
+        print(f"import_runs (bulk)   : {args.bulk / dt:8,.0f} runs/sec  ({args.bulk} runs, 1 transaction)")
+        pooled.close_all()
+
+if __name__ == "__main__":
+    main()
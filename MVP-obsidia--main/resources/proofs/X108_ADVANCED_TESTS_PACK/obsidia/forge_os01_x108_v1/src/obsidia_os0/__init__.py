@@ -1,2 +1,2 @@
-__all__ = ["ir","contract","sandbox","translate","determinism"]
+__all__ = ["ir","contract","sandbox","compiled","translate","determinism"]
 __version__ = "0.3.0"
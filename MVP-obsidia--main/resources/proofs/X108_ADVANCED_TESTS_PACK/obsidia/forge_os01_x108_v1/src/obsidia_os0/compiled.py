@@ -0,0 +1,234 @@
+from __future__ import annotations
+import operator
+from typing import Any, Callable, Dict, List
+from . import ir
+from .sandbox import Sandbox, _call_detail, _fresh, _needs_copy
+
+# ===== Exécution compilée (même sémantique que Sandbox._exec/_eval) =====
+# Le programme IR est abaissé une fois en fermetures Python fn(sb) ; la
+# dispatch par type de nœud et par opérateur se fait à la compilation via des
+# tables. État, log (selon sb.log_level) et codes ERROR (R2/R4/R6/R8/R10)
+# sont identiques à Sandbox, y compris l'instant où l'erreur est levée : un
+# nœud hors alphabet ne lève R10 qu'à son exécution. Un nœud mal formé
+# (ex. READ sans STATE) est délégué à l'interpréteur de référence.
+
+Op = Callable[[Sandbox], Any]
+
+_BINOPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "==": operator.eq, "!=": operator.ne,
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv,
+}
+
+# ----- expressions -----
+
+def _e_value(x: ir.VALUE) -> Op:
+    v = x.v
+    if not _needs_copy(v):
+        return lambda sb: v
+    return lambda sb: _fresh(v)
+
+def _e_read(x: ir.READ) -> Op:
+    name = x.state.name
+    def read(sb):
+        st = sb.state
+        if name not in st:
+            raise ir.ERROR(f"READ vide: {name}", code="R2")
+        return st[name]
+    return read
+
+def _e_tuple(x: tuple) -> Op:
+    op, a, b = x
+    ea, eb = compile_expr(a), compile_expr(b)
+    try:
+        f = _BINOPS.get(op)
+    except TypeError:  # opérateur non hashable: inconnu
+        f = None
+    if f is None:
+        # opérandes évalués puis expression rendue telle quelle (cf. _eval)
+        def unknown(sb):
+            ea(sb); eb(sb)
+            return x
+        return unknown
+    if isinstance(b, ir.VALUE) and not _needs_copy(b.v):
+        bv = b.v
+        return lambda sb: f(ea(sb), bv)
+    return lambda sb: f(ea(sb), eb(sb))
+
+_EXPR = {ir.VALUE: _e_value, ir.READ: _e_read}
+
+def compile_expr(x: Any) -> Op:
+    for cls in type(x).__mro__:
+        c = _EXPR.get(cls)
+        if c is not None:
+            return _guard(c, x, Sandbox._eval)
+    if isinstance(x, tuple) and len(x) == 3:
+        return _guard(_e_tuple, x, Sandbox._eval)
+    if callable(x):
+        return lambda sb: x(sb.state)
+    return lambda sb: x
+
+# ----- instructions -----
+
+def _block(nodes: List[Any]) -> Op:
+    ops = [compile_node(n) for n in nodes]
+    if len(ops) == 1:
+        return ops[0]
+    def block(sb):
+        out = None
+        for o in ops:
+            out = o(sb)
+        return out
+    return block
+
+def _s_time(node: ir.TIME) -> Op:
+    kind = type(node).__name__
+    t = node.t
+    def time_(sb):
+        if t < sb.time:
+            raise ir.ERROR(f"TIME désordonné: {t} < {sb.time}", code="R8")
+        sb.time = t
+        sb._log(kind, "time={}", sb.time)
+    return time_
+
+def _s_event(node: ir.EVENT) -> Op:
+    kind = type(node).__name__
+    name, t, payload = node.name, node.t, node.payload
+    return lambda sb: sb._log(kind, "event={} t={} payload={!r}", name, t, payload)
+
+def _s_state(node: ir.STATE) -> Op:
+    kind = type(node).__name__
+    name = node.name
+    def state(sb):
+        if name not in sb.state:
+            sb.state[name] = None
+        sb._log(kind, "declare {}", name)
+    return state
+
+def _s_write(node: ir.WRITE) -> Op:
+    kind = type(node).__name__
+    name = node.state.name
+    ev = compile_expr(node.value)
+    def write(sb):
+        val = ev(sb)
+        sb.state[name] = val
+        sb._log(kind, "{}={!r}", name, val)
+    return write
+
+def _s_read(node: ir.READ) -> Op:
+    kind = type(node).__name__
+    name = node.state.name
+    ev = compile_expr(node)
+    def read(sb):
+        val = ev(sb)
+        sb._log(kind, "{} -> {!r}", name, val)
+        return ir.VALUE(val)
+    return read
+
+def _s_flow(node: ir.FLOW) -> Op:
+    ops = [compile_node(s) for s in node.steps]
+    def flow(sb):
+        out = None
+        for o in ops:
+            out = o(sb)
+        return out
+    return flow
+
+def _s_cond(node: ir.COND) -> Op:
+    kind = type(node).__name__
+    ev = compile_expr(node.expr)
+    def cond(sb):
+        res = bool(ev(sb))
+        sb._log(kind, "cond={}", res)
+        return res
+    return cond
+
+def _s_loop(node: ir.LOOP) -> Op:
+    kind = type(node).__name__
+    cond = compile_node(node.cond)
+    body = [compile_node(s) for s in node.body]
+    max_iters = node.max_iters
+    def loop(sb):
+        it = 0
+        while True:
+            if it >= max_iters:
+                raise ir.ERROR("LOOP sans sortie (max_iters atteint)", code="R6")
+            it += 1
+            if not bool(cond(sb)):
+                sb._log(kind, "loop_exit iters={}", it)
+                return None
+            for o in body:
+                o(sb)
+    return loop
+
+def _s_call(node: ir.CALL) -> Op:
+    kind = type(node).__name__
+    fn = node.fn
+    args = [compile_expr(a) for a in node.args]
+    def call(sb):
+        if fn not in sb.calls:
+            raise ir.ERROR(f"CALL inconnu: {fn}", code="R4")
+        vals = [a(sb) for a in args]
+        sb._log(kind, _call_detail, fn, *vals)
+        try:
+            ret = sb.calls[fn](*vals)
+        except Exception as e:
+            raise ir.ERROR(f"CALL error: {e}", code="R4")
+        return ir.RETURN(ir.VALUE(ret))
+    return call
+
+def _s_return(node: ir.RETURN) -> Op:
+    kind = type(node).__name__
+    value = node.value
+    def return_(sb):
+        sb._log(kind, "return {!r}", value)
+        return value
+    return return_
+
+_NODES = {
+    ir.TIME: _s_time, ir.EVENT: _s_event, ir.STATE: _s_state, ir.WRITE: _s_write,
+    ir.READ: _s_read, ir.FLOW: _s_flow, ir.COND: _s_cond, ir.LOOP: _s_loop,
+    ir.CALL: _s_call, ir.RETURN: _s_return,
+}
+
+def _guard(compiler: Callable[[Any], Op], node: Any, fallback: Callable[[Sandbox, Any], Any]) -> Op:
+    # nœud mal formé: l'interpréteur de référence lève la même erreur, au même moment
+    try:
+        return compiler(node)
+    except Exception:
+        return lambda sb: fallback(sb, node)
+
+def compile_node(node: Any) -> Op:
+    if isinstance(node, list):
+        return _block(node)
+    for cls in type(node).__mro__:
+        c = _NODES.get(cls)
+        if c is not None:
+            return _guard(c, node, Sandbox._exec)
+    name = type(node).__name__
+    def outside(sb):
+        raise ir.ERROR(f"Hors-alphabet: {name}", code="R10")
+    return outside
+
+class CompiledProgram:
+    """Programme IR compilé, réutilisable sur plusieurs sandboxes."""
+
+    __slots__ = ("program", "_fn")
+
+    def __init__(self, program: Any):
+        self.program = program
+        self._fn = compile_node(program)
+
+    def run(self, sb: Sandbox) -> Any:
+        return self._fn(sb)
+
+def compile_program(program: Any) -> CompiledProgram:
+    return CompiledProgram(program)
+
+class CompiledSandbox(Sandbox):
+    """Sandbox exécutant le programme compilé (cf. compile_program)."""
+
+    def run(self, program: Any) -> Any:
+        if not isinstance(program, CompiledProgram):
+            program = compile_program(program)
+        return program.run(self)
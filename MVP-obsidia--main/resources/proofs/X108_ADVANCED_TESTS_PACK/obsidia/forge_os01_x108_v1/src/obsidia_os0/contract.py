@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from . import ir
 
 # ===== L2.5 Contract rules R1-R10 (validator) =====
@@ -8,7 +8,8 @@ from . import ir
 
 Violation = Tuple[str, str]  # (Rule, message)
 
-def validate(program: Any) -> List[Violation]:
+def validate_reference(program: Any) -> List[Violation]:
+    # validateur récursif d'origine (référence des tests)
     v: List[Violation] = []
     _walk(program, v)
     return v
@@ -66,3 +67,113 @@ def _walk(node: Any, v: List[Violation]):
     elif isinstance(node, ir.COND):
         # expr may be callable or tuple; can't validate deeper safely
         pass
+
+# ===== Validateur itératif =====
+# Même règles et même ordre de violations que _walk (parcours préfixe), avec
+# une pile explicite (pas de limite de récursion) et une table type -> (règles,
+# enfants) construite une fois.
+
+_ALLOWED = (
+    ir.VALUE, ir.STATE, ir.READ, ir.WRITE, ir.FLOW, ir.COND, ir.LOOP,
+    ir.CALL, ir.RETURN, ir.EVENT, ir.TIME
+)
+
+def _rules_read(node: Any, v: List[Violation]):
+    if not isinstance(node.state, ir.STATE):
+        v.append(("R1", "READ doit viser un STATE"))
+
+def _rules_write(node: Any, v: List[Violation]):
+    if not isinstance(node.state, ir.STATE):
+        v.append(("R1", "WRITE doit viser un STATE"))
+
+def _rules_loop(node: Any, v: List[Violation]):
+    if not isinstance(node.cond, ir.COND):
+        v.append(("R5", "LOOP doit utiliser COND"))
+    if node.max_iters is None or node.max_iters <= 0:
+        v.append(("R6", "LOOP doit avoir max_iters > 0"))
+
+def _rules_event(node: Any, v: List[Violation]):
+    if node.t is None:
+        v.append(("R7", f"EVENT '{node.name}' sans timestamp"))
+
+def _kids_write(node: Any) -> List[Any]:
+    return [node.value] if isinstance(node.value, _ALLOWED) else []
+
+def _kids_call(node: Any) -> List[Any]:
+    return [a for a in node.args if isinstance(a, (_ALLOWED, list))]
+
+_RULES: Dict[type, Tuple[Optional[Callable], Optional[Callable]]] = {
+    ir.VALUE: (None, None),
+    ir.STATE: (None, None),
+    ir.READ: (_rules_read, None),
+    ir.WRITE: (_rules_write, _kids_write),
+    ir.FLOW: (None, lambda n: list(n.steps)),
+    ir.COND: (None, None),  # expr callable ou tuple: non validée
+    ir.LOOP: (_rules_loop, lambda n: [n.cond, *n.body]),
+    ir.CALL: (None, _kids_call),
+    ir.RETURN: (None, None),
+    ir.EVENT: (_rules_event, None),
+    ir.TIME: (None, None),
+}
+_dispatch_cache: Dict[type, Any] = {}
+
+def _dispatch(cls: type):
+    try:
+        return _dispatch_cache[cls]
+    except KeyError:
+        entry = next((_RULES[c] for c in cls.__mro__ if c in _RULES), None)
+        _dispatch_cache[cls] = entry
+        return entry
+
+class _Exit:
+    # marqueur de fin de sous-arbre (enregistrement dans le memo)
+    __slots__ = ("node", "start")
+
+    def __init__(self, node: Any, start: int):
+        self.node = node
+        self.start = start
+
+ValidationMemo = Dict[int, Tuple[Any, Tuple[Violation, ...]]]
+
+def validate(program: Any, first: bool = False, memo: Optional[ValidationMemo] = None) -> List[Violation]:
+    """Violations du programme, dans l'ordre de validate_reference.
+
+    first=True: s'arrête à la première violation (admission).
+    memo: dict id(nœud) -> (nœud, violations du sous-arbre), rempli et relu
+    d'un appel à l'autre : un sous-arbre partagé n'est validé qu'une fois.
+    Le memo suppose que l'IR n'est pas modifié en place tant qu'il sert.
+    """
+    v: List[Violation] = []
+    stack: List[Any] = [program]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        node = pop()
+        cls = type(node)
+        if cls is _Exit:
+            memo[id(node.node)] = (node.node, tuple(v[node.start:]))
+            continue
+        if isinstance(node, list):
+            extend(reversed(node))
+            continue
+        entry = _dispatch_cache.get(cls) or _dispatch(cls)
+        if entry is None:
+            v.append(("R10", f"Hors-alphabet: {cls.__name__}"))
+            if first:
+                return v
+            continue
+        if memo is not None:
+            hit = memo.get(id(node))
+            if hit is not None and hit[0] is node:
+                v.extend(hit[1])
+                if first and v:
+                    return v[:1]
+                continue
+            stack.append(_Exit(node, len(v)))
+        rules, kids = entry
+        if rules is not None:
+            rules(node, v)
+            if first and v:
+                return v[:1]
+        if kids is not None:
+            extend(reversed(kids(node)))
+    return v
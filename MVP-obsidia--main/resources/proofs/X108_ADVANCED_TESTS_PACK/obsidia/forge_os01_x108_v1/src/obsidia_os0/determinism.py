@@ -1,20 +1,177 @@
 from __future__ import annotations
-import json, hashlib
-from dataclasses import is_dataclass, asdict
-from typing import Any
+import copy, json, hashlib, weakref
+from dataclasses import is_dataclass, asdict, fields
+from json.encoder import encode_basestring
+from typing import Any, Dict, List, Optional, Tuple
 
-def _to_primitive(x: Any):
+try:
+    import orjson  # optional accelerator, see _dumps_canonical
+except ImportError:
+    orjson = None
+
+def _to_primitive(x: Any, floats: Optional[List[float]] = None):
+    # floats (optional) collects every float seen, for the orjson format check
     if is_dataclass(x):
-        return {"__type__": x.__class__.__name__, **{k:_to_primitive(v) for k,v in asdict(x).items()}}
+        return {"__type__": x.__class__.__name__, **{k:_to_primitive(v, floats) for k,v in asdict(x).items()}}
     if isinstance(x, (list, tuple)):
-        return [_to_primitive(i) for i in x]
+        return [_to_primitive(i, floats) for i in x]
     if isinstance(x, dict):
-        return {str(k): _to_primitive(v) for k,v in sorted(x.items(), key=lambda kv: str(kv[0]))}
+        return {str(k): _to_primitive(v, floats) for k,v in sorted(x.items(), key=lambda kv: str(kv[0]))}
     if isinstance(x, (str,int,float,bool)) or x is None:
+        if floats is not None and isinstance(x, float):
+            floats.append(x)
         return x
     return {"__repr__": repr(x)}
 
-def canonical_hash(ir_program: Any) -> str:
-    prim=_to_primitive(ir_program)
+def _orjson_floats_ok(floats: List[float]) -> bool:
+    # orjson writes 1e-05 as 0.00001, 1e+16 as 1e16 and NaN/inf as null;
+    # stdlib (the canonical form) only uses exponents outside [1e-4, 1e16).
+    return all(type(f) is float and (f == 0.0 or 1e-4 <= abs(f) < 1e16) for f in floats)
+
+def _dumps_canonical(prim: Any, floats_ok: bool = False) -> bytes:
+    # byte-identical to json.dumps(sort_keys, compact, ensure_ascii=False)
+    if orjson is not None and floats_ok:
+        try:
+            return orjson.dumps(prim, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # int > 64 bits, lone surrogate, ...
     blob=json.dumps(prim, ensure_ascii=False, sort_keys=True, separators=(",",":"))
-    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+    return blob.encode("utf-8")
+
+def canonical_hash_reference(ir_program: Any) -> str:
+    # implémentation de référence: arbre primitif complet puis JSON
+    floats: List[float] = []
+    prim=_to_primitive(ir_program, floats)
+    return hashlib.sha256(_dumps_canonical(prim, _orjson_floats_ok(floats))).hexdigest()
+
+# ===== Hash canonique en flux =====
+# Un seul parcours de l'IR écrit directement le JSON canonique (celui de
+# canonical_hash_reference) dans sha256, sans arbre primitif intermédiaire.
+# Sémantique de _to_primitive reproduite: un dataclass porte "__type__" sauf
+# sous un autre dataclass (asdict aplatit les dataclasses imbriqués), un objet
+# inconnu devient {"__repr__": repr(x)} (repr d'une copie sous un dataclass,
+# comme asdict).
+#
+# Memo de Merkle: le fragment JSON d'un nœud IR dont tout le sous-arbre est
+# immuable (dataclasses frozen, tuples, scalaires) est mémorisé par identité
+# (weakref): un sous-arbre inchangé n'est jamais ré-encodé. Les nœuds
+# contenant une liste (FLOW, LOOP, CALL) restent parcourus, la liste pouvant
+# muter, mais leurs enfants immuables viennent du memo.
+
+_FLUSH_PARTS = 4096
+_MEMO_MAX = 1 << 16
+_memo: Dict[Tuple[int, bool], Tuple[weakref.ref, str]] = {}
+
+def _float(x: float) -> str:
+    if x != x: return "NaN"
+    if x == float("inf"): return "Infinity"
+    if x == -float("inf"): return "-Infinity"
+    return float.__repr__(x)
+
+_dc_info: Dict[type, Tuple[Tuple[str, ...], bool]] = {}
+
+def _dataclass_info(cls: type) -> Tuple[Tuple[str, ...], bool]:
+    # (noms des champs, frozen) par classe
+    info = _dc_info.get(cls)
+    if info is None:
+        info = _dc_info[cls] = (tuple(f.name for f in fields(cls)), bool(cls.__dataclass_params__.frozen))
+    return info
+
+class _Encoder:
+    # node() écrit le fragment JSON de x et renvoie True si son sous-arbre
+    # est immuable (donc mémorisable)
+    __slots__ = ("h", "parts", "memo", "hold")
+
+    def __init__(self, memo: bool = True):
+        self.h = hashlib.sha256()
+        self.parts: List[str] = []
+        self.memo = memo
+        self.hold = 0  # > 0: un fragment est en cours de mémorisation, pas de flush
+
+    def flush(self):
+        self.h.update("".join(self.parts).encode("utf-8"))
+        self.parts.clear()
+
+    def node(self, x: Any, in_dc: bool) -> bool:
+        p = self.parts
+        if x is None: p.append("null"); return True
+        if x is True: p.append("true"); return True
+        if x is False: p.append("false"); return True
+        if isinstance(x, str): p.append(encode_basestring(x)); return True
+        if isinstance(x, int): p.append(int.__repr__(x)); return True
+        if isinstance(x, float): p.append(_float(x)); return True
+        if is_dataclass(x) and not isinstance(x, type):
+            imm = self.dataclass(x, in_dc)
+        elif isinstance(x, (list, tuple)):
+            imm = isinstance(x, tuple)
+            p.append("[")
+            for i, item in enumerate(x):
+                if i: p.append(",")
+                imm = self.node(item, in_dc) and imm
+            p.append("]")
+        elif isinstance(x, dict):
+            items = {str(k): v for k, v in sorted(x.items(), key=lambda kv: str(kv[0]))}
+            self.mapping(items, in_dc); imm = False
+        elif in_dc:
+            self.mapping({"__repr__": repr(copy.deepcopy(x))}, in_dc); imm = False
+        elif isinstance(x, type) and is_dataclass(x):
+            asdict(x)  # TypeError, comme _to_primitive
+        else:
+            self.mapping({"__repr__": repr(x)}, in_dc); imm = False
+        if not self.hold and len(p) > _FLUSH_PARTS:
+            self.flush()
+        return imm
+
+    def mapping(self, items: Dict[str, Any], in_dc: bool) -> bool:
+        p = self.parts
+        p.append("{")
+        imm = True
+        for i, k in enumerate(sorted(items)):
+            if i: p.append(",")
+            p.append(encode_basestring(k)); p.append(":")
+            imm = self.node(items[k], in_dc) and imm
+        p.append("}")
+        return imm
+
+    def dataclass(self, x: Any, in_dc: bool) -> bool:
+        names, frozen = _dataclass_info(type(x))
+        items = {k: getattr(x, k) for k in names}
+        # candidat au memo: frozen, sans liste/dict en champ direct, et pas
+        # déjà dans un fragment en cours (seul le sous-arbre le plus haut est gardé)
+        candidate = (self.memo and not self.hold and frozen
+                     and not any(isinstance(v, (list, dict)) for v in items.values()))
+        if candidate:
+            key = (id(x), in_dc)
+            hit = _memo.get(key)
+            if hit is not None and hit[0]() is x:
+                self.parts.append(hit[1])
+                return True
+        if not in_dc:
+            items["__type__"] = x.__class__.__name__
+        if not candidate:
+            return self.mapping(items, True) and frozen
+        start = len(self.parts)
+        self.hold += 1
+        imm = self.mapping(items, True)
+        self.hold -= 1
+        if imm:
+            frag = "".join(self.parts[start:])
+            del self.parts[start:]
+            self.parts.append(frag)
+            try:
+                ref = weakref.ref(x, lambda _, key=key: _memo.pop(key, None))
+            except TypeError:
+                return imm
+            if len(_memo) >= _MEMO_MAX:
+                _memo.clear()
+            _memo[key] = (ref, frag)
+        return imm
+
+    def hexdigest(self) -> str:
+        self.flush()
+        return self.h.hexdigest()
+
+def canonical_hash(ir_program: Any, memo: bool = True) -> str:
+    enc = _Encoder(memo)
+    enc.node(ir_program, False)
+    return enc.hexdigest()
@@ -1,32 +1,131 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import copy
+from collections import Counter, deque
 from typing import Any, Dict, List, Callable, Optional, Tuple
 from . import ir
 
-@dataclass
+# ===== Niveaux de log d'exécution =====
+# off        : aucun enregistrement (seul le compteur de pas avance)
+# counters   : nombre de nœuds exécutés par type (self.counts)
+# structured : counters + ExecLog dont le détail est formaté à la lecture ;
+#              les arguments contenant un conteneur mutable sont copiés
+#              (deepcopy) à l'enregistrement, le détail lu est donc celui de
+#              full (valeurs à l'instant du pas) ; une valeur non copiable est
+#              formatée immédiatement. Les autres objets sont supposés non
+#              modifiés après le pas.
+# full       : counters + ExecLog au détail formaté immédiatement (audit)
+# log_capacity borne self.log (ring buffer: seuls les N derniers pas restent).
+LOG_LEVELS = ("off", "counters", "structured", "full")
+
 class ExecLog:
-    step: int
-    node: str
-    detail: str
+    __slots__ = ("step", "node", "_detail", "_args")
+
+    def __init__(self, step: int, node: str, detail: Any = "", args: Optional[Tuple] = None):
+        # args != None: detail est un format (str.format ou callable) appliqué à la lecture
+        self.step = step
+        self.node = node
+        self._detail = detail
+        self._args = args
+
+    @property
+    def detail(self) -> str:
+        if self._args is not None:
+            fmt, args = self._detail, self._args
+            self._detail = fmt(*args) if callable(fmt) else fmt.format(*args)
+            self._args = None
+        return self._detail
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ExecLog):
+            return NotImplemented
+        return (self.step, self.node, self.detail) == (other.step, other.node, other.detail)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ExecLog(step={self.step!r}, node={self.node!r}, detail={self.detail!r})"
+
+# Seuls les conteneurs mutables (list, dict, set, bytearray, y compris dans un
+# tuple/frozenset) d'un payload VALUE sont copiés à chaque lecture : l'IR
+# (éventuellement mis en cache par OS1) reste inchangé quand l'état retourné
+# est modifié par l'appelant. Scalaires, tuples d'immuables et autres objets
+# sont partagés sans allocation ; un objet non copiable reste partagé.
+_IMMUTABLE = (type(None), bool, int, float, complex, str, bytes)
+_MUTABLE = (list, dict, set, bytearray)
+
+def _needs_copy(v: Any) -> bool:
+    t = type(v)
+    if t in _IMMUTABLE:
+        return False
+    if t is tuple or t is frozenset:
+        return any(_needs_copy(x) for x in v)
+    return isinstance(v, _MUTABLE)
+
+def _fresh(v: Any) -> Any:
+    if not _needs_copy(v):
+        return v
+    try:
+        return copy.deepcopy(v)
+    except Exception:
+        return v
+
+def _call_detail(fn: str, *args: Any) -> str:
+    return f"{fn}({', '.join(map(repr,args))})"
 
 class Sandbox:
-    def __init__(self, call_registry: Optional[Dict[str, Callable[..., Any]]] = None):
+    def __init__(self, call_registry: Optional[Dict[str, Callable[..., Any]]] = None,
+                 log_level: str = "full", log_capacity: Optional[int] = None):
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"log_level inconnu: {log_level!r} (attendu: {LOG_LEVELS})")
         self.state: Dict[str, Any] = {}
         self.time: int = 0
-        self.log: List[ExecLog] = []
+        self.log_level = log_level
+        self.log: Any = [] if log_capacity is None else deque(maxlen=log_capacity)
+        self.counts: Counter = Counter()
         self._step = 0
         self.calls = call_registry or {}
+        self._log = {
+            "off": self._log_off, "counters": self._log_counters,
+            "structured": self._log_structured, "full": self._log_full,
+        }[log_level]
 
     def run(self, program: Any) -> Any:
         return self._exec(program)
 
-    def _tick(self, node: Any, detail: str = ""):
+    # _log(kind, fmt, *args): un pas exécuté, détail = fmt.format(*args) (ou fmt(*args))
+    def _log_off(self, kind: str, fmt: Any = "", *args: Any):
+        self._step += 1
+
+    def _log_counters(self, kind: str, fmt: Any = "", *args: Any):
         self._step += 1
-        self.log.append(ExecLog(self._step, node.__class__.__name__, detail))
+        self.counts[kind] += 1
+
+    def _log_structured(self, kind: str, fmt: Any = "", *args: Any):
+        self._step += 1
+        self.counts[kind] += 1
+        for a in args:
+            if type(a) not in _IMMUTABLE and _needs_copy(a):
+                # instantané des conteneurs mutables : une mutation ultérieure
+                # ne doit pas changer le détail (scalaires : aucune copie)
+                try:
+                    args = tuple(copy.deepcopy(x) if _needs_copy(x) else x for x in args)
+                except Exception:
+                    self.log.append(ExecLog(self._step, kind, fmt(*args) if callable(fmt) else fmt.format(*args)))
+                    return
+                break
+        self.log.append(ExecLog(self._step, kind, fmt, args))
+
+    def _log_full(self, kind: str, fmt: Any = "", *args: Any):
+        self._step += 1
+        self.counts[kind] += 1
+        self.log.append(ExecLog(self._step, kind, fmt(*args) if callable(fmt) else fmt.format(*args)))
+
+    def _tick(self, node: Any, fmt: Any = "", *args: Any):
+        self._log(node.__class__.__name__, fmt, *args)
 
     def _eval(self, x: Any) -> Any:
         # VALUE
-        if isinstance(x, ir.VALUE): return x.v
+        if isinstance(x, ir.VALUE): return _fresh(x.v)
         # READ
         if isinstance(x, ir.READ):
             name = x.state.name
@@ -64,30 +163,30 @@ class Sandbox:
             if node.t < self.time:
                 raise ir.ERROR(f"TIME désordonné: {node.t} < {self.time}", code="R8")
             self.time = node.t
-            self._tick(node, f"time={self.time}")
+            self._tick(node, "time={}", self.time)
             return None
 
         if isinstance(node, ir.EVENT):
             # R7: EVENT should be external; we only log it, no mutation unless user handles it explicitly.
-            self._tick(node, f"event={node.name} t={node.t} payload={node.payload!r}")
+            self._tick(node, "event={} t={} payload={!r}", node.name, node.t, node.payload)
             return None
 
         if isinstance(node, ir.STATE):
             # Decl only
             if node.name not in self.state:
                 self.state[node.name] = None
-            self._tick(node, f"declare {node.name}")
+            self._tick(node, "declare {}", node.name)
             return None
 
         if isinstance(node, ir.WRITE):
             val = self._eval(node.value)
             self.state[node.state.name] = val
-            self._tick(node, f"{node.state.name}={val!r}")
+            self._tick(node, "{}={!r}", node.state.name, val)
             return None
 
         if isinstance(node, ir.READ):
             val=self._eval(node)
-            self._tick(node, f"{node.state.name} -> {val!r}")
+            self._tick(node, "{} -> {!r}", node.state.name, val)
             return ir.VALUE(val)
 
         if isinstance(node, ir.FLOW):
@@ -98,7 +197,7 @@ class Sandbox:
 
         if isinstance(node, ir.COND):
             res=bool(self._eval(node.expr))
-            self._tick(node, f"cond={res}")
+            self._tick(node, "cond={}", res)
             return res
 
         if isinstance(node, ir.LOOP):
@@ -108,7 +207,7 @@ class Sandbox:
                     raise ir.ERROR("LOOP sans sortie (max_iters atteint)", code="R6")
                 it += 1
                 if not bool(self._exec(node.cond)):
-                    self._tick(node, f"loop_exit iters={it}")
+                    self._tick(node, "loop_exit iters={}", it)
                     return None
                 for s in node.body:
                     self._exec(s)
@@ -117,7 +216,7 @@ class Sandbox:
             if node.fn not in self.calls:
                 raise ir.ERROR(f"CALL inconnu: {node.fn}", code="R4")
             args=[self._eval(a) for a in node.args]
-            self._tick(node, f"{node.fn}({', '.join(map(repr,args))})")
+            self._tick(node, _call_detail, node.fn, *args)
             try:
                 ret=self.calls[node.fn](*args)
             except Exception as e:
@@ -125,7 +224,7 @@ class Sandbox:
             return ir.RETURN(ir.VALUE(ret))
 
         if isinstance(node, ir.RETURN):
-            self._tick(node, f"return {node.value!r}")
+            self._tick(node, "return {!r}", node.value)
             return node.value
 
         raise ir.ERROR(f"Hors-alphabet: {type(node).__name__}", code="R10")
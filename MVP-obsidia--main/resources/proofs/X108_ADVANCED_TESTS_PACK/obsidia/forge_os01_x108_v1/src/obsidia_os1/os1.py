@@ -3,11 +3,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+from obsidia_os0.compiled import CompiledSandbox
 from obsidia_os0.contract import validate as validate_contract
 from obsidia_os0.sandbox import Sandbox
 
 from .x108 import X108Gate, X108Check
 from .parse_input import parse_input
+from .program_cache import ProgramCache, PreparedProgram, format_contract_violation
+
+PROGRAM_CACHE = ProgramCache()
 
 
 @dataclass
@@ -21,10 +25,6 @@ class OS1Decision:
     os0_result: Optional[Dict[str, Any]]
 
 
-def _format_contract_violation(e: Exception) -> str:
-    return f"CONTRACT_VIOLATION: {type(e).__name__}: {e}"
-
-
 def run_request(
     *,
     raw_input: str,
@@ -32,6 +32,8 @@ def run_request(
     sandbox: Optional[Sandbox] = None,
     x108_gate: Optional[X108Gate] = None,
     x108_ctx: Optional[Dict[str, Any]] = None,
+    log_level: str = "full",
+    program_cache: Optional[ProgramCache] = PROGRAM_CACHE,
 ) -> OS1Decision:
     """Pipeline OS1 minimal.
 
@@ -40,13 +42,25 @@ def run_request(
     3) X108 check (HOLD/ACT) si gate fourni
     4) exécution OS0 sandbox si ACT
     5) SSR explicative
+
+    log_level règle le log OS0 quand aucune sandbox n'est fournie : "full"
+    (trace d'audit complète) ou "counters"/"off" en production (aucune
+    allocation par pas).
+
+    program_cache (PROGRAM_CACHE par défaut, None pour désactiver) mémorise
+    parse, verdict du contrat et programme compilé : une requête déjà vue
+    saute les étapes 1-2 et s'exécute sur CompiledSandbox.
     """
 
-    sb = sandbox or Sandbox()
+    prepared: Optional[PreparedProgram] = None
 
     # 1) Traduction vers IR (déterminisme)
     try:
-        ir = parse_input(raw_input)
+        if program_cache is not None:
+            prepared = program_cache.get(raw_input)
+            ir = prepared.ir
+        else:
+            ir = parse_input(raw_input)
     except Exception as e:
         return OS1Decision(
             decision="REJECT",
@@ -61,17 +75,30 @@ def run_request(
     meta = ir.get("meta", {}) if isinstance(ir, dict) else {}
 
     # 2) Contrat
-    try:
-        validate_contract(program)
-    except Exception as e:
+    if prepared is not None:
+        contract_error = prepared.contract_error
+    else:
+        try:
+            validate_contract(program, first=True)  # admission : arrêt à la première violation
+            contract_error = None
+        except Exception as e:
+            contract_error = format_contract_violation(e)
+    if contract_error is not None:
         return OS1Decision(
             decision="REJECT",
-            ssr=_format_contract_violation(e),
+            ssr=contract_error,
             contract_ok=False,
             x108=None,
             os0_result=None,
         )
 
+    if sandbox is not None:
+        sb = sandbox
+    elif prepared is not None:
+        sb = CompiledSandbox(log_level=log_level)
+    else:
+        sb = Sandbox(log_level=log_level)
+
     # 3) X108
     x108_res: Optional[X108Check] = None
     if x108_gate is not None:
@@ -99,7 +126,10 @@ def run_request(
 
     # 4) Exécution OS0
     try:
-        os0_out = sb.run(program)
+        if prepared is not None and isinstance(sb, CompiledSandbox):
+            os0_out = sb.run(prepared.compiled)
+        else:
+            os0_out = sb.run(program)
         if os0_out is None:
             os0_out = {
                 "ok": True,
@@ -112,6 +142,7 @@ def run_request(
                     }
                     for l in getattr(sb, "log", [])
                 ],
+                "counts": dict(getattr(sb, "counts", {})),
             }
     except Exception as e:
         ssr = "REJECT\n" + f"os0_error: {type(e).__name__}: {e}"
@@ -142,12 +173,25 @@ def run_request(
 
 # --- OS2 Structural Hook (optional) ---
 try:
-    from obsidia_os2.metrics import compute_metrics_core_fixed
+    from obsidia_os2.cache import MetricsCache
+    STRUCTURAL_CACHE = MetricsCache()
 except ImportError:
-    compute_metrics_core_fixed = None
+    STRUCTURAL_CACHE = None
+
+def structural_gate_optional(W_full=None, core_nodes=None, state=None, cache=None):
+    """Score S du Core ; avec `state` (obsidia_os2.StructuralState) seules les
+    arêtes du Core modifiées depuis la requête précédente sont recalculées.
 
-def structural_gate_optional(W_full=None, core_nodes=None):
-    if compute_metrics_core_fixed and W_full and core_nodes:
-        m = compute_metrics_core_fixed(W_full, core_nodes)
+    Sans `state`, le calcul passe par `cache` (STRUCTURAL_CACHE par défaut),
+    indexé par l'empreinte de la sous-matrice du Core : un Monde modifié avec
+    un Core inchangé ne relance pas le calcul structurel.
+    """
+    if state is not None:
+        if W_full is not None:
+            state.update(W_full)
+        return state.metrics().S
+    cache = cache if cache is not None else STRUCTURAL_CACHE
+    if cache is not None and W_full is not None and len(W_full) and core_nodes:
+        m = cache.compute(W_full, core_nodes)
         return m.S
     return None
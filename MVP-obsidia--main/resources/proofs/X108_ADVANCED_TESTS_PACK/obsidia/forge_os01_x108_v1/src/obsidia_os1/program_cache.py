@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+from obsidia_os0.compiled import CompiledProgram, compile_program
+from obsidia_os0.contract import validate as validate_contract
+from obsidia_os0.determinism import canonical_hash
+
+from .parse_input import parse_input
+
+
+@dataclass
+class PreparedProgram:
+    """Requête préparée : IR parsé, verdict du contrat, forme compilée."""
+
+    ir_hash: str
+    ir: Dict[str, Any]
+    program: Any
+    meta: Dict[str, Any]
+    contract_error: Optional[str]
+    compiled: Optional[CompiledProgram]
+
+
+def format_contract_violation(e: Exception) -> str:
+    return f"CONTRACT_VIOLATION: {type(e).__name__}: {e}"
+
+
+def prepare(ir: Dict[str, Any], ir_hash: Optional[str] = None) -> PreparedProgram:
+    """Valide le contrat puis compile le programme (sans cache)."""
+    program = ir.get("program", ir)
+    meta = ir.get("meta", {}) if isinstance(ir, dict) else {}
+    try:
+        validate_contract(program, first=True)  # admission : arrêt à la première violation
+        contract_error = None
+    except Exception as e:
+        contract_error = format_contract_violation(e)
+    compiled = compile_program(program) if contract_error is None else None
+    return PreparedProgram(
+        ir_hash=ir_hash if ir_hash is not None else canonical_hash(program),
+        ir=ir,
+        program=program,
+        meta=meta,
+        contract_error=contract_error,
+        compiled=compiled,
+    )
+
+
+class ProgramCache:
+    """Cache LRU adressé par contenu pour run_request.
+
+    Deux niveaux :
+    - entrée brute -> PreparedProgram : une requête identique saute parse,
+      hash, contrat et compilation (str indexée telle quelle, dict/list par
+      canonical_hash puis vérification d'égalité) ;
+    - canonical_hash de l'IR parsé -> PreparedProgram : deux entrées brutes
+      différentes donnant le même IR partagent contrat et forme compilée.
+      L'égalité des programmes est vérifiée, canonical_hash ne distinguant
+      pas tuple et liste.
+    Les erreurs de parse ne sont pas mises en cache. Partagé entre threads
+    (PROGRAM_CACHE) : get/clear/stats sont sérialisés par un verrou.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError(f"maxsize doit être >= 1, reçu {maxsize}")
+        self.maxsize = int(maxsize)
+        self._by_raw: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._by_ir: "OrderedDict[str, PreparedProgram]" = OrderedDict()
+        self.raw_hits = 0
+        self.ir_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_ir)
+
+    @staticmethod
+    def _raw_key(raw: Any) -> Hashable:
+        return ("str", raw) if isinstance(raw, str) else ("hash", canonical_hash(raw))
+
+    def get(self, raw: Any) -> PreparedProgram:
+        """PreparedProgram de `raw` ; propage l'exception de parse_input."""
+        key = self._raw_key(raw)
+        with self._lock:
+            return self._get(key, raw)
+
+    def _get(self, key: Hashable, raw: Any) -> PreparedProgram:
+        hit = self._by_raw.get(key)
+        if hit is not None and (key[0] == "str" or hit[0] == raw):
+            self._by_raw.move_to_end(key)
+            if hit[1].ir_hash in self._by_ir:
+                self._by_ir.move_to_end(hit[1].ir_hash)
+            self.raw_hits += 1
+            return hit[1]
+
+        ir = parse_input(raw)
+        program = ir.get("program", ir)
+        ir_hash = canonical_hash(program)
+        prepared = self._by_ir.get(ir_hash)
+        if prepared is not None and prepared.program == program:
+            self._by_ir.move_to_end(ir_hash)
+            self.ir_hits += 1
+            if prepared.ir != ir:  # même programme, meta différente
+                prepared = PreparedProgram(ir_hash, ir, prepared.program, ir.get("meta", {}),
+                                           prepared.contract_error, prepared.compiled)
+        else:
+            self.misses += 1
+            prepared = prepare(ir, ir_hash)
+            self._by_ir[ir_hash] = prepared
+            self._evict(self._by_ir)
+        self._by_raw[key] = (raw, prepared)
+        self._evict(self._by_raw)
+        return prepared
+
+    def _evict(self, entries: OrderedDict) -> None:
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_raw.clear()
+            self._by_ir.clear()
+            self.raw_hits = self.ir_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.raw_hits + self.ir_hits + self.misses
+            return {
+                "raw_hits": self.raw_hits,
+                "ir_hits": self.ir_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._by_ir),
+                "maxsize": self.maxsize,
+                "hit_rate": (self.raw_hits + self.ir_hits) / total if total else 0.0,
+            }
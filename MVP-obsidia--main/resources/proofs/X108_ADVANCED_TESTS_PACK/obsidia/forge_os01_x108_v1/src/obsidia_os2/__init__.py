@@ -1 +1,3 @@
 from .metrics import compute_metrics_core_fixed, decision_act_hold
+from .state import StructuralState
+from .cache import MetricsCache
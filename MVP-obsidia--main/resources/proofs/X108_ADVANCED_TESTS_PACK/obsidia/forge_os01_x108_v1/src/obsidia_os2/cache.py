@@ -0,0 +1,70 @@
+"""
+OS2 – Memoized core-fixed metrics.
+
+compute_metrics_core_fixed only reads the core submatrix (core/world
+invariance), so its result is a pure function of that submatrix and the
+weights (alpha, beta, gamma). MetricsCache keys results by a digest of the
+submatrix bytes plus those parameters and evicts least-recently-used entries;
+world-only changes hit the cache.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .metrics import Metrics, compute_metrics_core_fixed, core_submatrix
+
+def core_fingerprint(W_core: np.ndarray) -> str:
+    """Digest of a core submatrix (shape + float64 bytes)."""
+    W = np.ascontiguousarray(W_core, dtype=np.float64)
+    h = hashlib.sha256(repr(W.shape).encode("ascii"))
+    h.update(W.tobytes())
+    return h.hexdigest()
+
+class MetricsCache:
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize}")
+        self.maxsize = int(maxsize)
+        self._entries: "OrderedDict[Tuple, Metrics]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compute(self, W_full, core_nodes: List[int], alpha=1.0, beta=1.0, gamma=0.5) -> Metrics:
+        """compute_metrics_core_fixed, memoized on (core fingerprint, alpha, beta, gamma)."""
+        W = core_submatrix(W_full, core_nodes)
+        key = (core_fingerprint(W), float(alpha), float(beta), float(gamma))
+        m = self._entries.get(key)
+        if m is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return replace(m)
+        self.misses += 1
+        m = compute_metrics_core_fixed(W, range(len(W)), alpha, beta, gamma)
+        self._entries[key] = m
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return replace(m)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,137 @@
+"""
+OS2 – Incremental core metrics under edge updates.
+
+StructuralState keeps the core submatrix and the running aggregates behind
+compute_metrics_core_fixed (triangle sum/count, weighted degrees, total
+weight). Changing one entry W[a][b] only touches the n-2 triples through
+(a, b), the degree of a and the total, so an update costs O(n) instead of
+the O(n^3) full recompute. World-only changes are ignored (core invariance).
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import Metrics, core_submatrix, triangle_sum_count
+
+def _differs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a != b) & ~(np.isnan(a) & np.isnan(b))
+
+class StructuralState:
+    def __init__(self, W_full, core_nodes: List[int], alpha=1.0, beta=1.0, gamma=0.5,
+                 theta: float = 0.0, resync_every: int = 4096):
+        self.core = list(core_nodes)
+        self.pos = {node: i for i, node in enumerate(self.core)}
+        self.alpha, self.beta, self.gamma = alpha, beta, gamma
+        self.theta = theta
+        self.resync_every = int(resync_every)
+        self.updates = 0
+        self.reset(core_submatrix(W_full, self.core))
+
+    def reset(self, W_core: np.ndarray) -> None:
+        """Rebuild every aggregate from a core submatrix."""
+        self.W = np.array(W_core, dtype=float)
+        self.tri_sum, self.tri_count = triangle_sum_count(self.W, self.theta)
+        self.degrees = self.W.sum(axis=1)
+        self.total = float(self.W.sum())
+        self._since_resync = 0
+
+    def resync(self) -> None:
+        self.reset(self.W)
+
+    def _through(self, a: int, b: int) -> np.ndarray:
+        # scores of the triples containing both a and b (sorted i<j<k form)
+        W = self.W
+        lo, hi = min(a, b), max(a, b)
+        c = np.arange(len(W))
+        c1, c2, c3 = c[:lo], c[lo+1:hi], c[hi+1:]
+        return np.concatenate([
+            (W[c1, lo] + W[lo, hi] + W[hi, c1]) / 3.0,   # (c, lo, hi)
+            (W[lo, c2] + W[c2, hi] + W[hi, lo]) / 3.0,   # (lo, c, hi)
+            (W[lo, hi] + W[hi, c3] + W[c3, lo]) / 3.0,   # (lo, hi, c)
+        ])
+
+    def _set_entry(self, a: int, b: int, w: float) -> None:
+        old = self.W[a, b]
+        if w == old or (w != w and old != old):  # NaN counts as unchanged
+            return
+        if a != b:
+            t = self._through(a, b)
+            t = t[t >= self.theta]
+            self.tri_sum -= float(t.sum()); self.tri_count -= len(t)
+        self.W[a, b] = w
+        if a != b:
+            t = self._through(a, b)
+            t = t[t >= self.theta]
+            self.tri_sum += float(t.sum()); self.tri_count += len(t)
+        self.degrees[a] += w - old
+        self.total += w - old
+        self.updates += 1
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self.resync()
+
+    def set_edge(self, i: int, j: int, w: float, symmetric: bool = True) -> bool:
+        """Set W[i][j] (and W[j][i]) by full-graph node ids; False if not a core edge."""
+        a, b = self.pos.get(i), self.pos.get(j)
+        if a is None or b is None:
+            return False
+        self._set_entry(a, b, float(w))
+        if symmetric and a != b:
+            self._set_entry(b, a, float(w))
+        return True
+
+    def update(self, W_full, max_changes: Optional[int] = None,
+               touched: Optional[Iterable[int]] = None) -> int:
+        """Apply every core entry that differs from W_full; returns the number changed.
+
+        NaN compares equal to NaN. An unchanged core is detected with one
+        vectorized comparison. With `touched` (full-graph node ids whose rows /
+        columns may have changed) only those rows and columns are read and
+        compared: O(len(touched) * n) instead of O(n^2). Past max_changes
+        entries (default: a quarter of the core matrix) a full rebuild is
+        cheaper than per-entry updates.
+        """
+        if touched is not None:
+            return self._update_touched(W_full, touched)
+        W_new = core_submatrix(W_full, self.core)
+        if np.array_equal(W_new, self.W, equal_nan=True):
+            return 0
+        changed = np.argwhere(_differs(W_new, self.W))
+        limit = max_changes if max_changes is not None else self.W.size // 4
+        if len(changed) > limit:
+            self.reset(W_new)
+            return len(changed)
+        for a, b in changed.tolist():
+            self._set_entry(a, b, float(W_new[a, b]))
+        return len(changed)
+
+    def _update_touched(self, W_full, touched: Iterable[int]) -> int:
+        idx = sorted({self.pos[i] for i in touched if i in self.pos})
+        if not idx:
+            return 0
+        nodes = [self.core[a] for a in idx]
+        if isinstance(W_full, np.ndarray):
+            rows = np.asarray(W_full[np.ix_(nodes, self.core)], dtype=float)
+            cols = np.asarray(W_full[np.ix_(self.core, nodes)], dtype=float)
+        else:
+            rows = np.asarray([[W_full[i][c] for c in self.core] for i in nodes], dtype=float)
+            cols = np.asarray([[W_full[c][i] for i in nodes] for c in self.core], dtype=float)
+        changed = {(idx[r], b) for r, b in np.argwhere(_differs(rows, self.W[idx, :])).tolist()}
+        changed |= {(a, idx[k]) for a, k in np.argwhere(_differs(cols, self.W[:, idx])).tolist()}
+        at = {a: r for r, a in enumerate(idx)}
+        for a, b in sorted(changed):
+            w = rows[at[a], b] if a in at else cols[a, at[b]]
+            self._set_entry(a, b, float(w))
+        return len(changed)
+
+    def apply(self, edges: Iterable[Tuple[int, int, float]], symmetric: bool = True) -> int:
+        return sum(self.set_edge(i, j, w, symmetric) for i, j, w in edges)
+
+    def metrics(self) -> Metrics:
+        n = len(self.W)
+        T = self.tri_sum / self.tri_count if self.tri_count else 0.0
+        H = self.total / n**2
+        A = float(np.abs(self.degrees - self.degrees.mean()).mean())
+        S = self.alpha*T + self.beta*H - self.gamma*A
+        return Metrics(T, H, A, S)
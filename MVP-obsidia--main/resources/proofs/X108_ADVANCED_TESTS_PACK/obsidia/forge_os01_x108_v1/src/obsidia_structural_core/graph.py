@@ -0,0 +1,61 @@
+"""
+Array-backed weighted graph for the structural metrics.
+
+AdjacencyGraph wraps W (list of lists or ndarray) as one float64 matrix and
+provides the vectorized primitives used by metrics.py: edge thresholding,
+triangle enumeration, weighted degrees and core submatrices.
+"""
+
+from __future__ import annotations
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+class AdjacencyGraph:
+    def __init__(self, W):
+        self.W=np.ascontiguousarray(W, dtype=float)
+        if self.W.ndim!=2 or self.W.shape[0]!=self.W.shape[1]:
+            raise ValueError(f"W must be a square matrix, got shape {self.W.shape}")
+
+    @property
+    def n(self) -> int:
+        return self.W.shape[0]
+
+    def mask(self, theta: float = 0.0, strict: bool = True) -> np.ndarray:
+        # edge mask: W > theta (strict) or W >= theta
+        return self.W>theta if strict else self.W>=theta
+
+    def sub(self, nodes: Sequence[int]) -> "AdjacencyGraph":
+        idx=np.asarray(list(nodes), dtype=np.intp)
+        return AdjacencyGraph(self.W[np.ix_(idx, idx)])
+
+    def weighted_degrees(self) -> np.ndarray:
+        return self.W.sum(axis=1)
+
+    def triangles(self, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All i<j<k with mask[i,j] & mask[j,k] & mask[k,i], in lexicographic order.
+
+        Per pivot i: rows j>i adjacent from i, columns k>i adjacent to i, and
+        the (j,k) block of the mask intersects them — O(sum deg^2) booleans.
+        """
+        n=self.n
+        ii, jj, kk = [], [], []
+        for i in range(n-2):
+            J=np.flatnonzero(mask[i, i+1:])+i+1
+            K=np.flatnonzero(mask[i+1:, i])+i+1
+            if len(J)==0 or len(K)==0: continue
+            block=mask[np.ix_(J, K)] & (J[:, None]<K[None, :])
+            a, b = np.nonzero(block)
+            if len(a):
+                ii.append(np.full(len(a), i)); jj.append(J[a]); kk.append(K[b])
+        if not ii:
+            empty=np.empty(0, dtype=np.intp)
+            return empty, empty, empty
+        return np.concatenate(ii), np.concatenate(jj), np.concatenate(kk)
+
+    def triangle_scores(self, i: np.ndarray, j: np.ndarray, k: np.ndarray) -> np.ndarray:
+        W=self.W
+        return (W[i, j]+W[j, k]+W[k, i])/3.0
+
+def as_graph(W: Union["AdjacencyGraph", np.ndarray, list]) -> AdjacencyGraph:
+    return W if isinstance(W, AdjacencyGraph) else AdjacencyGraph(W)
@@ -7,14 +7,20 @@ Implements:
 - Weighted-degree asymmetry penalty (anti-domination)
 - Core-fixed evaluation for strict invariance under World changes
 
-All graphs are treated as weighted, undirected adjacency matrices W with weights in [0,1].
+All graphs are treated as weighted, undirected adjacency matrices W with weights in [0,1],
+given as lists of lists, ndarrays or AdjacencyGraph (see graph.py).
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
 from itertools import combinations, permutations
+from math import fsum
 from typing import List, Tuple, Optional, Sequence
 
+import numpy as np
+
+from .graph import AdjacencyGraph, as_graph
+
 Number = float
 
 @dataclass(frozen=True)
@@ -48,25 +54,116 @@ def _var(xs: List[Number]) -> float:
 def triangle_score(W: List[List[Number]], i: int, j: int, k: int) -> float:
     return (W[i][j]+W[j][k]+W[k][i])/3.0
 
-def find_strong_triangles(W: List[List[Number]], theta_T: float) -> List[Triangle]:
-    n=len(W)
-    out=[]
-    for i,j,k in combinations(range(n),3):
-        if W[i][j]>0 and W[j][k]>0 and W[k][i]>0:
-            t=triangle_score(W,i,j,k)
-            if t>=theta_T:
-                out.append(Triangle(i,j,k,t))
-    out.sort(key=lambda t:t.score, reverse=True)
-    return out
+def find_strong_triangles(W, theta_T: float) -> List[Triangle]:
+    g=as_graph(W)
+    i,j,k=g.triangles(g.mask(0.0))
+    t=g.triangle_scores(i,j,k)
+    keep=t>=theta_T
+    i,j,k,t=i[keep],j[keep],k[keep],t[keep]
+    order=np.argsort(-t, kind="stable")  # score desc, ties in (i,j,k) order
+    return [Triangle(*row) for row in zip(i[order].tolist(), j[order].tolist(), k[order].tolist(), t[order].tolist())]
+
+def _canonical_ring(W: List[List[Number]], nodes: Sequence[int], theta_A: float) -> Optional[Tuple[int,...]]:
+    # lexicographically first valid ring: min node first, then smallest permutation
+    first, *others = sorted(nodes)
+    for perm in permutations(others, len(others)):
+        ring=(first,)+perm
+        if all(W[ring[i]][ring[(i+1)%6]]>=theta_A for i in range(6)):
+            return ring
+    return None
+
+def _hexagon(W: List[List[Number]], p: int, ring: Tuple[int,...], lam: float) -> Hexagon:
+    radial=[W[p][h] for h in ring]
+    rmean=_mean(radial); rvar=_var(radial)
+    return Hexagon(p, ring, rmean, rvar, rmean - lam*rvar)
+
+def _ring_key_score(radial: List[Number], lam: float) -> float:
+    # score used to rank rings: computed on the sorted radial weights, so the
+    # same node set always gets the same float whatever the visiting order
+    radial=sorted(radial)
+    return fsum(radial)/6.0 - lam*_var(radial)
 
 def find_best_hexagon(W: List[List[Number]], theta_R: float, theta_A: float, lam: float,
-                      max_candidates_per_p: int = 2000) -> Optional[Hexagon]:
+                      max_expansions: Optional[int] = None) -> Optional[Hexagon]:
+    """Best radial hexagon by depth-first ring construction + branch-and-bound.
+
+    For each pivot p, rings are built on the theta_A graph restricted to the
+    radial candidates (W[p][h] >= theta_R). Every ring is generated once: it
+    starts at its smallest node s, only visits nodes > s, and the reflection is
+    dropped by requiring ring[1] < ring[5]. The score rmean - lam*rvar is bounded
+    by rmean (lam >= 0), and rmean of a partial ring by filling the free slots
+    with the largest radial weights still available; branches (and whole
+    pivots) whose bound cannot beat the incumbent are cut.
+
+    Tie-break (shared with find_best_hexagon_exhaustive): highest score, then
+    smallest pivot p, then lexicographically smallest sorted node set; the ring
+    returned is the canonical ring of that set (smallest valid permutation
+    starting at its minimum node). Within a pivot only branches whose bound is
+    strictly below the incumbent are cut, so a tie is never lost to the DFS
+    order; a later pivot cannot win a tie and is cut on equality.
+    max_expansions caps the DFS nodes visited per pivot (approximate search,
+    no tie guarantee) — None searches exhaustively.
+    """
+    if isinstance(W, AdjacencyGraph): W=W.W
+    if isinstance(W, np.ndarray): W=W.tolist()  # scalar indexing below
     n=len(W)
-    best=None
+    prune=lam>=0
+    best_key=None   # (score, p, sorted node set): max score, then min (p, nodes)
+    for p in range(n):
+        r={h: W[p][h] for h in range(n) if h!=p and W[p][h]>=theta_R}
+        if len(r)<6: continue
+        by_r=sorted(r, key=lambda h: (-r[h], h))
+        if prune and best_key is not None and fsum(r[h] for h in by_r[:6])/6.0 <= best_key[0]:
+            continue
+        adj={h: sorted((g for g in r if g!=h and W[h][g]>=theta_A), key=lambda g: (-r[g], g)) for h in r}
+        budget=[max_expansions]
+
+        def bound(path: List[int], s: int) -> float:
+            need=6-len(path); vals=[r[h] for h in path]
+            for h in by_r:
+                if need==0: break
+                if h>s and h not in path:
+                    vals.append(r[h]); need-=1
+            return fsum(vals)/6.0
+
+        def dfs(path: List[int], s: int) -> None:
+            nonlocal best_key
+            if budget[0] is not None:
+                if budget[0]<=0: return
+                budget[0]-=1
+            last=path[-1]
+            if len(path)==5:
+                for h in adj[last]:
+                    if h>s and h>path[1] and h not in path and W[h][s]>=theta_A:
+                        score=_ring_key_score([r[x] for x in path]+[r[h]], lam)
+                        key=(score, p, tuple(sorted(path+[h])))
+                        if best_key is None or score>best_key[0] or (score==best_key[0] and key[1:]<best_key[1:]):
+                            best_key=key
+                return
+            for h in adj[last]:
+                if h>s and h not in path:
+                    path.append(h)
+                    if not (prune and best_key is not None and bound(path, s)<best_key[0]):
+                        dfs(path, s)
+                    path.pop()
+
+        for s in by_r:
+            if len([g for g in adj[s] if g>s])<2: continue
+            if prune and best_key is not None and bound([s], s)<best_key[0]: continue
+            dfs([s], s)
+    if best_key is None:
+        return None
+    _, p, nodes = best_key
+    return _hexagon(W, p, _canonical_ring(W, nodes, theta_A), lam)
+
+def find_best_hexagon_exhaustive(W: List[List[Number]], theta_R: float, theta_A: float, lam: float) -> Optional[Hexagon]:
+    # reference: every 6-subset x every ring order (parity tests / tools/bench_hexagon.py),
+    # same ranking and tie-break as find_best_hexagon
+    n=len(W)
+    best_key=None
     for p in range(n):
         cand=[h for h in range(n) if h!=p and W[p][h]>=theta_R]
         if len(cand)<6: continue
-        tried=0
         for subset in combinations(cand,6):
             first=subset[0]; others=subset[1:]
             for perm in permutations(others,5):
@@ -77,36 +174,36 @@ def find_best_hexagon(W: List[List[Number]], theta_R: float, theta_A: float, lam
                     if W[a][b]<theta_A:
                         ok=False; break
                 if not ok: continue
-                radial=[W[p][h] for h in ring]
-                rmean=_mean(radial); rvar=_var(radial)
-                score=rmean - lam*rvar
-                hx=Hexagon(p, ring, rmean, rvar, score)
-                if best is None or hx.score>best.score:
-                    best=hx
-                tried += 1
-                if tried>=max_candidates_per_p: break
-            if tried>=max_candidates_per_p: break
-    return best
-
-def asymmetry_weighted_degree(W: List[List[Number]]) -> float:
-    n=len(W)
-    s=[sum(W[i][j] for j in range(n)) for i in range(n)]
-    sbar=sum(s)/n
-    return sum(abs(si-sbar) for si in s)/n
-
-def compute_metrics(W: List[List[Number]], theta_T=0.7, theta_R=0.7, theta_A=0.6,
+                key=(_ring_key_score([W[p][h] for h in ring], lam), p, tuple(sorted(ring)))
+                if best_key is None or key[0]>best_key[0] or (key[0]==best_key[0] and key[1:]<best_key[1:]):
+                    best_key=key
+    if best_key is None:
+        return None
+    _, p, nodes = best_key
+    return _hexagon(W, p, _canonical_ring(W, nodes, theta_A), lam)
+
+def asymmetry_weighted_degree(W) -> float:
+    s=as_graph(W).weighted_degrees()
+    return float(np.abs(s-s.mean()).mean())
+
+def compute_metrics(W, theta_T=0.7, theta_R=0.7, theta_A=0.6,
                     alpha=1.0, beta=1.0, gamma=1.0, lam=1.0) -> Metrics:
-    strong=find_strong_triangles(W, theta_T)
+    g=as_graph(W)
+    strong=find_strong_triangles(g, theta_T)
     tmean=_mean([t.score for t in strong]) if strong else 0.0
-    hx=find_best_hexagon(W, theta_R, theta_A, lam)
+    hx=find_best_hexagon(g, theta_R, theta_A, lam)
     hstar=hx.score if hx else 0.0
-    A=asymmetry_weighted_degree(W)
+    A=asymmetry_weighted_degree(g)
     S=alpha*tmean + beta*hstar - gamma*A
     return Metrics(strong, tmean, hx, A, S)
 
-def submatrix(W: List[List[Number]], nodes: Sequence[int]) -> List[List[Number]]:
+def submatrix(W, nodes: Sequence[int]) -> np.ndarray:
     nodes=list(nodes)
-    return [[W[i][j] for j in nodes] for i in nodes]
+    if isinstance(W, AdjacencyGraph): W=W.W
+    if isinstance(W, np.ndarray):
+        return W[np.ix_(nodes, nodes)].astype(float)
+    # list input: only the core rows are converted
+    return np.ascontiguousarray(np.asarray([W[i] for i in nodes], dtype=float)[:, nodes])
 
 def relabel_metrics(metrics: Metrics, nodes: Sequence[int]) -> Metrics:
     nodes=list(nodes)
@@ -117,7 +214,7 @@ def relabel_metrics(metrics: Metrics, nodes: Sequence[int]) -> Metrics:
         hx=Hexagon(nodes[h.p], tuple(nodes[x] for x in h.ring), h.radial_mean, h.radial_var, h.score)
     return Metrics(strong, metrics.strong_triangle_mean, hx, metrics.asymmetry, metrics.S)
 
-def compute_metrics_core_fixed(W_full: List[List[Number]], core_nodes: Sequence[int], **kwargs) -> Metrics:
+def compute_metrics_core_fixed(W_full, core_nodes: Sequence[int], **kwargs) -> Metrics:
     Wc=submatrix(W_full, core_nodes)
     m=compute_metrics(Wc, **kwargs)
     return relabel_metrics(m, core_nodes)
@@ -0,0 +1,64 @@
+import hashlib
+import json
+
+from obsidia_os0 import ir
+from obsidia_os0.determinism import _to_primitive, canonical_hash
+
+
+def _stdlib_hash(prog):
+    blob = json.dumps(_to_primitive(prog), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def test_canonical_hash_matches_stdlib_encoding():
+    floats = [0.0, -0.0, 0.5, 1e-4, 1e-05, 1e-7, 123.456, 1e15, 1e16, 1.2345678901234568e17, float("nan"), float("inf")]
+    programs = [
+        [ir.STATE("x"), ir.WRITE(ir.STATE("x"), ir.VALUE(1))],
+        [ir.EVENT("tick", {"p": 0.25, "n": 3, "z": None, "ok": True}, t=1)],
+        [ir.VALUE("régime ✓   \x00")],
+        [ir.VALUE(2 ** 70), ir.VALUE(-(2 ** 63))],
+        [ir.WRITE(ir.STATE("y"), ("+", ir.READ(ir.STATE("y")), ir.VALUE(0.1)))],
+        [ir.EVENT("b", {2: "int key", "1": "str key"})],
+        [ir.VALUE(object)],
+    ] + [[ir.VALUE(f)] for f in floats]
+    for prog in programs:
+        assert canonical_hash(prog) == _stdlib_hash(prog), prog
+
+
+def _program(n):
+    S = ir.STATE
+    steps = []
+    for i in range(n):
+        steps += [
+            S(f"v{i}"),
+            ir.WRITE(S(f"v{i}"), ("+", ir.READ(S("acc")), ir.VALUE(i * 0.5))),
+            ir.COND(("<", ir.READ(S(f"v{i}")), ir.VALUE(i))),
+            ir.EVENT("e", {"i": i, "tags": ["a", i]}, t=i),
+            ir.CALL("f", [ir.READ(S(f"v{i}")), ir.VALUE((1, "x"))]),
+        ]
+    return [ir.TIME(0), ir.FLOW(steps), ir.LOOP(ir.COND(("<", ir.VALUE(1), ir.VALUE(2))), steps[:10], max_iters=3)]
+
+
+def test_streaming_hash_matches_reference():
+    from obsidia_os0.determinism import canonical_hash_reference
+
+    prog = _program(2000)  # several flushes
+    ref = canonical_hash_reference(prog)
+    assert ref == _stdlib_hash(prog)
+    assert canonical_hash(prog, memo=False) == ref
+    assert canonical_hash(prog) == ref == canonical_hash(prog)  # cold then warm memo
+    for x in [ir.FLOW([ir.VALUE({1: ir.STATE("n")})]), ir.ERROR("boom", code="R4"), ir.STATE, (ir.VALUE(1),), {"k": ir.READ(ir.STATE("x"))}]:
+        try:
+            expected = canonical_hash_reference(x)
+        except TypeError:
+            continue
+        assert canonical_hash(x) == expected == canonical_hash(x), x
+
+
+def test_memo_follows_list_mutation():
+    steps = [ir.WRITE(ir.STATE("x"), ir.VALUE(1))]
+    flow = ir.FLOW(steps)
+    before = canonical_hash(flow)
+    steps.append(ir.WRITE(ir.STATE("y"), ir.VALUE(2)))
+    assert canonical_hash(flow) != before
+    assert canonical_hash(flow) == _stdlib_hash(flow)
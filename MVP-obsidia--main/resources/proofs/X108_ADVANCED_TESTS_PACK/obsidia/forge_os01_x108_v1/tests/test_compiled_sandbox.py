@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from obsidia_os0 import ir
+from obsidia_os0.compiled import CompiledSandbox, compile_program
+from obsidia_os0.sandbox import Sandbox
+
+S = ir.STATE
+
+
+def _calls():
+    return {"add": lambda a, b: a + b, "boom": lambda *a: 1 / 0, "echo": lambda *a: a}
+
+
+def _outcome(sb_cls, program):
+    sb = sb_cls(call_registry=_calls())
+    try:
+        ret, err = sb.run(program), None
+    except ir.ERROR as e:
+        ret, err = None, (e.code, e.message)
+    except Exception as e:  # TypeError, ZeroDivisionError, ... propagate unchanged
+        ret, err = None, (type(e).__name__, str(e))
+    return ret, err, sb.state, sb.time, sb.log
+
+
+def _counter_loop(n, max_iters=10_000):
+    return [
+        S("x"), ir.WRITE(S("x"), ir.VALUE(0)), S("acc"), ir.WRITE(S("acc"), ir.VALUE(0)),
+        ir.LOOP(ir.COND(("<", ir.READ(S("x")), ir.VALUE(n))), body=[
+            ir.WRITE(S("acc"), ("+", ir.READ(S("acc")), ("*", ir.READ(S("x")), ir.VALUE(2)))),
+            ir.WRITE(S("x"), ("+", ir.READ(S("x")), ir.VALUE(1))),
+        ], max_iters=max_iters),
+        ir.READ(S("acc")),
+    ]
+
+
+PROGRAMS = {
+    "loop": _counter_loop(50),
+    "loop_r6": _counter_loop(50, max_iters=10),
+    "read_r2": [ir.TIME(1), ir.READ(S("nope"))],
+    "time_r8": [ir.TIME(10), ir.EVENT("tick", {"a": 1}, t=10), ir.TIME(9)],
+    "call": [S("a"), ir.WRITE(S("a"), ir.VALUE(2)), ir.CALL("add", [ir.READ(S("a")), ir.VALUE(3)]),
+             ir.CALL("echo", [])],
+    "call_unknown_r4": [ir.CALL("missing", [ir.VALUE(1)])],
+    "call_error_r4": [ir.CALL("boom", [ir.VALUE(1)])],
+    "r10_after_effects": [S("a"), ir.WRITE(S("a"), ir.VALUE(1)), ir.VALUE(3), S("b")],
+    "r10_nested": ir.FLOW([ir.TIME(1), ir.FLOW([ir.RETURN(ir.VALUE(1)), "raw"])]),
+    "unknown_op": [S("a"), ir.WRITE(S("a"), ("%", ir.VALUE(7), ir.VALUE(2)))],
+    "callable_and_div": [S("a"), ir.WRITE(S("a"), lambda st: 4), ir.COND(("/", ir.READ(S("a")), ir.VALUE(0)))],
+    "malformed_read": [ir.READ("x")],
+    "cond_not_cond": [ir.LOOP(ir.READ(S("missing")), body=[])],
+    "empty": [],
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_compiled_matches_interpreter(name):
+    program = PROGRAMS[name]
+    got = _outcome(CompiledSandbox, program)
+    ref = _outcome(Sandbox, program)
+    assert got == ref
+
+
+def _random_expr(rng, depth):
+    r = rng.random()
+    if depth <= 0 or r < 0.4:
+        return ir.VALUE(rng.randint(-3, 3)) if r < 0.25 else ir.READ(S(rng.choice("abc")))
+    return (rng.choice(["<", "<=", ">", ">=", "==", "!=", "+", "-", "*", "/", "?"]),
+            _random_expr(rng, depth - 1), _random_expr(rng, depth - 1))
+
+
+def _random_node(rng, depth):
+    kind = rng.randrange(9 if depth > 0 else 7)
+    if kind == 0:
+        return S(rng.choice("abc"))
+    if kind in (1, 2):
+        return ir.WRITE(S(rng.choice("abc")), _random_expr(rng, 2))
+    if kind == 3:
+        return ir.TIME(rng.randint(0, 5))
+    if kind == 4:
+        return ir.COND(_random_expr(rng, 2))
+    if kind == 5:
+        return ir.CALL(rng.choice(["add", "boom", "echo", "nope"]), [_random_expr(rng, 1) for _ in range(2)])
+    if kind == 6:
+        return rng.choice([ir.READ(S(rng.choice("abc"))), ir.RETURN(ir.VALUE(1)), ir.EVENT("e", t=1)])
+    if kind == 7:
+        return ir.FLOW([_random_node(rng, depth - 1) for _ in range(rng.randint(0, 3))])
+    return ir.LOOP(ir.COND(_random_expr(rng, 2)), [_random_node(rng, depth - 1) for _ in range(2)],
+                   max_iters=rng.randint(1, 5))
+
+
+def test_compiled_matches_interpreter_fuzz():
+    rng = random.Random(108)
+    for _ in range(500):
+        program = [S("a"), ir.WRITE(S("a"), ir.VALUE(1))] + [_random_node(rng, 2) for _ in range(5)]
+        assert _outcome(CompiledSandbox, program) == _outcome(Sandbox, program)
+
+
+def test_compiled_program_is_reusable():
+    code = compile_program(_counter_loop(20))
+    for _ in range(2):
+        sb = CompiledSandbox()
+        assert sb.run(code) == ir.VALUE(sum(2 * i for i in range(20)))
+        assert sb.state["x"] == 20
+
+
+class _Right:
+    # opérande gauche dont l'addition rend l'opérande droit tel quel
+    def __add__(self, other):
+        return other
+
+
+@pytest.mark.parametrize("sb_cls", [Sandbox, CompiledSandbox])
+def test_mutable_right_operand_is_not_shared_with_the_ir(sb_cls):
+    program = [S("x"), ir.WRITE(S("x"), ir.VALUE(_Right())),
+               S("y"), ir.WRITE(S("y"), ("+", ir.READ(S("x")), ir.VALUE([1])))]
+    code = compile_program(program) if sb_cls is CompiledSandbox else program
+    sb = sb_cls()
+    sb.run(code)
+    sb.state["y"].append(2)
+    again = sb_cls()
+    again.run(code)
+    assert again.state["y"] == [1]
@@ -0,0 +1,57 @@
+import random
+import sys
+
+from obsidia_os0 import ir
+from obsidia_os0.contract import validate, validate_reference
+
+S = ir.STATE
+
+
+def _random_node(rng, depth):
+    leaves = [
+        lambda: S("x"),
+        lambda: ir.READ(rng.choice([S("x"), "x"])),
+        lambda: ir.WRITE(rng.choice([S("y"), "y"]), rng.choice([ir.VALUE(1), ir.READ(S("x")), [ir.VALUE(2)], 3])),
+        lambda: ir.EVENT("e", t=rng.choice([None, 1])),
+        lambda: ir.TIME(1),
+        lambda: ir.COND(("<", ir.VALUE(1), ir.VALUE(2))),
+        lambda: ir.RETURN(ir.VALUE(0)),
+        lambda: rng.choice(["raw", 42, ir.ERROR("e"), None]),
+    ]
+    if depth <= 0 or rng.random() < 0.5:
+        return rng.choice(leaves)()
+    kids = [_random_node(rng, depth - 1) for _ in range(rng.randint(0, 3))]
+    return rng.choice([
+        lambda: ir.FLOW(kids),
+        lambda: ir.LOOP(rng.choice([ir.COND(True), ir.READ(S("x")), "c"]), kids, max_iters=rng.choice([0, 5, None])),
+        lambda: ir.CALL("f", kids + [ir.WRITE(S("z"), ir.EVENT("in_write"))]),
+        lambda: kids,
+    ])()
+
+
+def test_iterative_matches_recursive():
+    rng = random.Random(108)
+    memo = {}
+    for _ in range(500):
+        prog = [_random_node(rng, 4) for _ in range(4)]
+        ref = validate_reference(prog)
+        assert validate(prog) == ref
+        assert validate(prog, memo=memo) == ref == validate(prog, memo=memo)
+        assert validate(prog, first=True) == ref[:1]
+
+
+def test_deep_nesting_has_no_recursion_limit():
+    node = ir.EVENT("leaf")
+    for _ in range(sys.getrecursionlimit() * 2):
+        node = ir.FLOW([node])
+    assert validate(node) == [("R7", "EVENT 'leaf' sans timestamp")]
+
+
+def test_memo_validates_shared_subtrees_once():
+    shared = ir.FLOW([ir.EVENT("a"), ir.READ("bad")])
+    prog = [shared, ir.LOOP(ir.COND(True), [shared], max_iters=0), shared]
+    memo = {}
+    assert validate(prog, memo=memo) == validate_reference(prog)
+    assert memo[id(shared)] == (shared, (("R7", "EVENT 'a' sans timestamp"), ("R1", "READ doit viser un STATE")))
+    # a memo hit skips the subtree walk
+    assert validate(prog, memo={id(shared): (shared, ())}) == [("R6", "LOOP doit avoir max_iters > 0")]
@@ -0,0 +1,121 @@
+import gzip
+import importlib.util
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+TOOL = Path(__file__).resolve().parents[1] / "tools" / "convert_x108_zips_to_json.py"
+spec = importlib.util.spec_from_file_location("convert_x108_zips_to_json", TOOL)
+conv = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = conv  # workers unpickle _convert_zip_to_part by module name
+spec.loader.exec_module(conv)
+
+CSV = "t;ist;cmec;irreversible\n" + "".join(f"{i * 1.5};0.{i % 10};0.5;{'no' if i % 3 else 'yes'}\n" for i in range(40))
+PY = "".join(f"CASES.append(({i}.5, 0.{i % 9}, 0.25))\n" for i in range(30))
+ARRAY = [{"id": f"a{i}", "t": i, "ist": 0.1, "CMEC": 2, "irreversible": i % 2 == 0} for i in range(25)]
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items():
+            z.writestr(name, data)
+    return str(path)
+
+
+def _pack(tmp_path, name="pack.zip"):
+    return _zip(tmp_path / name, {
+        "d/scenarios.json": json.dumps(ARRAY, indent=1),
+        "d/config.json": '{"not": "a list"}',
+        "d/broken.json": "[{]",
+        "runs.csv": CSV,
+        "runs.csv.gz": gzip.compress(CSV.encode()),
+        "gen.py": PY,
+    })
+
+
+def test_precedence_and_normalisation(tmp_path):
+    rows = conv.extract_scenarios_from_zip(_pack(tmp_path), limit=10_000)
+    assert len(rows) == 25 + 40 + 40 + 30
+    assert rows[0] == {"id": "a0", "time_elapsed": 0.0, "IST": 0.1, "CMEC": 2.0,
+                       "irreversible": True, "raw_source": "pack.zip::d/scenarios.json"}
+    assert rows[25] == {"id": "pack.zip::runs.csv#0", "time_elapsed": 0.0, "IST": 0.0, "CMEC": 0.5,
+                        "irreversible": True, "raw_source": "pack.zip::runs.csv"}
+    assert rows[26]["irreversible"] is False
+    assert rows[25:65] == [dict(r, raw_source="pack.zip::runs.csv", id=r["id"].replace(".gz", ""))
+                           for r in rows[65:105]]
+    assert rows[-1]["id"] == "pack.zip::gen.py#29" and rows[-1]["time_elapsed"] == 29.5
+
+
+def test_limit_is_honoured_across_members(tmp_path):
+    zp = _pack(tmp_path)
+    full = conv.extract_scenarios_from_zip(zp, limit=10_000)
+    for limit in (1, 25, 26, 64, 65, 120, 135):
+        assert conv.extract_scenarios_from_zip(zp, limit=limit) == full[:limit]
+
+
+def test_chunk_boundaries_do_not_change_output(tmp_path, monkeypatch):
+    zp = _pack(tmp_path)
+    full = conv.extract_scenarios_from_zip(zp, limit=10_000)
+    floats = "[1.25, 2e5, 3.5, 100, -0.5E-3, 12345.678]"
+    assert conv.extract_scenarios_from_zip(zp, limit=10_000) == full
+    for size in range(1, 24):
+        monkeypatch.setattr(conv, "_CHUNK_CHARS", size)
+        assert list(conv._iter_json_array(io.StringIO(floats))) == json.loads(floats)
+        assert conv.extract_scenarios_from_zip(zp, limit=10_000) == full
+
+
+def test_json_array_stream():
+    items = list(conv._iter_json_array(io.StringIO(' [1, 2.5e3 ,{"a": [1, "]"]}, "x"]  ')))
+    assert items == [1, 2500.0, {"a": [1, "]"]}, "x"]
+    assert list(conv._iter_json_array(io.StringIO('{"a": 1}'))) == []
+    with pytest.raises(ValueError):
+        list(conv._iter_json_array(io.StringIO("[1 2]")))
+
+
+def test_json_array_cost_does_not_grow_with_chunk_size():
+    import time
+
+    text = json.dumps([{"id": f"s{i}", "IST": i * 0.5, "ok": True} for i in range(40_000)], indent=1)
+
+    def best(fn):
+        out = []
+        for _ in range(3):
+            t0 = time.perf_counter()
+            fn()
+            out.append(time.perf_counter() - t0)
+        return min(out)
+
+    ref = best(lambda: json.loads(text))
+    stream = best(lambda: sum(1 for _ in conv._iter_json_array(io.StringIO(text))))
+    # copier le tampon (1 Mio) après chaque élément donnait ~15x
+    assert stream < 6 * ref + 0.05
+
+
+def test_outputs_match_and_parallel_equals_sequential(tmp_path):
+    zips = [_pack(tmp_path, "a.zip"), _zip(tmp_path / "b.zip", {"gen.py": PY}), str(tmp_path / "missing.zip")]
+    expected = conv.extract_scenarios_from_zip(zips[0], 50) + conv.extract_scenarios_from_zip(zips[1], 50)
+
+    n = conv.convert_streaming(zips, str(tmp_path / "seq.json"), limit=50)
+    assert n == len(expected) == 80
+    assert (tmp_path / "seq.json").read_text(encoding="utf-8") == json.dumps(expected, ensure_ascii=False, indent=2)
+
+    conv.convert_streaming(zips, str(tmp_path / "seq.jsonl"), limit=50)
+    lines = (tmp_path / "seq.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l) for l in lines] == expected
+
+    for ext in ("json", "jsonl"):
+        assert conv.convert_streaming(zips, str(tmp_path / f"par.{ext}"), limit=50, workers=2) == 80
+        assert (tmp_path / f"par.{ext}").read_bytes() == (tmp_path / f"seq.{ext}").read_bytes()
+
+
+def test_fallback_when_nothing_extracted(tmp_path):
+    empty = _zip(tmp_path / "empty.zip", {"readme.txt": "nothing"})
+    assert conv.convert_streaming([empty], str(tmp_path / "fb.jsonl"), fallback=5) == 5
+    rows = [json.loads(l) for l in (tmp_path / "fb.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert rows == conv.generate_fallback_scenarios(5)
+    conv.convert_streaming([empty], str(tmp_path / "none.json"), fallback=0)
+    assert (tmp_path / "none.json").read_text(encoding="utf-8") == "[]"
@@ -0,0 +1,66 @@
+import random
+
+from obsidia_structural_core.metrics import find_best_hexagon, find_best_hexagon_exhaustive
+
+
+def _random_graph(n, seed, digits=6):
+    rng = random.Random(seed)
+    W = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            W[i][j] = W[j][i] = round(rng.random(), digits)
+    return W
+
+
+def _valid_ring(W, hx, theta_R, theta_A):
+    ring = hx.ring
+    return (
+        len(set(ring)) == 6 and hx.p not in ring
+        and all(W[hx.p][h] >= theta_R for h in ring)
+        and all(W[ring[i]][ring[(i + 1) % 6]] >= theta_A for i in range(6))
+    )
+
+
+def test_matches_exhaustive_search_on_small_graphs():
+    found = 0
+    for seed in range(120):
+        W = _random_graph(7 + seed % 4, seed, digits=(1, 3, 6)[seed % 3])
+        lam = (0.0, 1.0, 3.0)[seed % 3]
+        fast = find_best_hexagon(W, 0.5, 0.4, lam)
+        ref = find_best_hexagon_exhaustive(W, 0.5, 0.4, lam)
+        assert (fast is None) == (ref is None), seed
+        if ref is None:
+            continue
+        found += 1
+        # same tie-break (1-digit weights tie a lot): same pivot and canonical ring
+        assert fast == ref, seed
+        assert _valid_ring(W, fast, 0.5, 0.4)
+    assert found > 50
+
+
+def test_large_dense_core_finishes():
+    W = _random_graph(120, 7)
+    hx = find_best_hexagon(W, 0.7, 0.6, 1.0)
+    assert hx is not None and _valid_ring(W, hx, 0.7, 0.6)
+    # every pivot has 25+ strong neighbours: the old per-pivot ring counter never ended here
+    assert min(sum(w >= 0.7 for w in row) for row in W) >= 25
+
+
+def test_ties_pick_smallest_pivot_then_node_set():
+    # all weights equal: every pivot and 6-set ties, the rule decides alone
+    W = [[0.0 if i == j else 0.9 for j in range(9)] for i in range(9)]
+    hx = find_best_hexagon(W, 0.5, 0.5, 1.0)
+    assert hx.p == 0 and hx.ring == (1, 2, 3, 4, 5, 6)
+    assert find_best_hexagon_exhaustive(W, 0.5, 0.5, 1.0) == hx
+    # pivot 1 scores higher: a better score beats a smaller pivot
+    for h in range(2, 8):
+        W[1][h] = W[h][1] = 1.0
+    assert find_best_hexagon(W, 0.5, 0.5, 1.0).p == 1
+
+
+def test_expansion_budget_gives_valid_ring():
+    W = _random_graph(60, 3)
+    hx = find_best_hexagon(W, 0.7, 0.6, 1.0, max_expansions=50)
+    exact = find_best_hexagon(W, 0.7, 0.6, 1.0)
+    assert hx is not None and _valid_ring(W, hx, 0.7, 0.6)
+    assert hx.score <= exact.score
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from obsidia_os1.os1 import structural_gate_optional
+from obsidia_os2 import MetricsCache, compute_metrics_core_fixed
+
+
+def _world(n, seed):
+    rng = np.random.default_rng(seed)
+    W = np.triu(rng.random((n, n)), 1)
+    return W + W.T
+
+
+def test_world_changes_hit_core_changes_miss():
+    W = _world(30, 4)
+    core = [2, 4, 8, 16]
+    cache = MetricsCache()
+    m1 = cache.compute(W, core)
+    assert m1 == compute_metrics_core_fixed(W, core)
+    W[0, 1] = W[1, 0] = 0.77  # world-only
+    assert cache.compute(W.tolist(), core) == m1
+    assert (cache.hits, cache.misses) == (1, 1)
+    W[4, 8] = W[8, 4] = 0.0
+    assert cache.compute(W, core) == compute_metrics_core_fixed(W, core)
+    assert cache.compute(W, core, gamma=1.0) == compute_metrics_core_fixed(W, core, gamma=1.0)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_eviction_and_stats():
+    cache = MetricsCache(maxsize=2)
+    worlds = [_world(8, seed) for seed in range(3)]
+    core = [0, 1, 2, 3]
+    cache.compute(worlds[0], core)
+    cache.compute(worlds[1], core)
+    cache.compute(worlds[0], core)  # refresh 0
+    cache.compute(worlds[2], core)  # evicts 1
+    cache.compute(worlds[0], core)
+    cache.compute(worlds[1], core)
+    st = cache.stats()
+    assert (st["hits"], st["misses"], st["evictions"], st["size"]) == (2, 4, 2, 2)
+    assert st["hit_rate"] == pytest.approx(2 / 6)
+    with pytest.raises(ValueError):
+        MetricsCache(maxsize=0)
+
+
+def test_gate_uses_cache():
+    W = _world(20, 5)
+    core = [1, 3, 5, 7]
+    cache = MetricsCache()
+    s = structural_gate_optional(W, core, cache=cache)
+    W[0, 2] = W[2, 0] = 0.5
+    assert structural_gate_optional(W, core, cache=cache) == s == compute_metrics_core_fixed(W, core).S
+    assert cache.hits == 1
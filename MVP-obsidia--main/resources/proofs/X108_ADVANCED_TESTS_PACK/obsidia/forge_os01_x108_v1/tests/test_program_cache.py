@@ -0,0 +1,128 @@
+import pytest
+
+from obsidia_os1 import os1
+from obsidia_os1.os1 import run_request
+from obsidia_os1.program_cache import ProgramCache
+from obsidia_os1.x108 import X108Gate
+
+REQUESTS = [
+    "x = 1\ny = [1, 2]\nprint(x)",
+    {"text": "a = 3\nb = 'k'", "x108": {"time_elapsed": 5.0}},
+    {"program": [{"raw": 1}], "meta": {"m": 1}},
+    "just some text",
+]
+
+
+def _view(d):
+    return (d.decision, d.ssr, d.contract_ok, d.x108, d.os0_result)
+
+
+@pytest.mark.parametrize("raw", REQUESTS)
+def test_cached_decisions_match_uncached(raw):
+    cache = ProgramCache()
+    gate = X108Gate(min_wait_s=1.0)
+    ref = run_request(raw_input=raw, x108_gate=gate, x108_ctx={"time_elapsed": 2.0}, program_cache=None)
+    for _ in range(3):
+        got = run_request(raw_input=raw, x108_gate=gate, x108_ctx={"time_elapsed": 2.0}, program_cache=cache)
+        assert _view(got) == _view(ref)
+    assert (cache.misses, cache.raw_hits) == (1, 2)
+
+
+def test_repeated_request_skips_parse_and_validate(monkeypatch):
+    cache = ProgramCache()
+    run_request(raw_input="x = 1", program_cache=cache)
+    import obsidia_os1.program_cache as pc
+
+    def fail(*a, **kw):
+        raise AssertionError("not expected on a cache hit")
+
+    monkeypatch.setattr(pc, "parse_input", fail)
+    monkeypatch.setattr(pc, "validate_contract", fail)
+    assert run_request(raw_input="x = 1", program_cache=cache).decision == "ACT"
+    assert cache.raw_hits == 1
+
+
+def test_same_ir_from_different_raw_shares_entry():
+    cache = ProgramCache()
+    a = cache.get("x = 1")
+    b = cache.get("  x = 1\n")
+    assert b.compiled is a.compiled and (cache.misses, cache.ir_hits) == (1, 1)
+
+
+def test_contract_verdict_is_cached(monkeypatch):
+    import obsidia_os1.program_cache as pc
+
+    calls = []
+
+    def broken(program, **kw):
+        calls.append(kw)
+        raise ValueError("bad")
+
+    monkeypatch.setattr(pc, "validate_contract", broken)
+    cache = ProgramCache()
+    for _ in range(2):
+        out = run_request(raw_input="x = 2", program_cache=cache)
+        assert out.decision == "REJECT" and out.ssr == "CONTRACT_VIOLATION: ValueError: bad"
+    assert calls == [{"first": True}]  # admission: early exit
+    monkeypatch.setattr(os1, "validate_contract", broken)
+    assert run_request(raw_input="x = 2", program_cache=None).decision == "REJECT"
+    assert calls[-1] == {"first": True}
+
+
+def test_lru_eviction_and_stats():
+    cache = ProgramCache(maxsize=2)
+    for raw in ["a = 1", "b = 2", "a = 1", "c = 3", "b = 2"]:
+        cache.get(raw)
+    st = cache.stats()
+    assert (st["raw_hits"], st["misses"], st["size"]) == (1, 4, 2)
+    assert st["evictions"] == 4
+    assert os1.PROGRAM_CACHE.maxsize >= 1
+    with pytest.raises(ValueError):
+        ProgramCache(maxsize=0)
+
+
+@pytest.mark.parametrize("sandbox", [False, True])
+def test_mutating_a_result_does_not_leak_into_the_cache(sandbox):
+    from obsidia_os0.sandbox import Sandbox
+
+    cache = ProgramCache()
+    raw = "y = [1, 2]\nz = {'k': [3]}"
+    kw = lambda: {"sandbox": Sandbox()} if sandbox else {}
+    r = run_request(raw_input=raw, program_cache=cache, **kw())
+    r.os0_result["state"]["y"].append(99)
+    r.os0_result["state"]["z"]["k"].append(4)
+    again = run_request(raw_input=raw, program_cache=cache, **kw())
+    assert again.os0_result["state"] == {"y": [1, 2], "z": {"k": [3]}}
+    assert cache.raw_hits == 1
+
+
+
+def test_shared_cache_serializes_access():
+    import threading
+
+    cache = ProgramCache(maxsize=4)
+    cache.get("x = 1")
+    done = threading.Event()
+    t = threading.Thread(target=lambda: (cache.get("x = 1"), cache.get("y = 2"), done.set()))
+    with cache._lock:  # un autre thread au milieu d'un get/_evict
+        t.start()
+        assert not done.wait(0.05)
+    t.join()
+    assert done.is_set() and cache.stats()["raw_hits"] == 1
+
+    errors = []
+
+    def work(k):
+        for i in range(300):
+            out = run_request(raw_input=f"v{(i * (k + 1)) % 12} = 1", program_cache=cache)
+            if out.decision != "ACT":
+                errors.append(out.ssr)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    st = cache.stats()
+    assert errors == [] and st["size"] <= 4
+    assert st["raw_hits"] + st["ir_hits"] + st["misses"] == 3 + 4 * 300
@@ -0,0 +1,98 @@
+import pytest
+
+from obsidia_os0 import ir
+from obsidia_os0.compiled import CompiledSandbox
+from obsidia_os0.sandbox import LOG_LEVELS, ExecLog, Sandbox
+from obsidia_os1 import run_request
+
+S = ir.STATE
+
+PROGRAM = [
+    ir.TIME(1), S("x"), ir.WRITE(S("x"), ir.VALUE(0)),
+    ir.LOOP(ir.COND(("<", ir.READ(S("x")), ir.VALUE(5))), body=[
+        ir.WRITE(S("x"), ("+", ir.READ(S("x")), ir.VALUE(1))),
+        ir.CALL("pair", [ir.READ(S("x")), ir.VALUE("a")]),
+    ]),
+    ir.EVENT("done", {"k": [1, 2]}, t=2), ir.RETURN(ir.VALUE(None)),
+]
+
+
+def _run(cls, **kw):
+    sb = cls(call_registry={"pair": lambda a, b: (a, b)}, **kw)
+    sb.run(PROGRAM)
+    return sb
+
+
+@pytest.mark.parametrize("cls", [Sandbox, CompiledSandbox])
+def test_levels_share_state_and_counts(cls):
+    full = _run(cls)
+    assert full.log == _run(Sandbox).log
+    for level in LOG_LEVELS:
+        sb = _run(cls, log_level=level)
+        assert sb.state == full.state and sb._step == full._step == len(full.log)
+        assert sb.counts == (full.counts if level != "off" else {})
+        assert sb.log == (full.log if level in ("structured", "full") else [])
+    assert full.counts["COND"] == 6 and full.counts["CALL"] == 5
+
+
+def test_structured_detail_is_formatted_on_read():
+    sb = _run(Sandbox, log_level="structured")
+    rec = sb.log[-1]
+    assert rec._args is not None
+    assert rec.detail == "return VALUE(v=None)" and rec._args is None
+    assert sb.log[-2] == ExecLog(sb.log[-2].step, "EVENT", "event=done t=2 payload={'k': [1, 2]}")
+
+
+@pytest.mark.parametrize("cls", [Sandbox, CompiledSandbox])
+def test_structured_detail_is_a_snapshot(cls):
+    import threading
+
+    lock = threading.Lock()  # non copiable: formaté à l'enregistrement
+    program = [
+        S("x"), ir.WRITE(S("x"), ir.VALUE([1])),
+        ir.CALL("push", [ir.READ(S("x"))]),
+        S("l"), ir.WRITE(S("l"), ir.VALUE(lock)),
+    ]
+    logs = {}
+    for level in ("structured", "full"):
+        sb = cls(call_registry={"push": lambda xs: xs.append(2)}, log_level=level)
+        sb.run(program)
+        sb.state["x"].append(3)
+        logs[level] = [rec.detail for rec in sb.log]
+    assert logs["structured"] == logs["full"]
+    assert logs["full"][1:3] == ["x=[1]", "push([1])"]
+
+
+@pytest.mark.parametrize("cls", [Sandbox, CompiledSandbox])
+def test_no_copy_without_mutable_containers(cls, monkeypatch):
+    from obsidia_os0 import sandbox as sandbox_mod
+
+    copies = []
+    real = sandbox_mod.copy.deepcopy
+    monkeypatch.setattr(sandbox_mod.copy, "deepcopy", lambda v, *a: copies.append(v) or real(v, *a))
+    scalars = [n for n in PROGRAM if not isinstance(n, ir.EVENT)]  # payload dict : copié
+    scalars += [S("t"), ir.WRITE(S("t"), ir.VALUE((1, ("a", 2.5))))]
+    for level in ("structured", "full"):
+        sb = cls(call_registry={"pair": lambda a, b: (a, b)}, log_level=level)
+        sb.run(scalars)
+        assert sb.counts["CALL"] == 5
+    assert copies == []  # scalaires et tuples d'immuables : partagés
+    sb = cls(log_level="structured")
+    sb.run([S("u"), ir.WRITE(S("u"), ir.VALUE((1, [2])))])
+    assert sb.state["u"] == (1, [2]) and copies  # tuple contenant une liste : copié
+
+
+@pytest.mark.parametrize("cls", [Sandbox, CompiledSandbox])
+def test_ring_buffer_keeps_last_steps(cls):
+    full = _run(cls)
+    sb = _run(cls, log_capacity=4)
+    assert list(sb.log) == full.log[-4:]
+    assert sb.log[0].step == len(full.log) - 3
+
+
+def test_unknown_level_and_os1_counters():
+    with pytest.raises(ValueError):
+        Sandbox(log_level="verbose")
+    out = run_request(raw_input="x = 1\ny = 2\nnote", log_level="counters")
+    assert out.decision == "ACT" and out.os0_result["state"] == {"x": 1, "y": 2}
+    assert out.os0_result["log"] == [] and out.os0_result["counts"] == {"WRITE": 2, "EVENT": 1}
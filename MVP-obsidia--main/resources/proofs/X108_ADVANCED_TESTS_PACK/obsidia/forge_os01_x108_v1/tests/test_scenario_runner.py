@@ -0,0 +1,41 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+TOOL = Path(__file__).resolve().parents[1] / "tools" / "run_os0_os1_on_scenarios.py"
+spec = importlib.util.spec_from_file_location("run_os0_os1_on_scenarios", TOOL)
+runner = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = runner  # workers unpickle _run_chunk by module name
+spec.loader.exec_module(runner)
+
+
+def _scenarios(n):
+    base = json.loads((Path(__file__).parent / "scenarios_sample.json").read_text(encoding="utf-8"))
+    return [dict(base[i % len(base)], id=f"s{i}", time_elapsed=float(i % 150)) for i in range(n)]
+
+
+def _read_shards(summary, outdir):
+    rows = []
+    for name in summary["shards"]:
+        rows += [json.loads(l) for l in (outdir / name).read_text(encoding="utf-8").splitlines()]
+    return rows
+
+
+def test_sequential_rows():
+    rows = [runner.evaluate_scenario(sc) for sc in _scenarios(5)]
+    assert [r["decision"] for r in rows] == ["HOLD", "HOLD", "HOLD", "ACT", "ACT"]
+    assert all(r["ssr"] for r in rows) and rows[0]["x108_decision"] == "HOLD"
+
+
+def test_parallel_sharded_matches_sequential(tmp_path):
+    scenarios = _scenarios(230)
+    seq_dir, par_dir = tmp_path / "seq", tmp_path / "par"
+    seq_dir.mkdir(); par_dir.mkdir()
+    seq = runner.run_streaming(iter(scenarios), seq_dir)
+    par = runner.run_streaming(iter(scenarios), par_dir, workers=2, shard_size=100, chunk_size=16)
+    assert len(par["shards"]) == 3 and len(seq["shards"]) == 1
+    assert _read_shards(par, par_dir) == _read_shards(seq, seq_dir)
+    assert {k: v for k, v in par.items() if k != "shards"} == {k: v for k, v in seq.items() if k != "shards"}
+    assert par["total"] == 230 and sum(par["decisions"].values()) == 230
+    assert json.loads((par_dir / "summary.json").read_text(encoding="utf-8")) == par
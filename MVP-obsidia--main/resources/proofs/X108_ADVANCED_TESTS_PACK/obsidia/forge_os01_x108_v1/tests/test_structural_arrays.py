@@ -0,0 +1,79 @@
+import random
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from obsidia_structural_core.graph import AdjacencyGraph
+from obsidia_structural_core.metrics import (
+    asymmetry_weighted_degree, compute_metrics, compute_metrics_core_fixed, find_strong_triangles, submatrix,
+)
+from obsidia_os2 import metrics as os2
+
+
+def _graph(n, seed, density=0.7, symmetric=True):
+    rng = random.Random(seed)
+    W = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j and (j > i or not symmetric) and rng.random() < density:
+                W[i][j] = round(rng.random(), 2)
+                if symmetric:
+                    W[j][i] = W[i][j]
+    return W
+
+
+def _strong_triangles_loop(W, theta_T):
+    out = []
+    for i, j, k in combinations(range(len(W)), 3):
+        if W[i][j] > 0 and W[j][k] > 0 and W[k][i] > 0:
+            t = (W[i][j] + W[j][k] + W[k][i]) / 3.0
+            if t >= theta_T:
+                out.append((i, j, k, t))
+    out.sort(key=lambda t: t[3], reverse=True)
+    return out
+
+
+def _triangle_mean_loop(W, theta):
+    n = len(W)
+    ts = [(W[i][j] + W[j][k] + W[k][i]) / 3.0
+          for i in range(n) for j in range(i + 1, n) for k in range(j + 1, n)]
+    ts = [t for t in ts if t >= theta]
+    return sum(ts) / len(ts) if ts else 0.0
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_strong_triangles_match_loop(symmetric):
+    for seed in range(25):
+        W = _graph(3 + seed % 12, seed, symmetric=symmetric)
+        got = [(t.i, t.j, t.k, t.score) for t in find_strong_triangles(W, 0.5)]
+        assert got == _strong_triangles_loop(W, 0.5)
+        assert got == [(t.i, t.j, t.k, t.score) for t in find_strong_triangles(np.array(W), 0.5)]
+        assert all(type(x) in (int, float) for x in got[0]) if got else True
+
+
+def test_os2_triangle_mean_and_asymmetry_match_loop():
+    for seed in range(25):
+        W = _graph(seed % 10, seed, symmetric=seed % 2 == 0)
+        for theta in (0.0, 0.4, -1.0):
+            assert os2.triangle_mean(W, theta) == pytest.approx(_triangle_mean_loop(W, theta), abs=1e-12)
+        if W:
+            deg = [sum(row) for row in W]
+            ref = sum(abs(d - sum(deg) / len(deg)) for d in deg) / len(deg)
+            assert os2.asymmetry_weighted_degree(W) == pytest.approx(ref, abs=1e-12)
+            assert asymmetry_weighted_degree(W) == pytest.approx(ref, abs=1e-12)
+
+
+def test_list_and_array_inputs_agree():
+    W = _graph(40, 1)
+    core = list(range(0, 40, 3))
+    assert submatrix(W, core).tolist() == [[W[i][j] for j in core] for i in core]
+    assert submatrix(np.array(W), core).tolist() == submatrix(W, core).tolist()
+    assert compute_metrics_core_fixed(W, core) == compute_metrics_core_fixed(np.array(W), core)
+    assert compute_metrics(W) == compute_metrics(AdjacencyGraph(W))
+    assert os2.compute_metrics_core_fixed(W, core) == os2.compute_metrics_core_fixed(np.array(W), core)
+
+
+def test_graph_rejects_non_square():
+    with pytest.raises(ValueError):
+        AdjacencyGraph([[0.0, 1.0]])
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from obsidia_os1.os1 import structural_gate_optional
+from obsidia_os2 import StructuralState, compute_metrics_core_fixed
+from obsidia_os2.metrics import core_submatrix, triangle_mean
+
+
+def _world(n, seed):
+    rng = np.random.default_rng(seed)
+    W = np.triu(rng.random((n, n)), 1)
+    return W + W.T
+
+
+def _assert_same(state, W, core):
+    ref = compute_metrics_core_fixed(W, core)
+    got = state.metrics()
+    fields = ("T_mean", "H_score", "A_score", "S") if state.theta == 0.0 else ("H_score", "A_score")
+    for field in fields:
+        assert getattr(got, field) == pytest.approx(getattr(ref, field), abs=1e-9), field
+
+
+@pytest.mark.parametrize("theta", [0.0, 0.6])
+def test_edge_updates_track_full_recompute(theta):
+    W = _world(30, 1)
+    core = list(range(0, 30, 2))
+    state = StructuralState(W, core, theta=theta, resync_every=50)
+    rng = random.Random(theta)
+    for step in range(200):
+        i, j = rng.sample(range(30), 2)
+        w = rng.choice([0.0, rng.random()])
+        W[i, j] = W[j, i] = w
+        state.set_edge(i, j, w)
+        if step % 20 == 0:
+            _assert_same(state, W, core)
+            assert state.metrics().T_mean == pytest.approx(triangle_mean(core_submatrix(W, core), theta), abs=1e-9)
+
+
+def test_update_diffs_core_and_ignores_world():
+    W = _world(40, 2)
+    core = [1, 5, 9, 13, 17, 21]
+    state = StructuralState(W, core)
+    W[0, 2] = W[2, 0] = 0.123  # world-only
+    assert state.update(W) == 0
+    W[5, 9] = W[9, 5] = 0.9
+    W[1, 1] = 0.5              # self-loop: degree only
+    assert state.update(W) == 3
+    _assert_same(state, W, core)
+    W[np.ix_(core, core)] = 0.5  # many changes: rebuild
+    state.update(W)
+    _assert_same(state, W, core)
+
+
+def test_gate_uses_state():
+    W = _world(20, 3)
+    core = [0, 3, 6, 9, 12]
+    state = StructuralState(W, core)
+    assert structural_gate_optional(W.tolist(), core) == pytest.approx(structural_gate_optional(W, core, state=state))
+    W[3, 6] = W[6, 3] = 0.0
+    assert structural_gate_optional(W, core, state=state) == pytest.approx(compute_metrics_core_fixed(W, core).S)
+    assert structural_gate_optional(None, core) is None
+
+
+def test_nan_entries_are_not_seen_as_changed():
+    W, core = _world(12, 5), list(range(0, 12, 2))
+    W[core[0], core[1]] = W[core[1], core[0]] = np.nan
+    state = StructuralState(W, core)
+    resets = []
+    state.reset = lambda W_new: resets.append(W_new)
+    assert state.update(W.copy()) == 0
+    assert resets == []
+
+
+def test_touched_rows_match_full_diff():
+    W, core = _world(15, 6), list(range(0, 15, 2))
+    full, partial = StructuralState(W, core), StructuralState(W, core)
+    W2 = W.copy()
+    i, j, outside = core[2], core[4], next(n for n in range(len(W)) if n not in core)
+    W2[i, j] = W2[j, i] = 0.75
+    W2[outside, i] = W2[i, outside] = 0.3
+    assert partial.update(W2, touched=[i, outside]) == full.update(W2) == 2
+    assert partial.update(W2.tolist(), touched=[outside]) == 0
+    _assert_same(partial, W2, core)
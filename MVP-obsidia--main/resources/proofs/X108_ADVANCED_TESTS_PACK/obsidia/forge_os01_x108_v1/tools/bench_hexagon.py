@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark de la recherche d'hexagone (obsidia_structural_core).
+
+Graphes aléatoires denses (poids uniformes dans [0,1]) de taille croissante :
+branch-and-bound vs recherche exhaustive (petites tailles seulement). Avec les
+seuils par défaut, il faut n >= 18 pour qu'un hexagone existe ; en dessous la
+comparaison n'a pas d'objet (same=-).
+
+Usage: PYTHONPATH=src python tools/bench_hexagon.py --sizes 20 50 100 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from obsidia_structural_core.metrics import find_best_hexagon, find_best_hexagon_exhaustive
+
+
+def random_graph(n: int, seed: int):
+    rng = random.Random(seed)
+    W = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            W[i][j] = W[j][i] = rng.random()
+    return W
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 24, 34, 50, 100, 200])
+    ap.add_argument("--exhaustive-max", type=int, default=34, help="largest n for the exhaustive reference")
+    ap.add_argument("--theta-r", type=float, default=0.7)
+    ap.add_argument("--theta-a", type=float, default=0.6)
+    ap.add_argument("--lam", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=108)
+    args = ap.parse_args()
+
+    for n in args.sizes:
+        W = random_graph(n, args.seed + n)
+        strong = sum(sum(w >= args.theta_r for w in row) for row in W) / n
+        t0 = time.perf_counter()
+        hx = find_best_hexagon(W, args.theta_r, args.theta_a, args.lam)
+        dt = time.perf_counter() - t0
+        line = f"n={n:4d} strong/node={strong:5.1f}  bnb={dt * 1000:9.1f} ms  score={hx.score if hx else None}"
+        if n <= args.exhaustive_max:
+            t0 = time.perf_counter()
+            ref = find_best_hexagon_exhaustive(W, args.theta_r, args.theta_a, args.lam)
+            same = "-" if ref is None and hx is None else ref == hx
+            line += f"  exhaustive={(time.perf_counter() - t0) * 1000:9.1f} ms  same={same}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark OS0 : Sandbox (interprété) vs CompiledSandbox.
+
+Programmes à boucle LOOP de --iters itérations (compteur + accumulateur,
+avec ou sans CALL). Vérifie état/log identiques, puis affiche les nœuds
+exécutés par seconde pour chaque niveau de log (--log-levels).
+
+Usage: PYTHONPATH=src python tools/bench_sandbox.py --iters 1000 10000 --repeat 5 --log-levels full off
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from obsidia_os0 import ir
+from obsidia_os0.compiled import CompiledSandbox, compile_program
+from obsidia_os0.sandbox import LOG_LEVELS, Sandbox
+
+S = ir.STATE
+
+
+def loop_program(n: int, with_call: bool):
+    body = [
+        ir.WRITE(S("acc"), ("+", ir.READ(S("acc")), ("*", ir.READ(S("x")), ir.VALUE(2)))),
+        ir.WRITE(S("x"), ("+", ir.READ(S("x")), ir.VALUE(1))),
+    ]
+    if with_call:
+        body.append(ir.CALL("mix", [ir.READ(S("acc")), ir.READ(S("x"))]))
+    return [
+        S("x"), ir.WRITE(S("x"), ir.VALUE(0)), S("acc"), ir.WRITE(S("acc"), ir.VALUE(0)),
+        ir.LOOP(ir.COND(("<", ir.READ(S("x")), ir.VALUE(n))), body=body, max_iters=n + 1),
+    ]
+
+
+def timed(make_sb, program, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        sb = make_sb()
+        t0 = time.perf_counter()
+        sb.run(program)
+        best = min(best, time.perf_counter() - t0)
+    return best, sb
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iters", type=int, nargs="+", default=[1_000, 10_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--log-levels", nargs="+", default=list(LOG_LEVELS), choices=LOG_LEVELS)
+    args = ap.parse_args()
+    calls = {"mix": lambda a, b: a ^ b}
+
+    for n in args.iters:
+        for with_call in (False, True):
+            program = loop_program(n, with_call)
+            t0 = time.perf_counter()
+            code = compile_program(program)
+            t_compile = time.perf_counter() - t0
+            print(f"iters={n:6d} call={int(with_call)}  (compile {1e6 * t_compile:.0f} us)")
+            for level in args.log_levels:
+                t_ref, ref = timed(lambda: Sandbox(calls, log_level=level), program, args.repeat)
+                t_cmp, got = timed(lambda: CompiledSandbox(calls, log_level=level), code, args.repeat)
+                assert (got.state, got.time, list(got.log), got.counts) == (ref.state, ref.time, list(ref.log), ref.counts)
+                nodes = ref._step
+                print(f"    log={level:10s}  Sandbox={nodes / t_ref:10,.0f} nodes/s  "
+                      f"CompiledSandbox={nodes / t_cmp:10,.0f} nodes/s  x{t_ref / t_cmp:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark de compute_metrics_core_fixed (structural core et OS2).
+
+Graphe monde aléatoire de n nœuds (arêtes présentes avec probabilité
+--density, poids uniformes), Core de taille croissante.
+
+Avec --updates N : coût par requête de structural_gate_optional quand une
+arête du Core change entre deux requêtes, recalcul complet vs StructuralState,
+puis quand seule une arête du Monde change, sans cache vs MetricsCache.
+
+Usage: PYTHONPATH=src python tools/bench_structural.py --n 500 --core 12 50 100 200 --updates 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from obsidia_os1.os1 import structural_gate_optional
+from obsidia_os2 import MetricsCache, StructuralState, compute_metrics_core_fixed
+from obsidia_os2 import metrics as os2
+from obsidia_structural_core import metrics as core_metrics
+
+
+def world_graph(n: int, density: float, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    W = np.triu(rng.random((n, n)), 1)
+    W[W < 1.0 - density] = 0.0
+    return (W + W.T).tolist()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=500, help="world size")
+    ap.add_argument("--core", type=int, nargs="+", default=[12, 50, 100, 200])
+    ap.add_argument("--density", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=108)
+    ap.add_argument("--updates", type=int, default=0, help="gate requests with one core edge changed each")
+    args = ap.parse_args()
+
+    W = world_graph(args.n, args.density, args.seed)
+    for c in args.core:
+        core = list(range(0, args.n, max(1, args.n // c)))[:c]
+        t0 = time.perf_counter()
+        m = core_metrics.compute_metrics_core_fixed(W, core)
+        t1 = time.perf_counter()
+        os2.compute_metrics_core_fixed(W, core)
+        t2 = time.perf_counter()
+        print(f"n={args.n} core={c:4d}  structural_core={1000 * (t1 - t0):8.1f} ms "
+              f"({len(m.strong_triangles)} strong triangles)  os2={1000 * (t2 - t1):6.1f} ms")
+        if args.updates:
+            bench_gate(np.array(W), core, args.updates, args.seed)
+
+
+def bench_gate(W: np.ndarray, core: list, updates: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    edges = [(int(a), int(b), float(w)) for (a, b), w in
+             zip(rng.choice(core, size=(updates, 2)), rng.random(updates)) if a != b]
+    state = StructuralState(W, core)
+    full = inc = 0.0
+    for a, b, w in edges:
+        W[a, b] = W[b, a] = w
+        t0 = time.perf_counter()
+        s_full = compute_metrics_core_fixed(W, core).S
+        t1 = time.perf_counter()
+        state.set_edge(a, b, w)
+        s_inc = structural_gate_optional(state=state)
+        t2 = time.perf_counter()
+        full += t1 - t0; inc += t2 - t1
+        assert abs(s_full - s_inc) < 1e-9
+    n = max(1, len(edges))
+    print(f"    core edge  per request: full={1e6 * full / n:9.1f} us  StructuralState={1e6 * inc / n:7.1f} us")
+
+    world = [i for i in range(len(W)) if i not in set(core)]
+    cache = MetricsCache()
+    full = cached = 0.0
+    for _ in range(updates):
+        a, b = (int(x) for x in rng.choice(world, size=2, replace=False))
+        W[a, b] = W[b, a] = rng.random()
+        t0 = time.perf_counter()
+        s_full = compute_metrics_core_fixed(W, core).S
+        t1 = time.perf_counter()
+        s_cached = structural_gate_optional(W, core, cache=cache)
+        t2 = time.perf_counter()
+        full += t1 - t0; cached += t2 - t1
+        assert s_full == s_cached
+    n = max(1, updates)
+    print(f"    world edge per request: full={1e6 * full / n:9.1f} us  MetricsCache   ={1e6 * cached / n:7.1f} us"
+          f"  ({cache.hits}/{cache.hits + cache.misses} hits)")
+
+
+if __name__ == "__main__":
+    main()
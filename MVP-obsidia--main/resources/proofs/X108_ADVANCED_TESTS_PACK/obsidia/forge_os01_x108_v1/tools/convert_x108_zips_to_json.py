@@ -13,6 +13,13 @@ Sortie JSON:
 ]
 
 Ce script est volontairement robuste/heuristique: il ne suppose pas un format unique.
+
+Lecture en flux: les membres du zip sont lus via io.TextIOWrapper sur le flux
+décompressé, les lignes CSV et les éléments d'un tableau JSON sont normalisés
+au fil de l'eau et écrits aussitôt: la mémoire reste bornée quelle que soit la
+taille de l'archive. --out *.jsonl écrit un scénario par ligne; sinon le
+tableau JSON indenté ci-dessus. Avec --workers N, les zips sont convertis en
+parallèle (un fichier partiel par zip, concaténés dans l'ordre des zips).
 """
 
 from __future__ import annotations
@@ -21,12 +28,16 @@ import argparse
 import csv
 import gzip
 import io
+import itertools
 import json
 import os
 import random
 import re
+import shutil
+import tempfile
 import zipfile
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
 
 
 def _iter_zip_members(z: zipfile.ZipFile) -> Iterable[zipfile.ZipInfo]:
@@ -36,40 +47,6 @@ def _iter_zip_members(z: zipfile.ZipFile) -> Iterable[zipfile.ZipInfo]:
         yield info
 
 
-def _read_text_from_zip(z: zipfile.ZipFile, name: str, limit_bytes: int = 10_000_000) -> str:
-    with z.open(name) as f:
-        b = f.read(limit_bytes)
-    return b.decode("utf-8", errors="replace")
-
-
-def _read_json_from_zip(z: zipfile.ZipFile, name: str) -> Any:
-    txt = _read_text_from_zip(z, name)
-    return json.loads(txt)
-
-
-def _read_csv_rows_from_bytes(data: bytes, is_gz: bool) -> List[Dict[str, str]]:
-    if is_gz:
-        with gzip.GzipFile(fileobj=io.BytesIO(data)) as gf:
-            txt = gf.read().decode("utf-8", errors="replace")
-    else:
-        txt = data.decode("utf-8", errors="replace")
-
-    # auto dialect
-    sample = txt[:4096]
-    try:
-        dialect = csv.Sniffer().sniff(sample)
-    except Exception:
-        dialect = csv.excel
-
-    reader = csv.DictReader(io.StringIO(txt), dialect=dialect)
-    rows: List[Dict[str, str]] = []
-    for row in reader:
-        if row is None:
-            continue
-        rows.append({k: (v if v is not None else "") for k, v in row.items()})
-    return rows
-
-
 def _normalize_row(row: Dict[str, str], idx: int, source: str) -> Dict[str, Any]:
     # mapping tolérant des champs attendus
     def f(key_candidates: List[str], default: float) -> float:
@@ -108,8 +85,107 @@ def _normalize_row(row: Dict[str, str], idx: int, source: str) -> Dict[str, Any]
     }
 
 
-def extract_scenarios_from_zip(zip_path: str, limit: int = 1000) -> List[Dict[str, Any]]:
-    scenarios: List[Dict[str, Any]] = []
+_TRIPLE_RE = re.compile(r"\(\s*([0-9]+\.?[0-9]*)\s*,\s*([0-9]+\.?[0-9]*)\s*,\s*([0-9]+\.?[0-9]*)\s*\)")
+_CHUNK_CHARS = 1 << 20
+_SEPARATORS = re.compile(r"[ \t\r\n,]*")
+_BLANKS = re.compile(r"[ \t\r\n]*")
+
+
+def _open_text(z: zipfile.ZipFile, name: str, is_gz: bool = False) -> IO[str]:
+    raw = z.open(name)
+    if is_gz:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+
+
+def _iter_json_array(text: IO[str]) -> Iterator[Any]:
+    """Éléments d'un tableau JSON de premier niveau, décodés un à un.
+
+    Un document qui n'est pas un tableau ne produit rien (cf. "if dict, ignore").
+    """
+    dec = json.JSONDecoder()
+    buf = text.read(_CHUNK_CHARS).lstrip()
+    if not buf.startswith("["):
+        return
+    pos, eof = 1, False
+    while True:
+        # séparateurs / fin de tableau
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                break
+            buf, pos = text.read(_CHUNK_CHARS), 0
+            eof = not buf
+        if pos >= len(buf):
+            raise ValueError("JSON array not terminated")
+        if buf[pos] == "]":
+            return
+        while True:
+            try:
+                item, end = dec.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = "" if eof else text.read(_CHUNK_CHARS)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            # un nombre peut être coupé par le tampon ("1." | "25" décode 1) :
+            # l'élément n'est complet que suivi d'un séparateur ou de "]"
+            nxt = _BLANKS.match(buf, end).end()
+            if nxt < len(buf) and buf[nxt] in ",]":
+                break
+            more = "" if eof else text.read(_CHUNK_CHARS)
+            if more:
+                buf, pos = buf[pos:] + more, 0
+                continue
+            eof = True
+            if nxt < len(buf):
+                raise ValueError(f"JSON array: {buf[nxt]!r} inattendu après un élément")
+            break
+        yield item
+        # pas de copie par élément : buf[pos:] n'est recopié qu'au remplissage
+        pos = end
+
+
+def _iter_csv_rows(text: IO[str]) -> Iterator[Dict[str, str]]:
+    # dialecte détecté sur les 4096 premiers caractères (comme la version en mémoire)
+    head = text.read(4096)
+    sample = head
+    head += text.readline()
+    try:
+        dialect = csv.Sniffer().sniff(sample)
+    except Exception:
+        dialect = csv.excel
+    reader = csv.DictReader(itertools.chain(io.StringIO(head), text), dialect=dialect)
+    for row in reader:
+        if row is None:
+            continue
+        yield {k: (v if v is not None else "") for k, v in row.items()}
+
+
+def _iter_triples(text: IO[str]) -> Iterator[Tuple[str, str, str]]:
+    # regex appliquée par blocs; on garde la fin non consommée du bloc
+    buf = ""
+    while True:
+        chunk = text.read(_CHUNK_CHARS)
+        buf += chunk
+        last = 0
+        for m in _TRIPLE_RE.finditer(buf):
+            if chunk and m.end() == len(buf):
+                break  # peut continuer dans le bloc suivant
+            yield m.groups()
+            last = m.end()
+        if not chunk:
+            return
+        buf = buf[last:]
+        if len(buf) > 4096:
+            buf = buf[-4096:]
+
+
+def iter_scenarios_from_zip(zip_path: str, limit: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Scénarios d'un zip, produits au fil de la lecture (au plus `limit`)."""
+    count = 0
+    base = os.path.basename(zip_path)
 
     with zipfile.ZipFile(zip_path, "r") as z:
         members = list(_iter_zip_members(z))
@@ -118,21 +194,20 @@ def extract_scenarios_from_zip(zip_path: str, limit: int = 1000) -> List[Dict[st
         json_candidates = [m.filename for m in members if m.filename.lower().endswith(".json")]
         for name in json_candidates:
             try:
-                obj = _read_json_from_zip(z, name)
-                if isinstance(obj, list):
-                    for i, item in enumerate(obj):
+                with _open_text(z, name) as text:
+                    for i, item in enumerate(_iter_json_array(text)):
                         if isinstance(item, dict):
-                            item2 = {
+                            yield {
                                 "id": str(item.get("id", f"{name}#{i}")),
                                 "time_elapsed": float(item.get("time_elapsed", item.get("t", 0.0))),
                                 "IST": float(item.get("IST", item.get("ist", 0.0))),
                                 "CMEC": float(item.get("CMEC", item.get("cmec", 0.0))),
                                 "irreversible": bool(item.get("irreversible", True)),
-                                "raw_source": f"{os.path.basename(zip_path)}::{name}",
+                                "raw_source": f"{base}::{name}",
                             }
-                            scenarios.append(item2)
-                            if len(scenarios) >= limit:
-                                return scenarios
+                            count += 1
+                            if count >= limit:
+                                return
                 # if dict, ignore (too ambiguous)
             except Exception:
                 continue
@@ -149,41 +224,44 @@ def extract_scenarios_from_zip(zip_path: str, limit: int = 1000) -> List[Dict[st
                     csv_candidates.append((m.filename, True))
 
         for name, is_gz in csv_candidates:
+            if count >= limit:
+                return
             try:
-                with z.open(name) as f:
-                    data = f.read(20_000_000)
-                rows = _read_csv_rows_from_bytes(data, is_gz=is_gz)
-                for i, row in enumerate(rows[: max(0, limit - len(scenarios))]):
-                    scenarios.append(_normalize_row(row, i, f"{os.path.basename(zip_path)}::{name}"))
-                if len(scenarios) >= limit:
-                    return scenarios
+                with _open_text(z, name, is_gz) as text:
+                    for i, row in enumerate(_iter_csv_rows(text)):
+                        yield _normalize_row(row, i, f"{base}::{name}")
+                        count += 1
+                        if count >= limit:
+                            return
             except Exception:
                 continue
 
         # 3) Heuristique: script python qui contient une liste/dict de scénarios
         py_candidates = [m.filename for m in members if m.filename.lower().endswith(".py")]
         for name in py_candidates:
+            if count >= limit:
+                return
             try:
-                txt = _read_text_from_zip(z, name)
-                # extraction naive des tuples (time_elapsed, IST, CMEC)
-                triples = re.findall(r"\(\s*([0-9]+\.?[0-9]*)\s*,\s*([0-9]+\.?[0-9]*)\s*,\s*([0-9]+\.?[0-9]*)\s*\)", txt)
-                for i, (t, ist, cmec) in enumerate(triples[: max(0, limit - len(scenarios))]):
-                    scenarios.append(
-                        {
-                            "id": f"{os.path.basename(zip_path)}::{name}#{i}",
+                with _open_text(z, name) as text:
+                    # extraction naive des tuples (time_elapsed, IST, CMEC)
+                    for i, (t, ist, cmec) in enumerate(_iter_triples(text)):
+                        yield {
+                            "id": f"{base}::{name}#{i}",
                             "time_elapsed": float(t),
                             "IST": float(ist),
                             "CMEC": float(cmec),
                             "irreversible": True,
-                            "raw_source": f"{os.path.basename(zip_path)}::{name}",
+                            "raw_source": f"{base}::{name}",
                         }
-                    )
-                if len(scenarios) >= limit:
-                    return scenarios
+                        count += 1
+                        if count >= limit:
+                            return
             except Exception:
                 continue
 
-    return scenarios
+
+def extract_scenarios_from_zip(zip_path: str, limit: int = 1000) -> List[Dict[str, Any]]:
+    return list(iter_scenarios_from_zip(zip_path, limit=limit))
 
 
 def generate_fallback_scenarios(n: int, seed: int = 108) -> List[Dict[str, Any]]:
@@ -198,27 +276,79 @@ def generate_fallback_scenarios(n: int, seed: int = 108) -> List[Dict[str, Any]]
     return out
 
 
+class ScenarioWriter:
+    """JSONL (une ligne par scénario) ou tableau JSON indenté, écrit au fil de l'eau."""
+
+    def __init__(self, f: IO[str], jsonl: bool):
+        self.f = f
+        self.jsonl = jsonl
+        self.count = 0
+
+    def write(self, sc: Dict[str, Any]) -> None:
+        if self.jsonl:
+            self.f.write(json.dumps(sc, ensure_ascii=False) + "\n")
+        else:
+            # même texte que json.dump(liste, indent=2)
+            item = json.dumps(sc, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self.f.write(("[\n  " if self.count == 0 else ",\n  ") + item)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self.jsonl:
+            self.f.write("\n]" if self.count else "[]")
+
+
+def _convert_zip_to_part(zip_path: str, limit: int, part_path: str) -> int:
+    n = 0
+    with open(part_path, "w", encoding="utf-8") as f:
+        for sc in iter_scenarios_from_zip(zip_path, limit=limit):
+            f.write(json.dumps(sc, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+
+def convert_streaming(zips: List[str], out: str, limit: int = 1000, fallback: int = 200,
+                      workers: int = 0) -> int:
+    """Convertit les zips vers `out` (.jsonl ou tableau .json) sans tout charger en mémoire."""
+    zips = [zp for zp in zips if os.path.exists(zp)]
+    with open(out, "w", encoding="utf-8") as f:
+        writer = ScenarioWriter(f, jsonl=out.endswith(".jsonl"))
+        if workers > 0 and zips:
+            with tempfile.TemporaryDirectory() as tmp:
+                parts = [os.path.join(tmp, f"part-{i:05d}.jsonl") for i in range(len(zips))]
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    list(ex.map(_convert_zip_to_part, zips, [limit] * len(zips), parts))
+                for part in parts:
+                    with open(part, "r", encoding="utf-8") as pf:
+                        if writer.jsonl:
+                            shutil.copyfileobj(pf, f)
+                            pf.seek(0)
+                            writer.count += sum(1 for _ in pf)
+                        else:
+                            for line in pf:
+                                writer.write(json.loads(line))
+        else:
+            for zp in zips:
+                for sc in iter_scenarios_from_zip(zp, limit=limit):
+                    writer.write(sc)
+        if writer.count == 0:
+            for sc in generate_fallback_scenarios(fallback):
+                writer.write(sc)
+        writer.close()
+    return writer.count
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--zips", nargs="*", default=[], help="Paths to X108 zip packs")
     ap.add_argument("--limit", type=int, default=1000, help="Max scenarios per zip")
     ap.add_argument("--fallback", type=int, default=200, help="If nothing extracted, generate this many")
-    ap.add_argument("--out", required=True, help="Output JSON file")
+    ap.add_argument("--out", required=True, help="Output JSON file (.jsonl: one scenario per line)")
+    ap.add_argument("--workers", type=int, default=0, help="Convert zips in parallel with N processes")
     args = ap.parse_args()
 
-    scenarios: List[Dict[str, Any]] = []
-    for zp in args.zips:
-        if not os.path.exists(zp):
-            continue
-        scenarios.extend(extract_scenarios_from_zip(zp, limit=args.limit))
-
-    if not scenarios:
-        scenarios = generate_fallback_scenarios(args.fallback)
-
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(scenarios, f, ensure_ascii=False, indent=2)
-
-    print(f"Wrote {len(scenarios)} scenarios to {args.out}")
+    n = convert_streaming(args.zips, args.out, limit=args.limit, fallback=args.fallback, workers=args.workers)
+    print(f"Wrote {n} scenarios to {args.out}")
     return 0
 
 
@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 """Runner OS0↔OS1 sur des scénarios JSON.
 
-Entrée JSON = liste de scénarios comme produit par convert_x108_zips_to_json.py
+Entrée = liste JSON de scénarios comme produit par convert_x108_zips_to_json.py,
+ou fichier .jsonl (un scénario par ligne, lu en flux).
 
-Sortie:
+Sortie (mode par défaut):
 - report.json (détaillé)
 - report.csv (résumé)
+
+Sortie avec --workers N et/ou --shard-size K (flux, mémoire bornée):
+- results-00000.jsonl, results-00001.jsonl, ... (K résultats par shard),
+  écrits dans l'ordre des scénarios au fil de l'arrivée des résultats
+- results-00000.summary.json, ... (compteurs par shard)
+- summary.json (fusion des résumés de shards)
+
+Les scénarios sont envoyés aux workers par paquets de --chunk-size, avec au
+plus 4 paquets en vol par worker.
 """
 
 from __future__ import annotations
@@ -13,10 +23,16 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from obsidia_os1.os1 import run_request
+from obsidia_os1.x108 import X108Gate
+
+FIELDS = ["id", "decision", "contract_ok", "x108_decision", "wait_s", "x108_reason"]
 
 
 def _load_json(path: Path) -> List[Dict[str, Any]]:
@@ -27,49 +43,210 @@ def _load_json(path: Path) -> List[Dict[str, Any]]:
     return data
 
 
+def iter_scenarios(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix == ".jsonl":
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from _load_json(path)
+
+
+def evaluate_scenario(sc: Dict[str, Any], contract_obj: Any = None,
+                      threshold: float = 108.0, keep_ssr: bool = True) -> Dict[str, Any]:
+    dec = run_request(
+        raw_input=sc.get("text", sc.get("input_text", "noop")),
+        contract=contract_obj,
+        x108_gate=X108Gate(min_wait_s=float(sc.get("threshold", threshold))),
+        x108_ctx={
+            "time_elapsed": float(sc.get("time_elapsed", 0.0)),
+            "IST": float(sc.get("IST", 0.0)),
+            "CMEC": float(sc.get("CMEC", 0.0)),
+            "irreversible": bool(sc.get("irreversible", True)),
+        },
+        log_level="off",
+    )
+    x108 = dec.x108
+    row = {
+        "id": sc.get("id"),
+        "decision": dec.decision,
+        "contract_ok": dec.contract_ok,
+        "x108_decision": x108.decision if x108 is not None else None,
+        "wait_s": x108.wait_s if x108 is not None else None,
+        "x108_reason": x108.reason if x108 is not None else None,
+    }
+    if keep_ssr:
+        row["ssr"] = dec.ssr
+    return row
+
+
+# ---- résumé (par shard, fusionnable)
+
+def new_summary() -> Dict[str, Any]:
+    return {"total": 0, "decisions": {}, "x108": {}, "contract_ok": 0, "wait_s_max": 0.0}
+
+
+def add_to_summary(summary: Dict[str, Any], row: Dict[str, Any]) -> None:
+    summary["total"] += 1
+    summary["decisions"][row["decision"]] = summary["decisions"].get(row["decision"], 0) + 1
+    key = str(row["x108_decision"])
+    summary["x108"][key] = summary["x108"].get(key, 0) + 1
+    summary["contract_ok"] += bool(row["contract_ok"])
+    if row["wait_s"] is not None:
+        summary["wait_s_max"] = max(summary["wait_s_max"], float(row["wait_s"]))
+
+
+def merge_summaries(parts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    out = new_summary()
+    for p in parts:
+        out["total"] += p["total"]
+        out["contract_ok"] += p["contract_ok"]
+        out["wait_s_max"] = max(out["wait_s_max"], p["wait_s_max"])
+        for k in ("decisions", "x108"):
+            for name, n in p[k].items():
+                out[k][name] = out[k].get(name, 0) + n
+    return out
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    d = summary["decisions"]
+    return (f"Total: {summary['total']} | ACT: {d.get('ACT', 0)} | "
+            f"HOLD: {d.get('HOLD', 0)} | REJECT: {d.get('REJECT', 0)}")
+
+
+class ShardedJsonlWriter:
+    """Écrit des résultats JSONL en shards de `shard_size` lignes (None: un seul)."""
+
+    def __init__(self, outdir: Path, shard_size: Optional[int] = None, prefix: str = "results"):
+        self.outdir = outdir
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self.shards: List[Path] = []
+        self._f = None
+        self._n = 0
+        self._summary = new_summary()
+
+    def _open(self) -> None:
+        path = self.outdir / f"{self.prefix}-{len(self.shards):05d}.jsonl"
+        self.shards.append(path)
+        self._f = path.open("w", encoding="utf-8")
+        self._n = 0
+        self._summary = new_summary()
+
+    def _close_shard(self) -> None:
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        summary_path = self.shards[-1].with_suffix(".summary.json")
+        summary_path.write_text(json.dumps(self._summary, ensure_ascii=False), encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._f is None or (self.shard_size and self._n >= self.shard_size):
+            self._close_shard()
+            self._open()
+        self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._n += 1
+        add_to_summary(self._summary, row)
+
+    def close(self) -> Dict[str, Any]:
+        """Ferme le dernier shard et écrit summary.json fusionné depuis les shards."""
+        self._close_shard()
+        parts = [json.loads(p.with_suffix(".summary.json").read_text(encoding="utf-8")) for p in self.shards]
+        summary = merge_summaries(parts)
+        summary["shards"] = [p.name for p in self.shards]
+        (self.outdir / "summary.json").write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        return summary
+
+
+# ---- workers
+
+_worker_cfg: Dict[str, Any] = {}
+
+
+def _init_worker(contract_obj: Any, threshold: float, keep_ssr: bool) -> None:
+    _worker_cfg.update(contract_obj=contract_obj, threshold=threshold, keep_ssr=keep_ssr)
+
+
+def _run_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [evaluate_scenario(sc, **_worker_cfg) for sc in chunk]
+
+
+def _chunks(it: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_parallel(scenarios: Iterable[Dict[str, Any]], workers: int, chunk_size: int = 256,
+                 contract_obj: Any = None, threshold: float = 108.0,
+                 keep_ssr: bool = True) -> Iterator[Dict[str, Any]]:
+    """Résultats dans l'ordre des scénarios, au plus 4 paquets en vol par worker."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(contract_obj, threshold, keep_ssr)) as ex:
+        pending: deque = deque()
+        chunks = _chunks(scenarios, chunk_size)
+        for chunk in islice(chunks, 4 * workers):
+            pending.append(ex.submit(_run_chunk, chunk))
+        while pending:
+            rows = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(ex.submit(_run_chunk, chunk))
+            yield from rows
+
+
+def run_streaming(scenarios: Iterable[Dict[str, Any]], outdir: Path, workers: int = 0,
+                  shard_size: Optional[int] = None, chunk_size: int = 256,
+                  contract_obj: Any = None, threshold: float = 108.0,
+                  keep_ssr: bool = True) -> Dict[str, Any]:
+    if workers > 0:
+        rows = run_parallel(scenarios, workers, chunk_size, contract_obj, threshold, keep_ssr)
+    else:
+        rows = (evaluate_scenario(sc, contract_obj, threshold, keep_ssr) for sc in scenarios)
+    writer = ShardedJsonlWriter(outdir, shard_size)
+    for row in rows:
+        writer.write(row)
+    return writer.close()
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--scenarios", required=True, help="Path to scenarios JSON")
+    ap.add_argument("--scenarios", required=True, help="Path to scenarios JSON or JSONL")
     ap.add_argument("--outdir", default="out", help="Output directory")
     ap.add_argument("--contract", default=None, help="Optional contract JSON")
+    ap.add_argument("--threshold", type=float, default=108.0, help="X108 min wait when a scenario has none")
+    ap.add_argument("--workers", type=int, default=0, help="Process pool size (0: in-process)")
+    ap.add_argument("--chunk-size", type=int, default=256, help="Scenarios per worker task")
+    ap.add_argument("--shard-size", type=int, default=None, help="Results per JSONL shard")
+    ap.add_argument("--no-ssr", action="store_true", help="Do not keep SSR strings in the results")
     args = ap.parse_args()
 
     scenarios_path = Path(args.scenarios).resolve()
     outdir = Path(args.outdir).resolve()
     outdir.mkdir(parents=True, exist_ok=True)
 
-    scenarios = _load_json(scenarios_path)
-
     # optional contract (very small)
     contract_obj = None
     if args.contract:
         with Path(args.contract).open("r", encoding="utf-8") as f:
             contract_obj = json.load(f)
 
-    results: List[Dict[str, Any]] = []
-    for sc in scenarios:
-        req = {
-            "text": sc.get("text", "noop"),
-            "x108": {
-                "time_elapsed": float(sc.get("time_elapsed", 0.0)),
-                "IST": float(sc.get("IST", 0.0)),
-                "CMEC": float(sc.get("CMEC", 0.0)),
-                "irreversible": bool(sc.get("irreversible", True)),
-            },
-            "contract": contract_obj,
-        }
-        dec = run_request(req)
-        results.append(
-            {
-                "id": sc.get("id"),
-                "decision": dec.decision,
-                "contract_ok": dec.contract_ok,
-                "x108_decision": dec.x108.decision,
-                "wait_s": dec.x108.wait_s,
-                "x108_reason": dec.x108.reason,
-                "ssr": dec.ssr,
-            }
+    if args.workers > 0 or args.shard_size:
+        summary = run_streaming(
+            iter_scenarios(scenarios_path), outdir, workers=args.workers, shard_size=args.shard_size,
+            chunk_size=args.chunk_size, contract_obj=contract_obj, threshold=args.threshold,
+            keep_ssr=not args.no_ssr,
         )
+        print(format_summary(summary))
+        print(f"Wrote: {len(summary['shards'])} shard(s) + {outdir / 'summary.json'}")
+        return
+
+    results = [evaluate_scenario(sc, contract_obj, args.threshold, not args.no_ssr)
+               for sc in iter_scenarios(scenarios_path)]
 
     report_json = outdir / "report.json"
     report_csv = outdir / "report.csv"
@@ -78,27 +255,16 @@ def main() -> None:
         json.dump(results, f, ensure_ascii=False, indent=2)
 
     with report_csv.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "id",
-                "decision",
-                "contract_ok",
-                "x108_decision",
-                "wait_s",
-                "x108_reason",
-            ],
-        )
+        w = csv.DictWriter(f, fieldnames=FIELDS)
         w.writeheader()
         for r in results:
             w.writerow({k: r.get(k) for k in w.fieldnames})
 
     # summary to stdout
-    total = len(results)
-    act = sum(1 for r in results if r["decision"] == "ACT")
-    hold = sum(1 for r in results if r["decision"] == "HOLD")
-    rej = sum(1 for r in results if r["decision"] == "REJECT")
-    print(f"Total: {total} | ACT: {act} | HOLD: {hold} | REJECT: {rej}")
+    summary = new_summary()
+    for r in results:
+        add_to_summary(summary, r)
+    print(format_summary(summary))
     print(f"Wrote: {report_csv}")
 
 
@@ -1,8 +1,9 @@
-import json
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+from src.log_tail import DecisionStats, TailReader
+
 st.set_page_config(page_title="ERC-8004 X-108 Trading Agent", layout="wide")
 st.title("ERC-8004 X-108 Trading Agent — Dashboard (logs)")
 
@@ -11,32 +12,43 @@ decision = logs_dir/"decision_log.jsonl"
 orders = logs_dir/"orders_log.jsonl"
 roi = logs_dir/"roi_log.jsonl"
 
-def read_jsonl(p):
-    if not p.exists():
-        return pd.DataFrame()
-    rows = []
-    for line in p.read_text(encoding="utf-8").splitlines():
-        try:
-            rows.append(json.loads(line))
-        except Exception:
-            pass
-    return pd.DataFrame(rows)
+# readers live across reruns: a refresh only parses the lines appended since the last one
+@st.cache_resource
+def readers():
+    return {
+        # full history once, for exact block counts / equity
+        decision: TailReader(decision, maxlen=200, stats=DecisionStats(), history="full"),
+        roi: TailReader(roi, maxlen=200),
+        orders: TailReader(orders, maxlen=200),
+    }
+
+def read_tail(p):
+    r = readers()[p]
+    r.poll()
+    return pd.DataFrame(list(r.rows))
 
 col1, col2 = st.columns(2)
 with col1:
     st.subheader("Decisions")
-    df = read_jsonl(decision)
-    st.dataframe(df.tail(200), use_container_width=True)
+    st.dataframe(read_tail(decision), use_container_width=True)
 with col2:
     st.subheader("ROI decisions")
-    df2 = read_jsonl(roi)
-    st.dataframe(df2.tail(200), use_container_width=True)
+    st.dataframe(read_tail(roi), use_container_width=True)
 
 st.subheader("Orders")
-df3 = read_jsonl(orders)
-st.dataframe(df3.tail(200), use_container_width=True)
+st.dataframe(read_tail(orders), use_container_width=True)
+
+stats = readers()[decision].stats
+if stats.rows:
+    cols = st.columns(4)
+    cols[0].metric("Decisions", stats.rows)
+    cols[1].metric("Passed", stats.passed)
+    cols[2].metric("Equity", f"{stats.equity:.4f}" if stats.equity is not None else "-")
+    cols[3].metric("Max drawdown", f"{stats.max_drawdown:.4f}")
+    st.caption("Blocks: " + (", ".join(f"{k}={v}" for k, v in sorted(stats.blocks.items())) or "none"))
 
-# Equity curve from decision log if present
-if not df.empty and "equity" in df.columns:
+# Equity curve: points kept by the decision reader (full history, last 10k steps)
+df = pd.DataFrame(list(stats.equity_curve), columns=["step", "equity"])
+if not df.empty:
     st.subheader("Equity curve")
     st.line_chart(df.dropna(subset=["equity"]).set_index("step")["equity"])
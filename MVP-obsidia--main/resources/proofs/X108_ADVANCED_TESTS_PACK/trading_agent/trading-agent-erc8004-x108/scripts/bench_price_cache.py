@@ -0,0 +1,45 @@
+import argparse, tempfile, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import data
+from src.data import load_price_series
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default=None, help="price CSV (default: generated minute series)")
+    ap.add_argument("--years", type=float, default=2.0, help="length of the generated minute series")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.csv) if args.csv else Path(tmp) / "minutes.csv"
+        if not args.csv:
+            n = int(args.years * 365 * 24 * 60)
+            rng = np.random.default_rng(108)
+            close = 100 * np.cumprod(1 + rng.normal(0.0, 1e-4, size=n))
+            ts = pd.date_range("2024-01-01", periods=n, freq="min").strftime("%Y-%m-%dT%H:%M:%S")
+            pd.DataFrame({"timestamp": ts, "close": close}).to_csv(path, index=False)
+        cache_dir = Path(tmp) / "cache"
+
+        ref, parse_s = timed(lambda: load_price_series(path, cache=False))
+        _, build_s = timed(lambda: load_price_series(path, cache_dir=cache_dir))
+        data._loaded.clear()
+        cached, mmap_s = timed(lambda: load_price_series(path, cache_dir=cache_dir))
+        _, memo_s = timed(lambda: load_price_series(path, cache_dir=cache_dir))
+
+        print(f"rows        : {len(ref.close):,} ({path.stat().st_size / 1e6:.1f} MB CSV)")
+        print(f"pandas parse: {parse_s * 1e3:10.1f} ms")
+        print(f"cache build : {build_s * 1e3:10.1f} ms")
+        print(f"mmap load   : {mmap_s * 1e3:10.1f} ms")
+        print(f"in-process  : {memo_s * 1e3:10.3f} ms")
+        print("identical   :", np.array_equal(ref.close, cached.close) and np.array_equal(ref.returns, cached.returns))
+
+if __name__ == "__main__":
+    main()
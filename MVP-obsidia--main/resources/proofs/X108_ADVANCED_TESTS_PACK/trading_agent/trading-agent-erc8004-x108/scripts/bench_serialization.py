@@ -0,0 +1,43 @@
+import argparse, time
+
+from src.serialization import available_backends, dumps_line, dumps_pretty, set_backend
+
+def sample_record(i: int) -> dict:
+    # shaped like an orders_log line from run_backtest
+    feats = {"vol": 0.0123, "trend": 0.0004, "coherence": 0.71, "regime": "calme"}
+    projected = {"mu": 0.0021, "sigma": 0.034, "p_dd": 0.12, "p_ruin": 0.01, "cvar_95": -0.051,
+                 "n_sims": 200, "horizon": 20, "dd_threshold": 0.05, "ruin_threshold": 0.1, "dd_mean": 0.031}
+    return {
+        "ts": "2026-01-01T00:00:00+00:00",
+        "step": i,
+        "ok": True,
+        "info": {"status": "DRY_RUN_OK", "asset": "BTC"},
+        "intent": {"asset": "BTC", "side": "BUY", "amount": 0.15, "timestamp": float(i),
+                   "metadata": {"score": 0.42, "features": feats, "projected": projected, "regime": "calme"}},
+    }
+
+def bench(fn, records, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for r in records:
+            fn(r)
+    return len(records) * repeat / (time.perf_counter() - t0)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    records = [sample_record(i) for i in range(args.records)]
+    base = None
+    for name in available_backends():  # "json" first
+        set_backend(name)
+        line = bench(dumps_line, records, args.repeat)
+        pretty = bench(dumps_pretty, records[:1000], args.repeat)
+        base = base or line
+        print(f"{name:8s}: {line:12,.0f} lines/sec ({line / base:4.1f}x)  {pretty:10,.0f} artifacts/sec")
+    set_backend("auto")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse, time
+import numpy as np
+
+from src.simulation.sim_lite import sim_lite_bootstrap, sim_lite_bootstrap_loop
+
+def bench(fn, returns, n_sims, horizon, repeat, seed):
+    np.random.seed(seed)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(returns, n_sims=n_sims, horizon=horizon)
+    dt = time.perf_counter() - t0
+    return out, n_sims * repeat / dt
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n-sims", type=int, default=500)
+    ap.add_argument("--horizon", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=108)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    returns = rng.normal(0.0005, 0.01, size=1000)
+
+    ref, loop_pps = bench(sim_lite_bootstrap_loop, returns, args.n_sims, args.horizon, args.repeat, args.seed)
+    vec, vec_pps = bench(sim_lite_bootstrap, returns, args.n_sims, args.horizon, args.repeat, args.seed)
+
+    print(f"loop       : {loop_pps:12,.0f} paths/sec")
+    print(f"vectorized : {vec_pps:12,.0f} paths/sec")
+    print(f"speedup    : {vec_pps / loop_pps:.1f}x")
+    print("identical  :", ref == vec)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import argparse, json
+from pathlib import Path
+
+from src.data import load_prices_csv
+from src.backtest.sweep import run_sweep, write_leaderboard
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", required=True)
+    ap.add_argument("--config", default="config.json")
+    ap.add_argument("--spec", required=True, help="sweep spec JSON (see src/backtest/sweep.py)")
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    ap.add_argument("--sim-every", type=int, default=1)
+    ap.add_argument("--out", default="logs/sweep_leaderboard.csv", help=".csv or .parquet")
+    args = ap.parse_args()
+
+    cfg = json.loads(Path(args.config).read_text(encoding="utf-8"))
+    spec = json.loads(Path(args.spec).read_text(encoding="utf-8"))
+    close, returns = load_prices_csv(args.csv)
+
+    rows = run_sweep(returns, cfg, spec, workers=args.workers, sim_every=args.sim_every)
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    df = write_leaderboard(rows, args.out)
+
+    print(df.head(10).to_string(index=False))
+    print(f"DONE. {len(df)} runs, leaderboard written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.features.rolling import RollingFeatureExtractor
+from src.simulation.sim_lite import sim_lite_bootstrap
+from src.score.score import compute_score
+from src.gates.gate1_integrity import gate1_validate_intent
+from src.gates.gate2_x108_temporal import gate2_x108_temporal
+from src.gates.gate3_risk_killswitch import gate3_risk_kill_from_metrics, update_drawdown
+from src.roi_policy.roi import roi_init, roi_decide
+from src.execution.erc8004 import build_trade_intent
+from src.execution.dry_executor import execute_dry
+from src.utils import TraceWriter, now_iso
+
+class BacktestEngine:
+    """Linear-time backtest: every per-bar quantity is updated incrementally.
+
+    - features and the gate3 volatility come from a RollingFeatureExtractor
+    - drawdown is a running peak / max (state["equity_peak"], state["max_drawdown"])
+    - SIM-LITE runs every `sim_every` bars, and also on a regime change when
+      `sim_on_regime_change` is set; in between the last projection is reused
+    - logs go through one buffered TraceWriter for the whole run
+
+    With sim_every=1 the decisions match the original per-bar full recompute.
+    """
+
+    def __init__(
+        self,
+        cfg: dict,
+        asset: str = "BTC",
+        logs_dir: Optional[Path] = None,
+        sim_every: int = 1,
+        sim_on_regime_change: bool = False,
+        fsync: str = "never",
+    ):
+        self.cfg = cfg
+        self.asset = asset
+        self.logs_dir = Path(logs_dir) if logs_dir is not None else None
+        self.sim_every = max(1, int(sim_every))
+        self.sim_on_regime_change = bool(sim_on_regime_change)
+        self.fsync = fsync
+        self._writer: Optional[TraceWriter] = None
+
+    def _log(self, name: str, obj: dict) -> None:
+        if self._writer is not None:
+            self._writer.write(self.logs_dir / f"{name}.jsonl", obj)
+
+    def run(self, returns: np.ndarray, start: int = 60) -> dict:
+        if self.logs_dir is None:
+            return self._run(returns, start)
+        with TraceWriter(fsync=self.fsync) as writer:
+            self._writer = writer
+            try:
+                return self._run(returns, start)
+            finally:
+                self._writer = None
+
+    def _run(self, returns: np.ndarray, start: int) -> dict:
+        cfg = self.cfg
+        state = {
+            "last_invest_ts": 0.0,
+            "equity_curve": [1.0],
+            "equity_peak": 1.0,
+            "max_drawdown": 0.0,
+            "consecutive_losses": 0,
+            "cooldown_remaining": 0
+        }
+        roi = roi_init(cfg["roi"])
+        scores_window = deque(maxlen=100)
+        blocks = Counter()
+
+        equity = 1.0
+        n_sims_run = 0
+        projected = None
+        last_sim_t = None
+        last_regime = None
+
+        # fx holds returns[:t] at step t
+        start = max(0, int(start))
+        fx = RollingFeatureExtractor()
+        if start >= 1:
+            fx.extend(returns[:start - 1])
+
+        t0 = time.perf_counter()
+        for t in range(start, len(returns)):
+            # cooldown decrement
+            if state["cooldown_remaining"] > 0:
+                state["cooldown_remaining"] -= 1
+
+            feats = fx.update(returns[t - 1]) if t >= 1 else fx.features()
+
+            resim = (
+                projected is None
+                or t - last_sim_t >= self.sim_every
+                or (self.sim_on_regime_change and feats["regime"] != last_regime)
+            )
+            last_regime = feats["regime"]
+            if resim:
+                projected = sim_lite_bootstrap(
+                    returns[:t],
+                    n_sims=cfg["simulation"]["n_sims"],
+                    horizon=cfg["simulation"]["horizon"],
+                    bootstrap_window=cfg["simulation"]["bootstrap_window"],
+                    dd_threshold=cfg["score"]["dd_threshold"]
+                )
+                last_sim_t = t
+                n_sims_run += 1
+                self._log("simulation_log", {
+                    "ts": now_iso(),
+                    "step": t,
+                    "features": feats,
+                    "projected": projected
+                })
+
+            # build candidate intent (BUY if coherence high, SELL if low; minimal)
+            side = "BUY" if feats["coherence"] >= cfg["coherence_threshold"] else "SELL"
+            amount = max(0.0, roi.risk_level)  # risk_level is position sizing proxy
+            intent_candidate = {
+                "asset": self.asset,
+                "side": side,
+                "amount": float(amount),
+                "timestamp": float(t),
+                "coherence": float(feats["coherence"]),
+            }
+
+            # Gate 1
+            ok1, r1 = gate1_validate_intent(intent_candidate)
+            if not ok1:
+                blocks["gate1"] += 1
+                self._log("decision_log", {"ts": now_iso(), "step": t, "gate": 1, "pass": False, "reason": r1, "intent": intent_candidate})
+                continue
+
+            # Score
+            x_bonus = 1.0 if feats["coherence"] >= cfg["coherence_threshold"] else 0.0
+            S = compute_score(projected, feats, x_bonus, cfg["score"]["weights"], cfg["score"]["dd_threshold"])
+            scores_window.append(S)
+            mean_score = float(np.mean(scores_window)) if scores_window else 0.0
+
+            # Gate 2 (X-108 long horizon check)
+            ok2, r2 = gate2_x108_temporal(state, float(t), cfg["hold_seconds"], float(feats["coherence"]), cfg["coherence_threshold"])
+            if not ok2:
+                blocks["gate2"] += 1
+                self._log("decision_log", {"ts": now_iso(), "step": t, "gate": 2, "pass": False, "reason": r2, "score": S, "intent": intent_candidate})
+                continue
+
+            # Gate 3 (risk/kill) on running drawdown + 50-bar volatility
+            ok3, r3 = gate3_risk_kill_from_metrics(state, state["max_drawdown"], fx.regime.std(), cfg["gate3"])
+            if not ok3:
+                blocks["gate3"] += 1
+                # Roi decides safe exit on kill triggers
+                roi_action = roi_decide(roi, t, mean_score, cfg["roi"], gate3_reason=r3)
+                self._log("roi_log", {"ts": now_iso(), "step": t, "action": roi_action, "roi": roi.__dict__, "reason": r3})
+                self._log("decision_log", {"ts": now_iso(), "step": t, "gate": 3, "pass": False, "reason": r3, "score": S})
+                continue
+
+            # Roi sovereign decisions (rare)
+            roi_action = roi_decide(roi, t, mean_score, cfg["roi"])
+            if roi_action != "NOOP":
+                self._log("roi_log", {"ts": now_iso(), "step": t, "action": roi_action, "roi": roi.__dict__, "mean_score": mean_score})
+
+            if roi.safe_mode:
+                blocks["roi_safe_mode"] += 1
+                self._log("decision_log", {"ts": now_iso(), "step": t, "pass": False, "reason": "roi_safe_mode", "score": S})
+                continue
+
+            # Build ERC-8004 TradeIntent + execute (dry)
+            intent = build_trade_intent(
+                asset=intent_candidate["asset"],
+                side=intent_candidate["side"],
+                amount=intent_candidate["amount"],
+                timestamp=float(t),
+                metadata={
+                    "score": S,
+                    "features": feats,
+                    "projected": projected,
+                    "roi": roi.__dict__,
+                    "regime": feats["regime"]
+                }
+            )
+
+            ok, info = execute_dry(intent)
+            self._log("orders_log", {"ts": now_iso(), "step": t, "ok": ok, "info": info, "intent": intent})
+
+            # Update investment timestamp for X-108 gate2 (investment-level action)
+            state["last_invest_ts"] = float(t)
+
+            # Update toy PnL / equity
+            # (position sizing proxy; purely for demo curves)
+            step_ret = returns[t-1]
+            signed = (1 if intent_candidate["side"] == "BUY" else -1) * intent_candidate["amount"]
+            pnl = signed * step_ret
+            equity *= (1.0 + pnl)
+            state["equity_curve"].append(float(equity))
+            update_drawdown(state, float(equity))
+
+            if pnl < 0:
+                state["consecutive_losses"] += 1
+            else:
+                state["consecutive_losses"] = 0
+
+            self._log("decision_log", {
+                "ts": now_iso(),
+                "step": t,
+                "pass": True,
+                "score": S,
+                "roi_action": roi_action,
+                "intent_candidate": intent_candidate,
+                "equity": equity
+            })
+
+        elapsed = time.perf_counter() - t0
+        bars = max(0, len(returns) - start)
+        return {
+            "bars": bars,
+            "elapsed_s": elapsed,
+            "bars_per_sec": bars / elapsed if elapsed > 0 else 0.0,
+            "simulations": n_sims_run,
+            "trades": len(state["equity_curve"]) - 1,
+            "final_equity": float(equity),
+            "max_drawdown": float(state["max_drawdown"]),
+            "blocks": dict(blocks),
+        }
+
+def format_report(report: dict) -> str:
+    blocks = ", ".join(f"{k}={v}" for k, v in sorted(report["blocks"].items())) or "none"
+    return (
+        f"bars={report['bars']} in {report['elapsed_s']:.2f}s "
+        f"({report['bars_per_sec']:,.0f} bars/sec), simulations={report['simulations']}\n"
+        f"trades={report['trades']} final_equity={report['final_equity']:.6f} "
+        f"max_dd={report['max_drawdown']:.4f} blocks: {blocks}"
+    )
@@ -0,0 +1,141 @@
+import copy
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.backtest.engine import BacktestEngine
+
+# Sweep spec (JSON):
+# {
+#   "mode": "grid" | "random",
+#   "n_samples": 50,                      # random mode only
+#   "seed": 108,
+#   "params": {
+#     "coherence_threshold": [0.5, 0.6, 0.7],
+#     "gate3.max_drawdown": {"min": 0.05, "max": 0.15},   # random mode: uniform
+#     "roi.risk_levels": [[0.0, 0.15, 0.25], [0.0, 0.1, 0.2, 0.3]],
+#     "score.weights.w_X": [0.25, 0.5, 1.0]
+#   }
+# }
+# Keys are dotted paths into config.json.
+
+def set_path(cfg: dict, path: str, value: Any) -> None:
+    keys = path.split(".")
+    node = cfg
+    for k in keys[:-1]:
+        if k not in node:
+            raise KeyError(f"unknown config key: {path}")
+        node = node[k]
+    if keys[-1] not in node:
+        raise KeyError(f"unknown config key: {path}")
+    node[keys[-1]] = value
+
+def apply_params(cfg: dict, params: Dict[str, Any]) -> dict:
+    out = copy.deepcopy(cfg)
+    for path, value in params.items():
+        set_path(out, path, value)
+    return out
+
+def iter_param_sets(spec: dict) -> Iterator[Dict[str, Any]]:
+    params = spec["params"]
+    mode = spec.get("mode", "grid")
+    if mode == "grid":
+        keys = list(params)
+        for k in keys:
+            if not isinstance(params[k], (list, tuple)):
+                raise ValueError(f"grid mode needs a list of values for {k!r}, "
+                                 f"got {type(params[k]).__name__} (min/max ranges are random mode only)")
+        for combo in itertools.product(*(params[k] for k in keys)):
+            yield dict(zip(keys, combo))
+    elif mode == "random":
+        rng = random.Random(int(spec.get("seed", 108)))
+        for _ in range(int(spec.get("n_samples", 20))):
+            sample = {}
+            for k, dom in params.items():
+                if isinstance(dom, dict):
+                    sample[k] = rng.uniform(float(dom["min"]), float(dom["max"]))
+                else:
+                    sample[k] = rng.choice(dom)
+            yield sample
+    else:
+        raise ValueError(f"unknown sweep mode: {mode}")
+
+# ---- worker side: returns are attached once per process from shared memory
+
+_shm: Optional[shared_memory.SharedMemory] = None
+_returns: Optional[np.ndarray] = None
+
+def _attach(shm_name: str, n: int) -> None:
+    global _shm, _returns
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _returns = np.ndarray((n,), dtype=np.float64, buffer=_shm.buf)
+
+def _run_one(job: dict) -> dict:
+    np.random.seed(job["seed"])
+    cfg = apply_params(job["base_cfg"], job["params"])
+    rep = BacktestEngine(cfg, sim_every=job["sim_every"]).run(_returns)
+    row = {"job": job["job"], **job["params"]}
+    row.update({
+        "final_equity": rep["final_equity"],
+        "max_drawdown": rep["max_drawdown"],
+        "trades": rep["trades"],
+        "bars_per_sec": rep["bars_per_sec"],
+    })
+    for gate, n in rep["blocks"].items():
+        row[f"blocks_{gate}"] = n
+    return row
+
+def run_sweep(
+    returns: np.ndarray,
+    base_cfg: dict,
+    spec: dict,
+    workers: Optional[int] = None,
+    sim_every: int = 1,
+) -> List[dict]:
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    base_seed = int(spec.get("seed", 108))
+    jobs = [
+        {"job": i, "params": p, "base_cfg": base_cfg, "seed": base_seed + i, "sim_every": sim_every}
+        for i, p in enumerate(iter_param_sets(spec))
+    ]
+    for job in jobs:
+        apply_params(base_cfg, job["params"])  # fail fast on unknown keys
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, returns.nbytes))
+    try:
+        np.ndarray(returns.shape, dtype=np.float64, buffer=shm.buf)[:] = returns
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name, len(returns))) as ex:
+            rows = list(ex.map(_run_one, jobs))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    rows.sort(key=lambda r: (-r["final_equity"], r["max_drawdown"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+LEADERBOARD_COLUMNS = ["rank", "job", "final_equity", "max_drawdown", "trades", "bars_per_sec"]
+
+def write_leaderboard(rows: List[dict], out_path: str):
+    import pandas as pd
+
+    # no rows (empty grid): header only
+    df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+    block_cols = [c for c in df.columns if c.startswith("blocks_")]
+    df[block_cols] = df[block_cols].fillna(0).astype(int)
+    for col in df.columns:
+        # list-valued params (e.g. roi.risk_levels) are stored as JSON-ish strings
+        if df[col].map(lambda v: isinstance(v, (list, tuple))).any():
+            df[col] = df[col].map(str)
+    front = ["rank", "job"]
+    df = df[front + [c for c in df.columns if c not in front]]
+    if str(out_path).endswith(".parquet"):
+        df.to_parquet(out_path, index=False)
+    else:
+        df.to_csv(out_path, index=False)
+    return df
@@ -1,12 +1,179 @@
+"""Price series loading with a binary cache.
+
+The first load of a CSV parses it with pandas and stores close, simple
+returns and the other numeric / timestamp (datetime64[ns]) columns as .npy
+files under `.price_cache/` next to the CSV. Later loads memory-map them
+read-only, so the OS page cache is shared between worker processes.
+
+The cache is valid while the CSV keeps its size and mtime; if those changed,
+the SHA-256 of the content decides between reusing it and rebuilding it.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
 import pandas as pd
 import numpy as np
 
-def load_prices_csv(path: str):
-    df = pd.read_csv(path)
+CACHE_VERSION = 1
+CACHE_DIRNAME = ".price_cache"
+TIMESTAMP_COLUMNS = ("timestamp", "datetime", "date", "time", "ts")
+
+@dataclass(frozen=True)
+class PriceSeries:
+    close: np.ndarray
+    returns: np.ndarray
+    timestamp: Optional[np.ndarray] = None
+    # numeric and timestamp columns of the CSV, in file order
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(dict(self.columns))
+
+def _parse_csv(data: bytes) -> Tuple[np.ndarray, np.ndarray, Optional[str], Dict[str, np.ndarray]]:
+    df = pd.read_csv(io.BytesIO(data))
     # expects at least a 'close' column; if not present, uses last column
     if "close" not in df.columns:
         close = df.iloc[:, -1].astype(float).values
     else:
         close = df["close"].astype(float).values
     returns = np.diff(close) / close[:-1]
-    return close, returns
+
+    columns: Dict[str, np.ndarray] = {}
+    ts_name = None
+    for name in df.columns:
+        s = df[name]
+        if pd.api.types.is_numeric_dtype(s):
+            columns[str(name)] = s.to_numpy()
+        elif ts_name is None and str(name).lower() in TIMESTAMP_COLUMNS:
+            try:
+                columns[str(name)] = pd.to_datetime(s).to_numpy(dtype="datetime64[ns]")
+                ts_name = str(name)
+            except (ValueError, TypeError):
+                pass
+    return close, returns, ts_name, columns
+
+def _series(close, returns, ts_name, columns) -> PriceSeries:
+    return PriceSeries(close=close, returns=returns,
+                       timestamp=columns[ts_name] if ts_name is not None else None, columns=columns)
+
+def _cache_paths(path: Path, cache_dir: Optional[Union[str, Path]]) -> Tuple[Path, str]:
+    d = Path(cache_dir) if cache_dir is not None else path.parent / CACHE_DIRNAME
+    tag = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:8]
+    return d, f"{path.name}-{tag}"
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _replace_atomic(p: Path, write) -> None:
+    # unique temp name: concurrent builders never share a half-written file
+    fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=p.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _save(arr: np.ndarray, p: Path) -> None:
+    _replace_atomic(p, lambda f: np.save(f, arr, allow_pickle=False))
+
+def _open_cached(d: Path, stem: str, meta: dict, mmap: bool) -> Optional[PriceSeries]:
+    mode = "r" if mmap else None
+    try:
+        columns = {name: np.load(d / f"{stem}.c{i}.npy", mmap_mode=mode, allow_pickle=False)
+                   for i, name in enumerate(meta["columns"])}
+        return _series(np.load(d / f"{stem}.close.npy", mmap_mode=mode, allow_pickle=False),
+                       np.load(d / f"{stem}.returns.npy", mmap_mode=mode, allow_pickle=False),
+                       meta["timestamp"], columns)
+    except (OSError, ValueError, KeyError):
+        return None  # missing / damaged array: rebuild
+
+def _write_meta(p: Path, meta: dict) -> None:
+    _replace_atomic(p, lambda f: f.write(json.dumps(meta, indent=2).encode("utf-8")))
+
+def _build(path: Path, d: Path, stem: str) -> Tuple[dict, tuple, bool]:
+    st = path.stat()
+    data = path.read_bytes()
+    parsed = _parse_csv(data)
+    close, returns, ts_name, columns = parsed
+    meta = {
+        "version": CACHE_VERSION,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "timestamp": ts_name,
+        "columns": list(columns),
+    }
+    try:
+        d.mkdir(parents=True, exist_ok=True)
+        _save(close, d / f"{stem}.close.npy")
+        _save(returns, d / f"{stem}.returns.npy")
+        for i, arr in enumerate(columns.values()):
+            _save(arr, d / f"{stem}.c{i}.npy")
+        # meta last: it is what makes the cache valid
+        _write_meta(d / f"{stem}.meta.json", meta)
+    except OSError:
+        return meta, parsed, False  # read-only location: serve the parsed arrays
+    return meta, parsed, True
+
+# per process: (path, cache_dir, mmap) -> ((size, mtime_ns), PriceSeries)
+_loaded: Dict[tuple, Tuple[Tuple[int, int], PriceSeries]] = {}
+
+def load_price_series(path: Union[str, Path], cache: bool = True,
+                      cache_dir: Optional[Union[str, Path]] = None, mmap: bool = True) -> PriceSeries:
+    """PriceSeries of a CSV; arrays are read-only memory maps when served from the cache."""
+    path = Path(path)
+    if not cache:
+        return _series(*_parse_csv(path.read_bytes()))
+    st = path.stat()
+    sig = (st.st_size, st.st_mtime_ns)
+    key = (str(path.resolve()), str(cache_dir), mmap)
+    hit = _loaded.get(key)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+
+    d, stem = _cache_paths(path, cache_dir)
+    meta_path = d / f"{stem}.meta.json"
+    meta = None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    valid = meta is not None and meta.get("version") == CACHE_VERSION and (
+        (meta["size"], meta["mtime_ns"]) == sig
+        or (meta["size"] == st.st_size and meta["sha256"] == _sha256_file(path))
+    )
+    if valid and (meta["size"], meta["mtime_ns"]) != sig:
+        # touched but unchanged: keep the arrays, record the new mtime
+        meta["mtime_ns"] = st.st_mtime_ns
+        try:
+            _write_meta(meta_path, meta)
+        except OSError:
+            pass
+
+    series = _open_cached(d, stem, meta, mmap) if valid else None
+    if series is None:
+        meta, parsed, written = _build(path, d, stem)
+        series = _open_cached(d, stem, meta, mmap) if written and mmap else None
+        if series is None:
+            series = _series(*parsed)
+    _loaded[key] = (sig, series)
+    return series
+
+def load_prices_csv(path: str, cache: bool = True, cache_dir: Optional[Union[str, Path]] = None):
+    s = load_price_series(path, cache=cache, cache_dir=cache_dir)
+    return s.close, s.returns
@@ -0,0 +1,97 @@
+import numpy as np
+
+from src.features.features import coherence_from_vol, friction_from_vol, regime_from_z
+
+class RollingWindow:
+    """Fixed-size window with O(1) mean/std updates (sliding Welford).
+
+    Matches np.mean / np.std (ddof=0) over the last `size` values pushed.
+    The running moments are rebuilt from the buffer every `resync_every`
+    pushes so floating-point drift stays bounded on very long streams.
+    """
+
+    def __init__(self, size: int, resync_every: int = 4096):
+        self.size = int(size)
+        self.resync_every = int(resync_every)
+        self.buf = np.zeros(self.size)
+        self.pos = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_resync = 0
+
+    def push(self, x: float) -> None:
+        x = float(x)
+        if self.n == self.size:
+            old = float(self.buf[self.pos])
+            self.n -= 1
+            if self.n == 0:
+                self.mean, self.m2 = 0.0, 0.0
+            else:
+                d = old - self.mean
+                self.mean -= d / self.n
+                self.m2 -= d * (old - self.mean)
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self.resync()
+
+    def values(self) -> np.ndarray:
+        if self.n < self.size:
+            return self.buf[:self.n].copy()
+        return np.concatenate([self.buf[self.pos:], self.buf[:self.pos]])
+
+    def resync(self) -> None:
+        w = self.values()
+        self.mean = float(np.mean(w)) if len(w) else 0.0
+        self.m2 = float(np.sum((w - self.mean) ** 2)) if len(w) else 0.0
+        self._since_resync = 0
+
+    def std(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return float(np.sqrt(max(self.m2, 0.0) / self.n))
+
+class RollingFeatureExtractor:
+    """Streaming equivalent of extract_features.
+
+    After pushing returns r[0..t-1] through update(), features() equals
+    extract_features(r[:t]) within float tolerance, at O(1) cost per bar.
+    """
+
+    def __init__(self, vol_window: int = 20, regime_window: int = 50):
+        self.vol = RollingWindow(vol_window)
+        self.regime = RollingWindow(regime_window)
+        self.count = 0
+
+    def update(self, r: float) -> dict:
+        self.vol.push(r)
+        self.regime.push(r)
+        self.count += 1
+        return self.features()
+
+    def extend(self, returns: np.ndarray) -> dict:
+        for r in returns:
+            self.vol.push(r)
+            self.regime.push(r)
+        self.count += len(returns)
+        return self.features()
+
+    def features(self) -> dict:
+        vol = self.vol.std()
+        if self.count < 2:
+            regime = "unknown"
+        else:
+            regime = regime_from_z(self.regime.mean / (self.regime.std() + 1e-12))
+        return {
+            "volatility": vol,
+            "coherence": coherence_from_vol(vol),
+            "friction": friction_from_vol(vol),
+            "regime": regime,
+        }
@@ -9,11 +9,23 @@ def compute_drawdown(equity_curve):
         max_dd = max(max_dd, float(dd))
     return float(max_dd)
 
+def update_drawdown(state: dict, equity: float) -> float:
+    # O(1) running equivalent of compute_drawdown(state["equity_curve"])
+    peak = max(float(state.get("equity_peak", equity)), equity)
+    dd = max(float(state.get("max_drawdown", 0.0)), float(1.0 - equity / peak))
+    state["equity_peak"] = peak
+    state["max_drawdown"] = dd
+    return dd
+
 def gate3_risk_kill(state: dict, returns: np.ndarray, cfg: dict):
     # drawdown/vol/consecutive loss based kill
     equity = state.get("equity_curve", [1.0])
     dd = compute_drawdown(equity)
     vol = float(np.std(returns[-50:])) if len(returns) else 0.0
+    return gate3_risk_kill_from_metrics(state, dd, vol, cfg)
+
+def gate3_risk_kill_from_metrics(state: dict, dd: float, vol: float, cfg: dict):
+    # same rules as gate3_risk_kill, with drawdown/vol maintained by the caller
     consec_losses = int(state.get("consecutive_losses", 0))
     cooldown = int(state.get("cooldown_remaining", 0))
 
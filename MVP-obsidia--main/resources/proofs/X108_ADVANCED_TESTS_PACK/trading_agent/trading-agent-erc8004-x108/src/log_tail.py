@@ -0,0 +1,174 @@
+"""Incremental JSONL readers for the dashboard (tail -f style).
+
+TailReader remembers a byte offset per file: each poll() parses only the
+complete lines appended since the previous one, pushes them into a bounded
+ring of recent rows and into optional running aggregates (DecisionStats).
+Cold start reads the last N lines by seeking backwards from the end of the
+file (read_last_lines), so opening a large log costs O(N), not O(file size).
+"""
+import json
+import os
+from collections import Counter, deque
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from src.gates.gate3_risk_killswitch import update_drawdown
+
+def read_last_lines(path: Union[str, Path], n: int, block_size: int = 65536) -> Tuple[List[bytes], int]:
+    """Last n complete lines of a file (without newline) and the offset just after them.
+
+    A trailing line without newline (writer mid-flush) is not returned and
+    the offset stops before it.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        end = None
+        newlines = 0
+        while pos > 0 and (end is None or newlines <= n):
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            if end is None:
+                i = block.rfind(b"\n")
+                if i < 0:
+                    continue
+                end = pos + i + 1
+                block = block[: i + 1]
+            newlines += block.count(b"\n")
+            buf = block + buf
+    if end is None or n <= 0:
+        return [], end or 0
+    # buf ends with b"\n"; its first segment may be cut unless pos == 0
+    return buf.split(b"\n")[:-1][-n:], end
+
+class DecisionStats:
+    """Running aggregates over decision_log rows.
+
+    blocks uses the engine report keys (gate1/gate2/gate3/roi_safe_mode);
+    equity_curve keeps the last `curve_len` (step, equity) points.
+    """
+
+    def __init__(self, curve_len: int = 10000):
+        self.rows = 0
+        self.passed = 0
+        self.blocks: Counter = Counter()
+        self.reasons: Counter = Counter()
+        self.last_step = None
+        self.equity = None
+        self.dd_state: dict = {}
+        self.equity_curve: deque = deque(maxlen=curve_len)
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(self.dd_state.get("max_drawdown", 0.0))
+
+    def update(self, row: dict) -> None:
+        self.rows += 1
+        if "step" in row:
+            self.last_step = row["step"]
+        if row.get("pass"):
+            self.passed += 1
+        else:
+            gate = row.get("gate")
+            self.blocks[f"gate{gate}" if gate is not None else str(row.get("reason"))] += 1
+            if row.get("reason") is not None:
+                self.reasons[str(row["reason"])] += 1
+        equity = row.get("equity")
+        if equity is not None:
+            self.equity = float(equity)
+            update_drawdown(self.dd_state, self.equity)
+            self.equity_curve.append((row.get("step"), self.equity))
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "passed": self.passed,
+            "blocks": dict(self.blocks),
+            "last_step": self.last_step,
+            "equity": self.equity,
+            "max_drawdown": self.max_drawdown,
+        }
+
+class TailReader:
+    """Follows one JSONL file; `rows` holds the last `maxlen` parsed rows.
+
+    history="tail": cold start from the last `maxlen` lines (reverse seek);
+    aggregates then cover those lines and everything appended afterwards.
+    history="full": cold start streams the whole file once (exact aggregates).
+    A file that shrank (truncated) or was replaced (rotated: another
+    device / inode at the path, whatever its size) is read again from
+    scratch, with fresh aggregates.
+    """
+
+    HISTORY = ("tail", "full")
+
+    def __init__(self, path: Union[str, Path], maxlen: int = 200, stats: Optional[DecisionStats] = None,
+                 history: str = "tail"):
+        if history not in self.HISTORY:
+            raise ValueError(f"history must be one of {self.HISTORY}, got {history!r}")
+        self.path = Path(path)
+        self.maxlen = max(1, int(maxlen))
+        self.history = history
+        self.rows: deque = deque(maxlen=self.maxlen)
+        self.stats = stats
+        self.offset: Optional[int] = None
+        self.file_id: Optional[Tuple[int, int]] = None  # (st_dev, st_ino) of the file being followed
+        self.bad_lines = 0
+
+    def reset(self, stats: Optional[DecisionStats] = None) -> None:
+        self.rows.clear()
+        self.offset = None
+        self.file_id = None
+        self.bad_lines = 0
+        if stats is not None:
+            self.stats = stats
+        elif self.stats is not None:
+            self.stats = type(self.stats)()
+
+    def _ingest(self, line: bytes) -> bool:
+        if not line.strip():
+            return False
+        try:
+            row = json.loads(line)
+        except Exception:
+            self.bad_lines += 1
+            return False
+        if not isinstance(row, dict):
+            self.bad_lines += 1
+            return False
+        self.rows.append(row)
+        if self.stats is not None:
+            self.stats.update(row)
+        return True
+
+    def poll(self) -> int:
+        """Parse what was appended since the last poll; returns the number of new rows."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if self.offset is not None:
+                self.reset()
+            return 0
+        file_id = (st.st_dev, st.st_ino)
+        if self.offset is not None and (st.st_size < self.offset or file_id != self.file_id):
+            self.reset()
+        self.file_id = file_id
+        n = 0
+        if self.offset is None:
+            if self.history == "tail":
+                lines, self.offset = read_last_lines(self.path, self.maxlen)
+                for line in lines:
+                    n += self._ingest(line)
+            else:
+                self.offset = 0
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                n += self._ingest(line)
+        return n
@@ -0,0 +1,299 @@
+"""Columnar trace store: JSONL logs rolled into Parquet partitions.
+
+Layout under the store root (hive-style, one directory per stage and day):
+
+    stage=decision/day=2026-10-17/part-000000000000-1a2b3c4d.parquet
+    stage=roi/day=2026-10-17/part-000000004096-5e6f7a8b.parquet
+
+roll() reads only the complete lines appended to a JSONL log since the last
+roll (byte offset and file identity per log are kept in _offsets.json),
+groups them by the day of their "ts" field and writes zstd-compressed Parquet
+files named after the source offset and log path (re-rolling after a crash
+overwrites the same files).
+
+Top-level scalar fields become columns; nested values (intent, features,
+projected, ...) are stored as JSON strings. query() pushes column selection
+and filters (step range, gate, reason, pass, day) down to pyarrow.dataset, so
+only the requested columns and matching row groups / partitions are read.
+
+Requires pyarrow; HAVE_ARROW is False when it is missing.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.serialization import dumps_line
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = ds = pq = None
+
+HAVE_ARROW = pa is not None
+
+OFFSETS_FILE = "_offsets.json"
+
+def stage_of(path: Union[str, Path]) -> str:
+    """decision_log.jsonl -> "decision"."""
+    name = Path(path).name
+    if name.endswith(".jsonl"):
+        name = name[: -len(".jsonl")]
+    return name[: -len("_log")] if name.endswith("_log") else name
+
+def _day_of(record: dict) -> str:
+    ts = record.get("ts")
+    if isinstance(ts, str) and len(ts) >= 10 and ts[4] == "-" and ts[7] == "-":
+        return ts[:10]
+    return "unknown"
+
+def _flatten(record: dict) -> dict:
+    return {
+        str(k): dumps_line(v) if isinstance(v, (dict, list, tuple)) else v
+        for k, v in record.items()
+    }
+
+def _column(values: List[Any]):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+        # mixed types in one column: keep everything as text
+        return pa.array([v if v is None or isinstance(v, str) else dumps_line(v) for v in values],
+                        type=pa.string())
+
+def records_to_table(records: Sequence[dict]):
+    names: Dict[str, None] = {}
+    rows = [_flatten(r) for r in records]
+    for r in rows:
+        names.update(dict.fromkeys(r))
+    return pa.table({n: _column([r.get(n) for r in rows]) for n in names})
+
+class TraceStore:
+    def __init__(self, root: Union[str, Path], compression: str = "zstd", row_group_size: int = 65536,
+                 segment_bytes: int = 64 << 20):
+        if not HAVE_ARROW:
+            raise ImportError("TraceStore requires pyarrow (pip install pyarrow)")
+        self.root = Path(root)
+        self.compression = compression
+        self.row_group_size = int(row_group_size)
+        self.segment_bytes = max(1, int(segment_bytes))
+
+    # ---- ingestion
+
+    def _load_offsets(self) -> Dict[str, int]:
+        p = self.root / OFFSETS_FILE
+        return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+    def _save_offsets(self, offsets: Dict[str, int]) -> None:
+        p = self.root / OFFSETS_FILE
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps(offsets, indent=2), encoding="utf-8")
+        os.replace(tmp, p)
+
+    def roll(self, jsonl_path: Union[str, Path], stage: Optional[str] = None) -> int:
+        """Move the lines appended since the last roll into Parquet; returns the row count.
+
+        Lines are cut into segments of about `segment_bytes`, one Parquet file
+        per segment and day. A trailing line without newline (writer mid-flush)
+        is left for the next roll; unparsable lines are skipped like the
+        dashboard did. If the log shrank (truncated) or was replaced (rotated:
+        another (st_dev, st_ino) at the path, kept next to the offset) the
+        parts rolled from it are dropped and it is read again from the start.
+        """
+        src = Path(jsonl_path)
+        if not src.exists():
+            return 0
+        stage = stage or stage_of(src)
+        key = str(src.resolve())
+        tag = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+        offsets = self._load_offsets()
+        entry = offsets.get(key)
+        if isinstance(entry, int):  # older stores: offset only, identity unknown
+            entry = {"offset": entry, "file": None}
+
+        rows = 0
+        with src.open("rb") as f:
+            st = os.fstat(f.fileno())
+            file_id = [st.st_dev, st.st_ino]
+            start = entry["offset"] if entry else 0
+            replaced = entry is not None and entry["file"] not in (None, file_id)
+            if st.st_size < start or replaced:
+                self._drop_source(stage, tag)
+                start = 0
+                offsets[key] = {"offset": 0, "file": file_id}
+                self._save_offsets(offsets)
+            f.seek(start)
+            pos, seg_start, lines, size = start, start, [], 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                lines.append(line)
+                size += len(line)
+                pos += len(line)
+                if size >= self.segment_bytes:
+                    rows += self._write_segment(stage, seg_start, tag, lines)
+                    offsets[key] = {"offset": pos, "file": file_id}
+                    seg_start = pos
+                    self._save_offsets(offsets)
+                    lines, size = [], 0
+            if lines:
+                rows += self._write_segment(stage, seg_start, tag, lines)
+                offsets[key] = {"offset": pos, "file": file_id}
+                self._save_offsets(offsets)
+        return rows
+
+    def _drop_source(self, stage: str, tag: str) -> None:
+        for d in self._stage_dirs(stage):
+            for p in d.glob(f"day=*/part-*-{tag}.parquet"):
+                p.unlink()
+
+    def _write_segment(self, stage: str, offset: int, tag: str, lines: List[bytes]) -> int:
+        by_day: Dict[str, List[dict]] = {}
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(rec, dict):
+                by_day.setdefault(_day_of(rec), []).append(rec)
+        for day, records in by_day.items():
+            out_dir = self.root / f"stage={stage}" / f"day={day}"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            out = out_dir / f"part-{offset:012d}-{tag}.parquet"
+            tmp = out.with_suffix(".tmp")
+            pq.write_table(records_to_table(records), tmp, compression=self.compression,
+                           row_group_size=self.row_group_size)
+            os.replace(tmp, out)
+        return sum(len(r) for r in by_day.values())
+
+    def roll_logs(self, logs_dir: Union[str, Path]) -> Dict[str, int]:
+        """roll() every *.jsonl of a logs directory."""
+        return {stage_of(p): self.roll(p) for p in sorted(Path(logs_dir).glob("*.jsonl"))}
+
+    def compact(self, stage: Optional[str] = None) -> int:
+        """Merge the parts of each source log in a day partition; returns the files rewritten.
+
+        Parts of different logs are kept apart so that roll() can still drop
+        the rows of a truncated log.
+        """
+        n = 0
+        for stage_dir in self._stage_dirs(stage):
+            for day_dir in sorted(p for p in stage_dir.iterdir() if p.is_dir()):
+                by_source: Dict[str, List[Path]] = {}
+                for p in sorted(day_dir.glob("part-*.parquet")):
+                    by_source.setdefault(p.stem.rsplit("-", 1)[-1], []).append(p)
+                for parts in by_source.values():
+                    if len(parts) < 2:
+                        continue
+                    table = pa.concat_tables([pq.read_table(p) for p in parts], promote_options="permissive")
+                    # keeps the first part's name: later rolls sort after it
+                    tmp = parts[0].with_suffix(".tmp")
+                    pq.write_table(table, tmp, compression=self.compression, row_group_size=self.row_group_size)
+                    for p in parts[1:]:
+                        p.unlink()
+                    os.replace(tmp, parts[0])
+                    n += 1
+        return n
+
+    # ---- queries
+
+    def stages(self) -> List[str]:
+        return [p.name[len("stage="):] for p in self._stage_dirs(None)]
+
+    def _stage_dirs(self, stage: Optional[str]) -> List[Path]:
+        if not self.root.exists():
+            return []
+        if stage is not None:
+            d = self.root / f"stage={stage}"
+            return [d] if d.is_dir() else []
+        return sorted(p for p in self.root.glob("stage=*") if p.is_dir())
+
+    def files(self, stage: str) -> List[Path]:
+        """Parquet files of a stage, in log order (day, then source offset)."""
+        return [p for d in self._stage_dirs(stage) for p in sorted(d.glob("day=*/part-*.parquet"))]
+
+    def dataset(self, stage: str):
+        files = self.files(stage)
+        if not files:
+            return None
+        schemas = [pq.read_schema(p) for p in files]
+        schema = pa.unify_schemas(schemas + [pa.schema([("day", pa.string())])],
+                                  promote_options="permissive")
+        return ds.dataset([str(p) for p in files], schema=schema, format="parquet",
+                          partitioning=ds.partitioning(pa.schema([("day", pa.string())]), flavor="hive"),
+                          partition_base_dir=str(self.root / f"stage={stage}"))
+
+    def query(self, stage: str, columns: Optional[Iterable[str]] = None,
+              step: Optional[Tuple[Optional[int], Optional[int]]] = None,
+              gate: Any = None, reason: Any = None, passed: Optional[bool] = None,
+              days: Optional[Tuple[Optional[str], Optional[str]]] = None,
+              where: Optional[Dict[str, Any]] = None, as_table: bool = False):
+        """Rows of `stage` as a pandas DataFrame (pyarrow Table with as_table=True).
+
+        step/days are inclusive (lo, hi) ranges, either bound may be None.
+        gate, reason and where={column: value} values match one value or any
+        of a list/tuple/set. passed filters on the "pass" column (the gate
+        decision). A filter on a column the stage does not have matches nothing.
+        """
+        dset = self.dataset(stage)
+        names = set(dset.schema.names) if dset is not None else set()
+        conds: Dict[str, Any] = dict(where or {})
+        if gate is not None:
+            conds["gate"] = gate
+        if reason is not None:
+            conds["reason"] = reason
+        if passed is not None:
+            conds["pass"] = bool(passed)
+
+        cols = list(columns) if columns is not None else None
+        missing = set(conds) - names
+        if step is not None:
+            missing |= {"step"} - names
+        if dset is None or missing:
+            empty = pa.table({c: pa.array([], pa.null()) for c in (cols or sorted(names))})
+            return empty if as_table else empty.to_pandas()
+
+        expr = None
+        def _and(e):
+            nonlocal expr
+            expr = e if expr is None else expr & e
+        for name, value in conds.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                _and(ds.field(name).isin(list(value)))
+            else:
+                _and(ds.field(name) == value)
+        for name, rng in (("step", step), ("day", days)):
+            if rng is None:
+                continue
+            lo, hi = rng
+            if lo is not None:
+                _and(ds.field(name) >= lo)
+            if hi is not None:
+                _and(ds.field(name) <= hi)
+
+        if cols is not None:
+            cols = [c for c in cols if c in names]
+        table = dset.to_table(columns=cols, filter=expr)
+        return table if as_table else table.to_pandas()
+
+    def tail(self, stage: str, n: int = 200, columns: Optional[Iterable[str]] = None,
+             as_table: bool = False):
+        """Last n rows of a stage, reading files from the newest until n rows are found."""
+        dset = self.dataset(stage)
+        if dset is None or n <= 0:
+            empty = pa.table({})
+            return empty if as_table else empty.to_pandas()
+        cols = [c for c in columns if c in dset.schema.names] if columns is not None else None
+        tables, rows = [], 0
+        for frag in reversed(list(dset.get_fragments())):
+            t = frag.to_table(schema=dset.schema, columns=cols)
+            tables.append(t)
+            rows += t.num_rows
+            if rows >= n:
+                break
+        table = pa.concat_tables(reversed(tables))
+        table = table.slice(max(0, table.num_rows - n))
+        return table if as_table else table.to_pandas()
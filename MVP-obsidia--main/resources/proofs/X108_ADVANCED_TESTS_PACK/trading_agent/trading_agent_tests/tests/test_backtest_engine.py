@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Target: src/backtest/engine.py, src/gates/gate3_risk_killswitch.py
+from src.backtest import engine as engine_mod
+from src.backtest.engine import BacktestEngine
+from src.execution.dry_executor import execute_dry
+from src.execution.erc8004 import build_trade_intent
+from src.features.features import extract_features
+from src.gates.gate1_integrity import gate1_validate_intent
+from src.gates.gate2_x108_temporal import gate2_x108_temporal
+from src.gates.gate3_risk_killswitch import compute_drawdown, gate3_risk_kill, update_drawdown
+from src.roi_policy.roi import roi_decide, roi_init
+from src.score.score import compute_score
+from src.simulation.sim_lite import sim_lite_bootstrap
+
+CONFIG = Path(__file__).resolve().parents[2] / "trading-agent-erc8004-x108" / "config.json"
+
+
+def _cfg():
+    return json.loads(CONFIG.read_text(encoding="utf-8"))
+
+
+def _returns(n=400):
+    return np.random.default_rng(108).normal(0.0005, 0.01, size=n)
+
+
+def test_running_drawdown_matches_full_scan():
+    curve = list(np.cumprod(1.0 + np.random.default_rng(3).normal(0.0, 0.02, size=300)))
+    state = {}
+    for i, v in enumerate(curve):
+        dd = update_drawdown(state, float(v))
+        assert dd == compute_drawdown(curve[: i + 1])
+
+
+def test_report_is_reproducible_for_fixed_seed():
+    r = _returns()
+    np.random.seed(0)
+    a = BacktestEngine(_cfg()).run(r)
+    np.random.seed(0)
+    b = BacktestEngine(_cfg()).run(r)
+    for k in ("bars", "simulations", "trades", "final_equity", "max_drawdown", "blocks"):
+        assert a[k] == b[k]
+    assert a["bars"] == len(r) - 60
+    assert a["simulations"] == a["bars"]
+    assert a["bars_per_sec"] > 0
+
+
+def test_sim_every_k_bars():
+    r = _returns()
+    rep = BacktestEngine(_cfg(), sim_every=25).run(r)
+    assert rep["simulations"] == -(-rep["bars"] // 25)
+    rep2 = BacktestEngine(_cfg(), sim_every=25, sim_on_regime_change=True).run(r)
+    assert rep["simulations"] <= rep2["simulations"] <= rep2["bars"]
+
+
+def test_logs_written_only_when_requested(tmp_path, monkeypatch):
+    r = _returns(200)
+    monkeypatch.chdir(tmp_path)  # the scripts' default ./logs would land here
+
+    def no_writer(*a, **kw):
+        raise AssertionError("no TraceWriter without logs_dir")
+
+    with monkeypatch.context() as m:
+        m.setattr(engine_mod, "TraceWriter", no_writer)
+        BacktestEngine(_cfg()).run(r)
+    assert not list(tmp_path.iterdir())
+    BacktestEngine(_cfg(), logs_dir=tmp_path / "logs").run(r)
+    lines = (tmp_path / "logs" / "decision_log.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == len(r) - 60
+
+
+def _reference_decisions(cfg, returns, asset="BTC", start=60):
+    """decision_log rows of the original per-bar loop (scripts/run_backtest.py
+    before BacktestEngine): full feature / drawdown recompute at every bar."""
+    state = {"last_invest_ts": 0.0, "equity_curve": [1.0], "consecutive_losses": 0, "cooldown_remaining": 0}
+    roi = roi_init(cfg["roi"])
+    scores_window = deque(maxlen=100)
+    equity, rows = 1.0, []
+    for t in range(start, len(returns)):
+        if state["cooldown_remaining"] > 0:
+            state["cooldown_remaining"] -= 1
+        r_hist = returns[:t]
+        feats = extract_features(r_hist)
+        projected = sim_lite_bootstrap(r_hist, n_sims=cfg["simulation"]["n_sims"], horizon=cfg["simulation"]["horizon"],
+                                       bootstrap_window=cfg["simulation"]["bootstrap_window"],
+                                       dd_threshold=cfg["score"]["dd_threshold"])
+        side = "BUY" if feats["coherence"] >= cfg["coherence_threshold"] else "SELL"
+        cand = {"asset": asset, "side": side, "amount": float(max(0.0, roi.risk_level)),
+                "timestamp": float(t), "coherence": float(feats["coherence"])}
+        ok1, r1 = gate1_validate_intent(cand)
+        if not ok1:
+            rows.append({"step": t, "gate": 1, "pass": False, "reason": r1, "intent": cand})
+            continue
+        x_bonus = 1.0 if feats["coherence"] >= cfg["coherence_threshold"] else 0.0
+        S = compute_score(projected, feats, x_bonus, cfg["score"]["weights"], cfg["score"]["dd_threshold"])
+        scores_window.append(S)
+        mean_score = float(np.mean(scores_window))
+        ok2, r2 = gate2_x108_temporal(state, float(t), cfg["hold_seconds"], float(feats["coherence"]), cfg["coherence_threshold"])
+        if not ok2:
+            rows.append({"step": t, "gate": 2, "pass": False, "reason": r2, "score": S, "intent": cand})
+            continue
+        ok3, r3 = gate3_risk_kill(state, r_hist, cfg["gate3"])
+        if not ok3:
+            roi_decide(roi, t, mean_score, cfg["roi"], gate3_reason=r3)
+            rows.append({"step": t, "gate": 3, "pass": False, "reason": r3, "score": S})
+            continue
+        roi_action = roi_decide(roi, t, mean_score, cfg["roi"])
+        if roi.safe_mode:
+            rows.append({"step": t, "pass": False, "reason": "roi_safe_mode", "score": S})
+            continue
+        execute_dry(build_trade_intent(asset=asset, side=side, amount=cand["amount"], timestamp=float(t), metadata={}))
+        state["last_invest_ts"] = float(t)
+        pnl = (1 if side == "BUY" else -1) * cand["amount"] * returns[t - 1]
+        equity *= 1.0 + pnl
+        state["equity_curve"].append(float(equity))
+        state["consecutive_losses"] = state["consecutive_losses"] + 1 if pnl < 0 else 0
+        rows.append({"step": t, "pass": True, "score": S, "roi_action": roi_action,
+                     "intent_candidate": cand, "equity": equity})
+    return rows
+
+
+def _flat(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        out.update(_flat(v, f"{prefix}{k}.") if isinstance(v, dict) else {prefix + k: v})
+    return out
+
+
+def test_decisions_match_original_loop(tmp_path):
+    cfg = _cfg()
+    r = np.random.default_rng(0).normal(0.0, 0.01, size=600)  # trades, gate2 and gate3 blocks
+    np.random.seed(11)
+    ref = _reference_decisions(cfg, r)
+    np.random.seed(11)
+    BacktestEngine(cfg, logs_dir=tmp_path / "logs").run(r)
+    got = [json.loads(l) for l in (tmp_path / "logs" / "decision_log.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len(got) == len(ref) == len(r) - 60
+    for g, e in zip(got, ref):
+        g.pop("ts")
+        assert _flat(g) == pytest.approx(_flat(e), rel=1e-9), e["step"]
+    assert {e.get("gate", "pass" if e["pass"] else e["reason"]) for e in ref} >= {2, 3, "pass"}
+
+
+def test_start_zero_keeps_the_feature_window_causal(tmp_path):
+    cfg = _cfg()
+    r = _returns(150)
+    for start in (0, 1, 2):
+        np.random.seed(4)
+        ref = _reference_decisions(cfg, r, start=start)
+        np.random.seed(4)
+        logs = tmp_path / f"logs{start}"
+        rep = BacktestEngine(cfg, logs_dir=logs).run(r, start=start)
+        got = [json.loads(l) for l in (logs / "decision_log.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert rep["bars"] == len(got) == len(ref) == len(r) - start
+        for g, e in zip(got, ref):
+            g.pop("ts")
+            assert _flat(g) == pytest.approx(_flat(e), rel=1e-9), (start, e["step"])
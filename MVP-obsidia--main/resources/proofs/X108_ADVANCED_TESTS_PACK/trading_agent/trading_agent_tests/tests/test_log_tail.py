@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Target: src/log_tail.py
+from src.backtest.engine import BacktestEngine
+from src.log_tail import DecisionStats, TailReader, read_last_lines
+
+CONFIG = Path(__file__).resolve().parents[2] / "trading-agent-erc8004-x108" / "config.json"
+
+
+def _append(p: Path, text: str):
+    with p.open("a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _rows(lo, hi):
+    return "".join(json.dumps({"step": i}) + "\n" for i in range(lo, hi))
+
+
+@pytest.mark.parametrize("block_size", [3, 16, 65536])
+def test_read_last_lines(tmp_path, block_size):
+    p = tmp_path / "x.jsonl"
+    p.write_text(_rows(0, 50) + '{"step": 50', encoding="utf-8")
+    size_complete = len(_rows(0, 50).encode())
+    lines = [l.encode() for l in _rows(0, 50).splitlines()]
+    for n in (0, 1, 7, 50, 80):
+        got, end = read_last_lines(p, n, block_size=block_size)
+        assert got == (lines[-n:] if n else []) and end == size_complete
+    p.write_text('{"partial": 1', encoding="utf-8")
+    assert read_last_lines(p, 5, block_size=block_size) == ([], 0)
+
+
+def test_tail_reader_follows_appends(tmp_path):
+    p = tmp_path / "roi_log.jsonl"
+    p.write_text(_rows(0, 1000), encoding="utf-8")
+    r = TailReader(p, maxlen=10)
+    assert r.poll() == 10  # cold start: last 10 lines only
+    assert [row["step"] for row in r.rows] == list(range(990, 1000))
+    assert r.poll() == 0
+    _append(p, _rows(1000, 1003) + "garbage\n" + '{"step": 1003')
+    assert r.poll() == 3 and r.bad_lines == 1
+    assert [row["step"] for row in r.rows][-3:] == [1000, 1001, 1002]
+    _append(p, "}\n")
+    assert r.poll() == 1 and r.rows[-1] == {"step": 1003}
+    assert r.offset == p.stat().st_size
+
+
+def test_truncated_or_missing_file_restarts(tmp_path):
+    p = tmp_path / "orders_log.jsonl"
+    r = TailReader(p, maxlen=5, stats=DecisionStats(), history="full")
+    assert r.poll() == 0
+    p.write_text(_rows(0, 20), encoding="utf-8")
+    assert r.poll() == 20 and r.stats.rows == 20
+    p.write_text(_rows(100, 102), encoding="utf-8")
+    assert r.poll() == 2
+    assert [row["step"] for row in r.rows] == [100, 101] and r.stats.rows == 2
+    with pytest.raises(ValueError):
+        TailReader(p, history="all")
+
+
+def test_rotated_file_is_read_from_the_start(tmp_path):
+    p = tmp_path / "decision_log.jsonl"
+    p.write_text(_rows(0, 5), encoding="utf-8")
+    r = TailReader(p, maxlen=100, stats=DecisionStats(), history="full")
+    assert r.poll() == 5
+    rotated = tmp_path / "new.jsonl"
+    rotated.write_text(_rows(100, 150), encoding="utf-8")  # larger than the old offset
+    p.rename(tmp_path / "decision_log.1.jsonl")
+    rotated.rename(p)
+    assert r.poll() == 50
+    assert [row["step"] for row in r.rows] == list(range(100, 150)) and r.stats.rows == 50
+    _append(p, _rows(150, 151))
+    assert r.poll() == 1 and r.stats.rows == 51
+
+
+def test_decision_stats_match_engine_report(tmp_path):
+    cfg = json.loads(CONFIG.read_text(encoding="utf-8"))
+    returns = np.random.default_rng(3).normal(0.0, 0.01, 1500)
+    logs = tmp_path / "logs"
+    report = BacktestEngine(cfg, logs_dir=logs, sim_every=25).run(returns)
+    p = logs / "decision_log.jsonl"
+
+    r = TailReader(p, maxlen=200, stats=DecisionStats(), history="full")
+    lines = p.read_text(encoding="utf-8").splitlines()
+    # follow the log in two halves
+    half = len("\n".join(lines[: len(lines) // 2])) + 1
+    data = p.read_bytes()
+    p.write_bytes(data[:half])
+    r.poll()
+    p.write_bytes(data)
+    r.poll()
+
+    s = r.stats
+    assert s.rows == len(lines) and s.last_step == len(returns) - 1
+    assert dict(s.blocks) == report["blocks"]
+    assert s.passed == report["trades"]
+    assert s.equity == pytest.approx(report["final_equity"])
+    assert s.max_drawdown <= report["max_drawdown"] + 1e-12
+    assert [row["step"] for row in r.rows] == [json.loads(l)["step"] for l in lines[-200:]]
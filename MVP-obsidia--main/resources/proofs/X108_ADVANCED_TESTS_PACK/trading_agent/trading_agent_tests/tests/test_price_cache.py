@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Target: src/data.py
+from src import data
+from src.data import load_price_series, load_prices_csv
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memo():
+    data._loaded.clear()
+    yield
+    data._loaded.clear()
+
+
+def _csv(p, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    ts = pd.date_range("2026-01-01", periods=n, freq="h").strftime("%Y-%m-%dT%H:%M:%S")
+    pd.DataFrame({"timestamp": ts, "close": close, "volume": np.arange(n), "note": "x"}).to_csv(p, index=False)
+    return close
+
+
+def _reference(p):
+    df = pd.read_csv(p)
+    close = df["close"].astype(float).values if "close" in df.columns else df.iloc[:, -1].astype(float).values
+    return close, np.diff(close) / close[:-1]
+
+
+def test_cached_load_matches_pandas_and_is_memory_mapped(tmp_path):
+    p = tmp_path / "btc.csv"
+    _csv(p)
+    ref_close, ref_returns = _reference(p)
+
+    s1 = load_price_series(p)
+    data._loaded.clear()
+    s2 = load_price_series(p)
+    assert isinstance(s2.close, np.memmap) and not s2.close.flags.writeable
+    for s in (s1, s2):
+        assert np.array_equal(s.close, ref_close) and np.array_equal(s.returns, ref_returns)
+    assert s2.timestamp.dtype == np.dtype("datetime64[ns]") and str(s2.timestamp[1]).startswith("2026-01-01T01:00")
+    assert list(s2.columns) == ["timestamp", "close", "volume"]  # text columns are dropped
+    assert list(s2.to_frame()["volume"]) == list(range(300))
+    assert (tmp_path / ".price_cache").is_dir()
+
+    close, returns = load_prices_csv(str(p))
+    assert np.array_equal(close, ref_close) and np.array_equal(returns, ref_returns)
+    close, returns = load_prices_csv(str(p), cache=False)
+    assert np.array_equal(close, ref_close) and not isinstance(close, np.memmap)
+
+
+def test_invalidation_by_mtime_and_hash(tmp_path, monkeypatch):
+    p = tmp_path / "btc.csv"
+    _csv(p, seed=1)
+    load_price_series(p, cache_dir=tmp_path / "cache")
+    builds = []
+    real_build = data._build
+    monkeypatch.setattr(data, "_build", lambda *a: builds.append(a) or real_build(*a))
+
+    data._loaded.clear()
+    load_price_series(p, cache_dir=tmp_path / "cache")
+    assert builds == []  # same size + mtime
+
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    data._loaded.clear()
+    load_price_series(p, cache_dir=tmp_path / "cache")
+    assert builds == []  # touched, same content (hash)
+
+    new_close = _csv(p, seed=2)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    s = load_price_series(p, cache_dir=tmp_path / "cache")  # memo sees the new mtime too
+    assert len(builds) == 1
+    assert np.allclose(s.close, new_close)
+
+
+def test_last_column_fallback_and_damaged_cache(tmp_path):
+    p = tmp_path / "prices.csv"
+    p.write_text("a,price\n1,10\n2,11\n3,12.1\n", encoding="utf-8")
+    s = load_price_series(p)
+    assert s.timestamp is None and s.close.tolist() == [10.0, 11.0, 12.1]
+    for f in (tmp_path / ".price_cache").glob("*.close.npy"):
+        f.write_bytes(b"not an npy file")
+    data._loaded.clear()
+    assert load_price_series(p).close.tolist() == [10.0, 11.0, 12.1]
+
+
+def test_read_only_cache_location_falls_back(tmp_path, monkeypatch):
+    p = tmp_path / "btc.csv"
+    close = _csv(p, n=50)
+
+    def deny(*a, **k):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(data, "_save", deny)
+    s = load_price_series(p, cache_dir=tmp_path / "ro")
+    assert np.allclose(s.close, close) and not isinstance(s.close, np.memmap)
+
+
+def test_concurrent_builds_do_not_share_temp_files(tmp_path, monkeypatch):
+    import threading
+
+    p = tmp_path / "btc.csv"
+    close = _csv(p, n=2000)
+    d, stem = data._cache_paths(p, None)
+    real_save = np.save
+    gate = threading.Barrier(4)
+
+    def slow_save(f, arr, **kw):  # every builder writes the same arrays at once
+        try:
+            gate.wait(timeout=1)
+        except threading.BrokenBarrierError:
+            pass
+        real_save(f, arr, **kw)
+
+    monkeypatch.setattr(np, "save", slow_save)
+    threads = [threading.Thread(target=data._build, args=(p, d, stem)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    monkeypatch.undo()
+    assert not list(d.glob("*.tmp"))
+    s = load_price_series(p)
+    assert isinstance(s.close, np.memmap) and np.allclose(s.close, close)
+
+    def fail(f):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        data._replace_atomic(d / "x.npy", fail)
+    assert not list(d.glob("*.tmp")) and not (d / "x.npy").exists()
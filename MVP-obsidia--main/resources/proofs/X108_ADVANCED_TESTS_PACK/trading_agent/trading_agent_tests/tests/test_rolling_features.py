@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+# Target: src/features/rolling.py
+from src.features.features import extract_features
+from src.features.rolling import RollingFeatureExtractor, RollingWindow
+
+
+def _assert_same(a, b):
+    assert a["regime"] == b["regime"]
+    for k in ("volatility", "coherence", "friction"):
+        assert a[k] == pytest.approx(b[k], rel=1e-9, abs=1e-12)
+
+
+def test_matches_extract_features_every_step():
+    r = np.random.default_rng(108).normal(0.0005, 0.01, size=400)
+    fx = RollingFeatureExtractor()
+    _assert_same(fx.features(), extract_features(r[:0]))
+    for t in range(1, len(r) + 1):
+        _assert_same(fx.update(r[t - 1]), extract_features(r[:t]))
+
+
+def test_extend_then_update():
+    r = np.random.default_rng(1).normal(0.0, 0.03, size=200)
+    fx = RollingFeatureExtractor()
+    _assert_same(fx.extend(r[:59]), extract_features(r[:59]))
+    _assert_same(fx.update(r[59]), extract_features(r[:60]))
+
+
+def test_window_resync_bounds_drift():
+    r = np.random.default_rng(2).normal(1e3, 1.0, size=5000)
+    w = RollingWindow(20, resync_every=1000)
+    for x in r:
+        w.push(x)
+    assert w.mean == pytest.approx(np.mean(r[-20:]), rel=1e-12)
+    assert w.std() == pytest.approx(np.std(r[-20:]), rel=1e-6)
+    np.testing.assert_array_equal(w.values(), r[-20:])
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+# Target: src/serialization.py
+from src import serialization
+from src.serialization import available_backends, dumps_line, dumps_pretty, get_backend, set_backend
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    prev = get_backend()
+    set_backend(request.param)
+    yield request.param
+    set_backend(prev)
+
+
+def test_backends_roundtrip_records(backend):
+    rec = {
+        "ts": "2026-01-01T00:00:00+00:00",
+        "step": np.int64(61),
+        "score": np.float64(0.25),
+        "features": {"coherence": 0.7, "regime": "calme"},
+        "path": np.array([1.0, 0.5]),
+        "reason": "régime ok",
+        "big": 2 ** 70,
+    }
+    line = dumps_line(rec)
+    assert "\n" not in line
+    assert json.loads(line) == {**rec, "step": 61, "score": 0.25, "path": [1.0, 0.5]}
+    assert json.loads(dumps_pretty(rec)) == json.loads(line)
+    assert dumps_pretty({"a": 1}).startswith("{\n  ")
+
+
+def test_unsupported_objects_fall_back_to_stdlib(backend):
+    with pytest.raises(TypeError):
+        dumps_line({"x": object()})
+    assert json.loads(dumps_line({1: "int key"})) == {"1": "int key"}
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        set_backend("ujson")
+    assert "json" in available_backends()
+    assert serialization.get_backend() in available_backends()
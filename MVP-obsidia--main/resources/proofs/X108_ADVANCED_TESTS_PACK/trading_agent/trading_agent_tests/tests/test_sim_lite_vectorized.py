@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+# Target: src/simulation/sim_lite.py
+from src.simulation.sim_lite import (
+    max_drawdown_from_returns,
+    sim_lite_bootstrap,
+    sim_lite_bootstrap_loop,
+)
+
+
+def _returns(n, seed=108):
+    return np.random.default_rng(seed).normal(0.0005, 0.02, size=n)
+
+
+@pytest.mark.parametrize("n,n_sims,horizon", [(300, 200, 20), (15, 50, 20), (1, 10, 5), (500, 500, 60)])
+def test_same_output_as_loop_for_fixed_seed(n, n_sims, horizon):
+    r = _returns(n)
+    np.random.seed(7)
+    ref = sim_lite_bootstrap_loop(r, n_sims=n_sims, horizon=horizon)
+    np.random.seed(7)
+    out = sim_lite_bootstrap(r, n_sims=n_sims, horizon=horizon)
+    assert out == ref
+
+
+def test_empty_returns():
+    assert sim_lite_bootstrap(np.array([])) == sim_lite_bootstrap_loop(np.array([]))
+
+
+def test_max_drawdown_from_returns():
+    assert max_drawdown_from_returns(np.array([])) == 0.0
+    assert max_drawdown_from_returns(np.array([0.1, 0.1])) == 0.0
+    assert max_drawdown_from_returns(np.array([0.0, -0.5, 0.5])) == pytest.approx(0.5)
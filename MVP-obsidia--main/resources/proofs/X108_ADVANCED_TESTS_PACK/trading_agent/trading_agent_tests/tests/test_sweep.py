@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Target: src/backtest/sweep.py
+from src.backtest.engine import BacktestEngine
+from src.backtest.sweep import apply_params, iter_param_sets, run_sweep, write_leaderboard
+
+CONFIG = Path(__file__).resolve().parents[2] / "trading-agent-erc8004-x108" / "config.json"
+
+
+def _cfg():
+    return json.loads(CONFIG.read_text(encoding="utf-8"))
+
+
+def test_grid_and_random_param_sets():
+    grid = list(iter_param_sets({"params": {"coherence_threshold": [0.5, 0.6], "gate3.max_drawdown": [0.05, 0.1, 0.2]}}))
+    assert len(grid) == 6
+    spec = {"mode": "random", "n_samples": 5, "seed": 3, "params": {"gate3.max_drawdown": {"min": 0.0, "max": 1.0}}}
+    a, b = list(iter_param_sets(spec)), list(iter_param_sets(spec))
+    assert a == b and len(a) == 5
+    assert all(0.0 <= p["gate3.max_drawdown"] <= 1.0 for p in a)
+    with pytest.raises(ValueError, match="random mode only"):
+        list(iter_param_sets({**spec, "mode": "grid"}))
+
+
+def test_empty_leaderboard_writes_the_header(tmp_path):
+    out = tmp_path / "leaderboard.csv"
+    df = write_leaderboard([], str(out))
+    assert df.empty
+    assert out.read_text(encoding="utf-8").strip() == "rank,job,final_equity,max_drawdown,trades,bars_per_sec"
+
+
+def test_apply_params_is_a_copy_and_rejects_unknown_keys():
+    cfg = _cfg()
+    out = apply_params(cfg, {"score.weights.w_X": 2.0})
+    assert out["score"]["weights"]["w_X"] == 2.0
+    assert cfg["score"]["weights"]["w_X"] == 0.5
+    with pytest.raises(KeyError):
+        apply_params(cfg, {"gate3.nope": 1})
+
+
+def test_sweep_matches_serial_runs(tmp_path):
+    r = np.random.default_rng(108).normal(0.0005, 0.01, size=300)
+    spec = {"seed": 10, "params": {"gate3.max_drawdown": [0.005, 0.08]}}
+    rows = run_sweep(r, _cfg(), spec, workers=2, sim_every=10)
+    assert [row["rank"] for row in rows] == [1, 2]
+    for row in rows:
+        np.random.seed(10 + row["job"])
+        rep = BacktestEngine(apply_params(_cfg(), {"gate3.max_drawdown": row["gate3.max_drawdown"]}), sim_every=10).run(r)
+        assert row["final_equity"] == rep["final_equity"]
+        assert row.get("blocks_gate3", 0) == rep["blocks"].get("gate3", 0)
+
+    df = write_leaderboard(rows, str(tmp_path / "lb.csv"))
+    assert list(df.columns[:2]) == ["rank", "job"]
+    assert (tmp_path / "lb.csv").exists()
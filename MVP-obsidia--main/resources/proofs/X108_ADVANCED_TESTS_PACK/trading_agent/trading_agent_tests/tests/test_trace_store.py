@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+# Target: src/trace_store.py
+from src.trace_store import TraceStore, records_to_table, stage_of
+
+
+def _append(p: Path, records, raw: str = ""):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+        f.write(raw)
+
+
+def _decisions(lo, hi, day="2026-10-17"):
+    out = []
+    for t in range(lo, hi):
+        if t % 3 == 0:
+            out.append({"ts": f"{day}T00:00:00Z", "step": t, "pass": True, "score": 0.5, "equity": 1.0 + t})
+        else:
+            out.append({"ts": f"{day}T00:00:00Z", "step": t, "gate": 1 + t % 3, "pass": False,
+                        "reason": "x108_hold" if t % 3 == 1 else "cooldown", "intent": {"side": "BUY"}})
+    return out
+
+
+def test_stage_names_and_flattening():
+    assert stage_of("logs/decision_log.jsonl") == "decision"
+    assert stage_of("orders_log.jsonl") == "orders"
+    t = records_to_table([{"step": 1, "intent": {"a": 1}}, {"step": 2, "x": "s", "mixed": 1}, {"mixed": "a"}])
+    assert t.column_names == ["step", "intent", "x", "mixed"]
+    intent = t.column("intent").to_pylist()
+    assert json.loads(intent[0]) == {"a": 1} and intent[1:] == [None, None]
+    assert t.column("mixed").to_pylist() == [None, "1", "a"]
+
+
+def test_incremental_roll_and_partial_lines(tmp_path):
+    log = tmp_path / "logs" / "decision_log.jsonl"
+    store = TraceStore(tmp_path / "store")
+    _append(log, _decisions(0, 10), raw='{"ts": "2026-10-17", "step": 10')
+    assert store.roll(log) == 10
+    assert store.roll(log) == 0  # nothing new, the partial line waits
+    _append(log, [], raw=', "pass": true}\nnot json\n')
+    _append(log, _decisions(11, 20, day="2026-10-18"))
+    assert store.roll(log) == 10
+    df = store.query("decision")
+    assert df["step"].tolist() == list(range(20)) and set(df["day"]) == {"2026-10-17", "2026-10-18"}
+    assert len(store.files("decision")) == 3
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_segments_and_truncated_log(tmp_path, compact):
+    log = tmp_path / "roi_log.jsonl"
+    other = tmp_path / "other" / "roi_log.jsonl"  # same stage, another source
+    _append(log, [{"ts": "2026-10-17T00:00:00Z", "step": i, "action": "ADJUST_RISK"} for i in range(50)])
+    _append(other, [{"ts": "2026-10-18T00:00:00Z", "step": 1000, "action": "HOLD"}])
+    store = TraceStore(tmp_path / "store", segment_bytes=500)
+    assert store.roll(log) == 50 and store.roll(other) == 1
+    assert len(store.files("roi")) > 2
+    assert store.query("roi", columns=["step"])["step"].tolist() == list(range(50)) + [1000]
+    if compact:
+        store.compact()
+        assert len(store.files("roi")) == 2
+    log.write_text(json.dumps({"ts": "2026-10-17T00:00:00Z", "step": 0, "action": "EXIT_MARKET"}) + "\n")
+    assert store.roll(log) == 1  # file shrank: its parts are dropped, read from the start again
+    df = store.query("roi", columns=["step", "action"])
+    assert df.to_dict("records") == [{"step": 0, "action": "EXIT_MARKET"}, {"step": 1000, "action": "HOLD"}]
+
+
+def test_rotated_log_is_rolled_from_the_start(tmp_path):
+    log = tmp_path / "roi_log.jsonl"
+    _append(log, [{"ts": "2026-10-17T00:00:00Z", "step": i, "action": "OLD"} for i in range(5)])
+    store = TraceStore(tmp_path / "store")
+    assert store.roll(log) == 5
+    # rotation: a new, larger file takes the path before the next roll
+    new = tmp_path / "roi_log.new"
+    _append(new, [{"ts": "2026-10-17T00:00:00Z", "step": i, "action": "NEW"} for i in range(100, 120)])
+    log.rename(tmp_path / "roi_log.1.jsonl")
+    new.rename(log)
+    assert store.roll(log) == 20
+    df = store.query("roi", columns=["step", "action"])
+    assert df["step"].tolist() == list(range(100, 120)) and set(df["action"]) == {"NEW"}
+    assert store.roll(log) == 0
+
+
+def test_offsets_without_file_identity_are_still_read(tmp_path):
+    log = tmp_path / "decision_log.jsonl"
+    _append(log, _decisions(0, 10))
+    store = TraceStore(tmp_path / "store")
+    store.roll(log)
+    offsets_path = tmp_path / "store" / "_offsets.json"
+    offsets = json.loads(offsets_path.read_text(encoding="utf-8"))
+    offsets_path.write_text(json.dumps({k: v["offset"] for k, v in offsets.items()}), encoding="utf-8")
+    _append(log, _decisions(10, 12))
+    assert store.roll(log) == 2
+    assert store.query("decision", columns=["step"])["step"].tolist() == list(range(12))
+
+
+def test_query_filters_and_projection(tmp_path):
+    log = tmp_path / "decision_log.jsonl"
+    _append(log, _decisions(0, 300))
+    store = TraceStore(tmp_path / "store", row_group_size=32)
+    store.roll(log)
+    rows = [json.loads(l) for l in log.read_text(encoding="utf-8").splitlines()]
+
+    df = store.query("decision", columns=["step", "reason"], gate=[2, 3], step=(100, 199))
+    assert list(df.columns) == ["step", "reason"]
+    assert df["step"].tolist() == [r["step"] for r in rows if r.get("gate") in (2, 3) and 100 <= r["step"] <= 199]
+
+    df = store.query("decision", columns=["step"], reason="cooldown", passed=False, step=(None, 20))
+    assert df["step"].tolist() == [2, 5, 8, 11, 14, 17, 20]
+    assert store.query("decision", passed=True, columns=["equity"])["equity"].tolist() == \
+        [r["equity"] for r in rows if r["pass"]]
+    assert store.query("decision", where={"step": {0, 1}}, as_table=True).num_rows == 2
+    assert store.query("decision", days=("2026-10-18", None)).empty
+    assert store.query("decision", where={"no_such_column": 1}).empty
+    assert store.query("orders").empty
+
+
+def test_tail_and_compact(tmp_path):
+    log = tmp_path / "decision_log.jsonl"
+    store = TraceStore(tmp_path / "store")
+    for lo in range(0, 100, 10):
+        _append(log, _decisions(lo, lo + 10))
+        store.roll(log)
+    assert len(store.files("decision")) == 10
+    assert store.tail("decision", 15, columns=["step"])["step"].tolist() == list(range(85, 100))
+    assert store.compact() == 1
+    assert len(store.files("decision")) == 1
+    _append(log, _decisions(100, 105))
+    store.roll(log)
+    assert store.query("decision", columns=["step"])["step"].tolist() == list(range(105))
+    assert store.tail("decision", 3, columns=["step"])["step"].tolist() == [102, 103, 104]
+
+
+def test_roll_logs_directory(tmp_path):
+    logs = tmp_path / "logs"
+    _append(logs / "decision_log.jsonl", _decisions(0, 5))
+    _append(logs / "orders_log.jsonl", [{"ts": "2026-10-17T00:00:00Z", "step": 3, "ok": True, "info": {"tx": "0x"}}])
+    store = TraceStore(tmp_path / "store")
+    assert store.roll_logs(logs) == {"decision": 5, "orders": 1}
+    assert store.stages() == ["decision", "orders"]
+    assert json.loads(store.query("orders")["info"][0]) == {"tx": "0x"}
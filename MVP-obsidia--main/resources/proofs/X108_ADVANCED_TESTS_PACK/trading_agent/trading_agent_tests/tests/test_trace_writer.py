@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+# Target: src/utils.py
+from src.utils import TraceWriter
+
+
+def _lines(p):
+    return [json.loads(l) for l in p.read_text(encoding="utf-8").splitlines()] if p.exists() else []
+
+
+def test_buffers_until_batch_size(tmp_path):
+    p = tmp_path / "logs" / "decision_log.jsonl"
+    with TraceWriter(batch_size=3, flush_interval=0) as w:
+        w.write(p, {"step": 0})
+        w.write(p, {"step": 1})
+        assert _lines(p) == []
+        w.write(p, {"step": 2})
+        assert [r["step"] for r in _lines(p)] == [0, 1, 2]
+        w.write(p, {"step": 3})
+    assert [r["step"] for r in _lines(p)] == [0, 1, 2, 3]
+
+
+def test_records_are_serialized_on_write(tmp_path):
+    p = tmp_path / "roi_log.jsonl"
+    obj = {"risk_level": 0.15}
+    with TraceWriter(flush_interval=0) as w:
+        w.write(p, obj)
+        obj["risk_level"] = 0.35
+    assert _lines(p) == [{"risk_level": 0.15}]
+
+
+def test_background_flush_and_multiple_files(tmp_path):
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    w = TraceWriter(batch_size=10_000, flush_interval=0.05)
+    try:
+        w.write(a, {"x": 1})
+        w.write(b, {"y": 2})
+        deadline = time.time() + 2.0
+        while (not _lines(a) or not _lines(b)) and time.time() < deadline:
+            time.sleep(0.01)
+        assert _lines(a) == [{"x": 1}] and _lines(b) == [{"y": 2}]
+    finally:
+        w.close()
+
+
+def test_fsync_policy_and_closed_writer(tmp_path):
+    with pytest.raises(ValueError):
+        TraceWriter(fsync="always")
+    w = TraceWriter(flush_interval=0, fsync="batch")
+    w.write(tmp_path / "x.jsonl", {"k": 1})
+    w.flush()
+    w.close()
+    w.close()
+    with pytest.raises(ValueError):
+        w.write(tmp_path / "x.jsonl", {"k": 2})
+
+
+def test_write_racing_close_is_kept_or_rejected(tmp_path):
+    p = tmp_path / "decision_log.jsonl"
+    w = TraceWriter(flush_interval=0)
+    w.write(p, {"i": 0})
+    real_flush, accepted = w._flush, [0]
+
+    def flush_then_write(fsync):
+        real_flush(fsync)
+        try:  # another thread's write landing right after the final flush
+            w.write(p, {"i": 1})
+            accepted.append(1)
+        except ValueError:
+            pass
+
+    w._flush = flush_then_write
+    w.close()
+    assert [r["i"] for r in _lines(p)] == accepted
@@ -1,7 +1,8 @@
 """Domain-specific data and scenarios for different application areas."""
+import zlib
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
 DOMAIN_CONFIGS = {
     "Trading (ERC-8004)": {
@@ -124,13 +125,8 @@ def get_domain_config(domain: str) -> Dict:
     """Retourne la configuration d'un domaine."""
     return DOMAIN_CONFIGS.get(domain, DOMAIN_CONFIGS["Unified"])
 
-def generate_domain_specific_data(domain: str, seed: int = 42) -> pd.DataFrame:
-    """Génère des données synthétiques adaptées au domaine."""
-    np.random.seed(seed)
-    
-    config = get_domain_config(domain)
-    
-    # Paramètres selon le domaine
+def domain_series_params(domain: str) -> Dict[str, float]:
+    """Paramètres de la série synthétique d'un domaine (n_points, base, volatility, trend)."""
     if "Medical" in domain:
         # Données médicales: stabilité élevée, peu de volatilité
         n_points = 100
@@ -161,21 +157,84 @@ def generate_domain_specific_data(domain: str, seed: int = 42) -> pd.DataFrame:
         base = 50000.0
         volatility = 1000.0
         trend = 0.03
+    return {"n_points": n_points, "base": base, "volatility": volatility, "trend": trend}
+
+def domain_rngs(domain: str, seed: int = 42, n_streams: int = 1) -> List[np.random.Generator]:
+    """Flux aléatoires indépendants pour (domaine, seed), un par actif.
+
+    Dérivés d'un SeedSequence propre au couple (domaine, seed) : aucun état
+    global, le flux i est le même quel que soit n_streams.
+    """
+    key = zlib.crc32(domain.encode("utf-8"))
+    root = np.random.SeedSequence(seed, spawn_key=(key,))
+    return [np.random.Generator(np.random.PCG64(s)) for s in root.spawn(n_streams)]
+
+def _linear_recurrence(noise: np.ndarray, a: float, x0: float) -> np.ndarray:
+    """x_j = a * x_{j-1} + noise_j (j >= 1, axe 0), x_0 = x0.
+
+    Forme close par blocs : x_j = a^j (x_s + sum_k a^-k noise_k) depuis le
+    début s du bloc. La taille de bloc borne a^B (~1e4) pour garder la
+    précision du cumsum ; le seul parcours Python est sur les blocs.
+    """
+    n = noise.shape[0]
+    out = np.empty(noise.shape, dtype=np.float64)
+    if n == 0:
+        return out
+    growth = abs(np.log(a)) if a > 0 else 0.0
+    block = int(min(1024, max(16, np.log(1e4) / growth))) if growth > 0 else 1024
+    j = np.arange(1, block + 1, dtype=np.float64)
+    shape = (-1,) + (1,) * (noise.ndim - 1)
+    pw = (a ** j).reshape(shape)
+    inv = (a ** -j).reshape(shape)
+    x = np.full(noise.shape[1:], x0, dtype=np.float64)
+    # une tendance > 0 sur de très longues séries dépasse float64 (inf), comme la boucle
+    with np.errstate(over="ignore"):
+        for s in range(0, n, block):
+            m = min(block, n - s)
+            out[s:s + m] = pw[:m] * (x + np.cumsum(inv[:m] * noise[s:s + m], axis=0))
+            x = out[s + m - 1]
+    return out
+
+def simulate_domain_paths(n_points: int, base: float, volatility: float, trend: float,
+                          rngs: List[np.random.Generator]) -> np.ndarray:
+    """Trajectoires (n_points, len(rngs)) : price += N(trend * price, volatility).
+
+    Même récurrence que la boucle historique, calculée d'un bloc ; chaque
+    colonne tire ses chocs de son propre Generator. Le plancher 0.01 ne
+    s'applique qu'aux valeurs publiées, pas à l'état (comme avant).
+    """
+    noise = np.empty((int(n_points), len(rngs)), dtype=np.float64)
+    for i, rng in enumerate(rngs):
+        noise[:, i] = rng.standard_normal(int(n_points))
+    path = _linear_recurrence(volatility * noise, 1.0 + trend, base)
+    return np.maximum(path, 0.01)  # Éviter les valeurs négatives
+
+def generate_domain_specific_data(domain: str, seed: int = 42, n_points: Optional[int] = None,
+                                  assets: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Génère des données synthétiques adaptées au domaine.
+
+    n_points remplace la longueur par défaut du domaine. Avec assets
+    (ex. ["BTC", "ETH"]), une colonne close_<actif> par actif, chacune sur
+    son propre flux ; close reste celle du premier actif. Même (domaine,
+    seed) -> mêmes données, sans toucher à np.random global.
+    """
+    params = domain_series_params(domain)
+    n = params["n_points"] if n_points is None else int(n_points)
+    names = list(assets) if assets else []
+    rngs = domain_rngs(domain, seed, max(1, len(names)))
     
     # Générer les données
-    timestamps = pd.date_range(start='2024-01-01', periods=n_points, freq='1H')
+    timestamps = pd.date_range(start='2024-01-01', periods=n, freq='1h')
     
     # Prix avec tendance et bruit
-    prices = []
-    price = base
-    for i in range(n_points):
-        price += np.random.normal(trend * price, volatility)
-        prices.append(max(price, 0.01))  # Éviter les valeurs négatives
+    prices = simulate_domain_paths(n, params["base"], params["volatility"], params["trend"], rngs)
     
     df = pd.DataFrame({
         'timestamp': timestamps,
-        'close': prices
+        'close': prices[:, 0]
     })
+    for i, name in enumerate(names):
+        df[f"close_{name}"] = prices[:, i]
     
     return df
 
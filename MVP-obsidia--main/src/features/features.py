@@ -20,7 +20,9 @@ def regime_from_returns(returns: np.ndarray, window: int = 50) -> str:
     w = returns[-window:] if len(returns) >= window else returns
     mu = float(np.mean(w))
     vol = float(np.std(w) + 1e-12)
-    z = mu / vol
+    return regime_from_z(mu / vol)
+
+def regime_from_z(z: float) -> str:
     if z > 0.2:
         return "trend_up"
     if z < -0.2:
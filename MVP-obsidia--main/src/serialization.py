@@ -0,0 +1,103 @@
+"""JSON serialization backends for traces and artifacts.
+
+orjson or msgspec are used when installed, stdlib json otherwise. Select one
+explicitly with set_backend() or the OBSIDIA_JSON_BACKEND environment variable
+("auto", "orjson", "msgspec", "json").
+
+Fast backends may format some floats differently from stdlib (1e-05 vs
+0.00001) and write NaN as null; the output stays valid JSON. Objects a fast
+backend cannot encode fall back to stdlib for that call.
+"""
+import json
+import os
+from typing import Any, Callable, Dict
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional accelerator
+    msgspec = None
+
+def _to_builtin(obj: Any) -> Any:
+    # numpy scalars / arrays (np.float64, np.int64, ndarray, ...)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_line(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=_to_builtin)
+
+def _json_pretty(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_to_builtin)
+
+_BACKENDS: Dict[str, Dict[str, Callable[[Any], str]]] = {
+    "json": {"line": _json_line, "pretty": _json_pretty},
+}
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+
+    def _orjson_line(obj: Any) -> str:
+        return orjson.dumps(obj, default=_to_builtin, option=_ORJSON_OPTS).decode("utf-8")
+
+    def _orjson_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, default=_to_builtin, option=_ORJSON_OPTS | orjson.OPT_INDENT_2).decode("utf-8")
+
+    _BACKENDS["orjson"] = {"line": _orjson_line, "pretty": _orjson_pretty}
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_to_builtin)
+
+    def _msgspec_line(obj: Any) -> str:
+        return _msgspec_encoder.encode(obj).decode("utf-8")
+
+    def _msgspec_pretty(obj: Any) -> str:
+        return msgspec.json.format(_msgspec_encoder.encode(obj), indent=2).decode("utf-8")
+
+    _BACKENDS["msgspec"] = {"line": _msgspec_line, "pretty": _msgspec_pretty}
+
+def available_backends() -> list:
+    return list(_BACKENDS)
+
+def _auto_backend() -> str:
+    for name in ("orjson", "msgspec"):
+        if name in _BACKENDS:
+            return name
+    return "json"
+
+_backend = "json"
+
+def set_backend(name: str = "auto") -> str:
+    global _backend
+    name = _auto_backend() if name == "auto" else name
+    if name not in _BACKENDS:
+        raise ValueError(f"JSON backend {name!r} not available (have: {available_backends()})")
+    _backend = name
+    return name
+
+def get_backend() -> str:
+    return _backend
+
+def _encode(kind: str, obj: Any) -> str:
+    if _backend != "json":
+        try:
+            return _BACKENDS[_backend][kind](obj)
+        except TypeError:
+            # unsupported type / non-str key / int > 64 bits
+            # (orjson.JSONEncodeError is a TypeError subclass)
+            pass
+    return _BACKENDS["json"][kind](obj)
+
+def dumps_line(obj: Any) -> str:
+    """Compact single-line JSON (JSONL records), no trailing newline."""
+    return _encode("line", obj)
+
+def dumps_pretty(obj: Any) -> str:
+    """Indented JSON for artifacts."""
+    return _encode("pretty", obj)
+
+set_backend(os.environ.get("OBSIDIA_JSON_BACKEND", "auto"))
@@ -1,14 +1,31 @@
 import numpy as np
 
+def drawdown_paths(returns: np.ndarray) -> np.ndarray:
+    # max drawdown per path; returns is (n_paths, horizon) or (horizon,)
+    r = np.atleast_2d(np.asarray(returns, dtype=float))
+    if r.shape[1] == 0:
+        return np.zeros(r.shape[0])
+    equity = np.cumprod(1.0 + r, axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    dd = 1.0 - equity / peak
+    return np.maximum(dd.max(axis=1), 0.0)
+
 def max_drawdown_from_returns(returns: np.ndarray) -> float:
-    equity = np.cumprod(1.0 + returns)
-    peak = equity[0] if len(equity) else 1.0
-    max_dd = 0.0
-    for v in equity:
-        peak = max(peak, v)
-        dd = 1.0 - v / peak
-        max_dd = max(max_dd, float(dd))
-    return float(max_dd)
+    if len(returns) == 0:
+        return 0.0
+    return float(drawdown_paths(returns)[0])
+
+def _empty_projection(horizon: int) -> dict:
+    return {
+        "mu": 0.0, "sigma": 0.0, "p_dd": 0.0, "p_ruin": 0.0, "cvar_95": 0.0,
+        "n_sims": 0, "horizon": horizon
+    }
+
+def _cvar_95(final: np.ndarray) -> float:
+    # CVaR 95% on final returns
+    q = np.percentile(final, 5)
+    tail = final[final <= q]
+    return float(np.mean(tail)) if len(tail) else float(q)
 
 def sim_lite_bootstrap(
     returns: np.ndarray,
@@ -19,10 +36,43 @@ def sim_lite_bootstrap(
     ruin_threshold: float = 0.10
 ) -> dict:
     if len(returns) == 0:
-        return {
-            "mu": 0.0, "sigma": 0.0, "p_dd": 0.0, "p_ruin": 0.0, "cvar_95": 0.0,
-            "n_sims": 0, "horizon": horizon
-        }
+        return _empty_projection(horizon)
+
+    window = returns[-bootstrap_window:] if len(returns) >= bootstrap_window else returns
+    horizon = min(horizon, len(window))
+    sims = np.random.choice(window, size=(n_sims, horizon), replace=True)
+    cum = np.cumsum(sims, axis=1)
+    final = cum[:, -1]
+
+    # whole-matrix path metrics: one cumprod / running peak for all paths
+    dd_vals = drawdown_paths(sims)
+    p_dd = np.count_nonzero(dd_vals > dd_threshold) / n_sims
+    p_ruin = np.count_nonzero(cum.min(axis=1) < -ruin_threshold) / n_sims
+
+    return {
+        "mu": float(np.mean(final)),
+        "sigma": float(np.std(final)),
+        "p_dd": float(p_dd),
+        "p_ruin": float(p_ruin),
+        "cvar_95": _cvar_95(final),
+        "n_sims": int(n_sims),
+        "horizon": int(horizon),
+        "dd_threshold": float(dd_threshold),
+        "ruin_threshold": float(ruin_threshold),
+        "dd_mean": float(np.mean(dd_vals)) if len(dd_vals) else 0.0,
+    }
+
+def sim_lite_bootstrap_loop(
+    returns: np.ndarray,
+    n_sims: int = 200,
+    horizon: int = 20,
+    bootstrap_window: int = 200,
+    dd_threshold: float = 0.05,
+    ruin_threshold: float = 0.10
+) -> dict:
+    # reference per-path implementation (parity tests / scripts/bench_sim_lite.py)
+    if len(returns) == 0:
+        return _empty_projection(horizon)
 
     window = returns[-bootstrap_window:] if len(returns) >= bootstrap_window else returns
     horizon = min(horizon, len(window))
@@ -30,33 +80,28 @@ def sim_lite_bootstrap(
     cum = np.cumsum(sims, axis=1)
     final = cum[:, -1]
 
-    # Prob DD above threshold using path equity from returns (approx)
     p_dd = 0.0
     p_ruin = 0.0
     dd_vals = []
     for i in range(n_sims):
-        rpath = sims[i]
-        dd = max_drawdown_from_returns(rpath)
+        equity = np.cumprod(1.0 + sims[i])
+        peak = equity[0]
+        dd = 0.0
+        for v in equity:
+            peak = max(peak, v)
+            dd = max(dd, float(1.0 - v / peak))
         dd_vals.append(dd)
         if dd > dd_threshold:
             p_dd += 1.0
         if np.min(cum[i]) < -ruin_threshold:
             p_ruin += 1.0
 
-    p_dd /= n_sims
-    p_ruin /= n_sims
-
-    # CVaR 95% on final returns
-    q = np.percentile(final, 5)
-    tail = final[final <= q]
-    cvar_95 = float(np.mean(tail)) if len(tail) else float(q)
-
     return {
         "mu": float(np.mean(final)),
         "sigma": float(np.std(final)),
-        "p_dd": float(p_dd),
-        "p_ruin": float(p_ruin),
-        "cvar_95": float(cvar_95),
+        "p_dd": float(p_dd / n_sims),
+        "p_ruin": float(p_ruin / n_sims),
+        "cvar_95": _cvar_95(final),
         "n_sims": int(n_sims),
         "horizon": int(horizon),
         "dd_threshold": float(dd_threshold),
@@ -1,9 +1,14 @@
+import atexit
 import json
+import os
+import threading
 import time
 import zipfile
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from src.serialization import dumps_line, dumps_pretty
 
 def now_iso():
     return datetime.utcnow().isoformat() + "Z"
@@ -11,7 +16,111 @@ def now_iso():
 def append_jsonl(path: Path, obj: dict):
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        f.write(dumps_line(obj) + "\n")
+
+class TraceWriter:
+    """Buffered JSONL writer for hot paths (one append handle per file).
+
+    Records are serialized when write() is called, so callers may keep mutating
+    their dicts. Lines reach the files in batches: when `batch_size` records are
+    pending, every `flush_interval` seconds from a background thread (0 disables
+    it), and on flush()/close(). Per-file order is preserved.
+
+    fsync policy: "never" (leave it to the OS), "batch" (after every flush) or
+    "close" (once, when the writer is closed).
+    """
+
+    FSYNC_POLICIES = ("never", "batch", "close")
+
+    def __init__(self, batch_size: int = 512, flush_interval: float = 1.0, fsync: str = "never"):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}, got {fsync!r}")
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.fsync = fsync
+        self._lock = threading.Lock()      # guards the buffers
+        self._io_lock = threading.Lock()   # serializes flushes (keeps line order)
+        self._buffers: Dict[Path, List[str]] = {}
+        self._pending = 0
+        self._handles = {}
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if self.flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, path: Path, obj: dict) -> None:
+        line = dumps_line(obj) + "\n"
+        with self._lock:
+            if self._closed:
+                raise ValueError("TraceWriter is closed")
+            self._buffers.setdefault(Path(path), []).append(line)
+            self._pending += 1
+            full = self._pending >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        self._flush(self.fsync == "batch")
+
+    def close(self) -> None:
+        # closed first: a write() either lands before this (and is in the
+        # final flush) or raises, none is buffered after the last flush
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._flush(self.fsync in ("batch", "close"))
+        with self._io_lock:
+            for f in self._handles.values():
+                f.close()
+            self._handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _flush(self, fsync: bool) -> None:
+        with self._io_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                self._pending = 0
+            for path, lines in buffers.items():
+                f = self._handles.get(path)
+                if f is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    f = self._handles[path] = path.open("a", encoding="utf-8")
+                f.write("".join(lines))
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+_trace_writer: Optional[TraceWriter] = None
+_trace_writer_lock = threading.Lock()
+
+def get_trace_writer() -> TraceWriter:
+    """Writer partagé par log_jsonl (fermé et vidé à la sortie du process)."""
+    global _trace_writer
+    with _trace_writer_lock:
+        if _trace_writer is None:
+            _trace_writer = TraceWriter(batch_size=64, flush_interval=0.5)
+            atexit.register(_trace_writer.close)
+        return _trace_writer
+
+def flush_traces() -> None:
+    """Force l'écriture des logs JSONL en attente."""
+    if _trace_writer is not None:
+        _trace_writer.flush()
 
 def ensure_dirs(base_dir: Path) -> None:
     """Crée les répertoires nécessaires."""
@@ -20,20 +129,18 @@ def ensure_dirs(base_dir: Path) -> None:
     (traces_dir / "last_run").mkdir(parents=True, exist_ok=True)
 
 def log_jsonl(base_dir: Path, name: str, obj: Dict[str, Any]) -> None:
-    """Ajoute une entrée dans un log JSONL."""
-    ensure_dirs(base_dir)
+    """Ajoute une entrée dans un log JSONL (écriture bufferisée, voir TraceWriter)."""
     path = base_dir / "traces" / f"{name}.jsonl"
     obj = dict(obj)
     obj.setdefault("ts", time.time())
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    get_trace_writer().write(path, obj)
 
 def save_artifact(base_dir: Path, filename: str, data: Any) -> Path:
     """Sauvegarde un artifact JSON."""
     ensure_dirs(base_dir)
     out = base_dir / "traces" / "last_run" / filename
     with open(out, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write(dumps_pretty(data))
     return out
 
 def read_artifact(base_dir: Path, filename: str) -> Optional[Dict[str, Any]]:
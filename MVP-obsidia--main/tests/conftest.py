@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# app.database crée la base à l'import : jamais data/obsidia.db pendant les tests
+os.environ.setdefault("OBSIDIA_DB_PATH", str(Path(tempfile.mkdtemp(prefix="obsidia-tests-")) / "obsidia.db"))
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+
+from src.domains_data import (
+    DOMAIN_CONFIGS,
+    _linear_recurrence,
+    domain_rngs,
+    domain_series_params,
+    generate_domain_specific_data,
+)
+
+
+def _loop(noise, a, x0):
+    out, x = np.empty_like(noise), np.full(noise.shape[1:], x0)
+    for i in range(len(noise)):
+        x = a * x + noise[i]
+        out[i] = x
+    return out
+
+
+def test_recurrence_matches_loop():
+    noise = np.random.default_rng(0).standard_normal((3000, 2)) * 5.0
+    for trend in (0.0, 0.01, 0.05, -0.02):
+        ref = _loop(noise, 1.0 + trend, 100.0)
+        out = _linear_recurrence(noise, 1.0 + trend, 100.0)
+        assert np.allclose(out, ref, rtol=1e-10, atol=1e-9)
+    assert _linear_recurrence(np.empty((0, 1)), 1.03, 1.0).shape == (0, 1)
+
+
+def test_paths_follow_the_domain_streams():
+    p = domain_series_params("Factory-Control (Industriel)")
+    df = generate_domain_specific_data("Factory-Control (Industriel)", seed=3)
+    assert list(df.columns) == ["timestamp", "close"] and len(df) == p["n_points"] == 150
+    z = domain_rngs("Factory-Control (Industriel)", 3)[0].standard_normal(150)
+    ref = np.maximum(_loop((p["volatility"] * z)[:, None], 1.0 + p["trend"], p["base"])[:, 0], 0.01)
+    assert np.allclose(df["close"], ref, rtol=1e-12)
+
+
+def test_reproducible_and_global_rng_untouched():
+    np.random.seed(123)
+    before = np.random.get_state()[1].copy()
+    a = generate_domain_specific_data("Trading (ERC-8004)", seed=7)
+    b = generate_domain_specific_data("Trading (ERC-8004)", seed=7)
+    assert np.array_equal(np.random.get_state()[1], before)
+    assert a.equals(b)
+    assert not a["close"].equals(generate_domain_specific_data("Trading (ERC-8004)", seed=8)["close"])
+    # même paramètres, autre domaine : autre flux
+    assert not a["close"].equals(generate_domain_specific_data("Bank-Robo", seed=7)["close"])
+
+
+def test_lengths_and_assets():
+    short = generate_domain_specific_data("Medical-AI (Santé)", seed=1)
+    long = generate_domain_specific_data("Medical-AI (Santé)", seed=1, n_points=5000, assets=["A", "B", "C"])
+    assert len(long) == 5000 and list(long.columns) == ["timestamp", "close", "close_A", "close_B", "close_C"]
+    assert np.array_equal(long["close"][:100], short["close"])  # préfixe stable, close = premier actif
+    assert np.array_equal(long["close"], long["close_A"])
+    assert not np.array_equal(long["close_A"], long["close_B"])
+    assert (long[["close_A", "close_B", "close_C"]] >= 0.01).all().all()
+    for domain in DOMAIN_CONFIGS:
+        assert len(generate_domain_specific_data(domain, seed=2, n_points=0)) == 0
+
+
+def test_parallel_sessions_are_reproducible():
+    expected = {s: generate_domain_specific_data("Auto-Drive (Véhicules)", seed=s)["close"].to_numpy() for s in range(8)}
+    results = {}
+
+    def work(s):
+        for _ in range(20):
+            results.setdefault(s, []).append(
+                generate_domain_specific_data("Auto-Drive (Véhicules)", seed=s)["close"].to_numpy())
+
+    threads = [threading.Thread(target=work, args=(s,)) for s in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(np.array_equal(r, expected[s]) for s, rs in results.items() for r in rs)
@@ -0,0 +1,59 @@
+import re
+
+from app import database as db
+
+# Requêtes chaudes : jamais de parcours complet d'une table (SCAN sans index)
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def _traced_selects(fn, *args):
+    conn = db.get_connection()
+    sql = []
+    conn.set_trace_callback(sql.append)
+    try:
+        fn(*args)
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in sql if s.lstrip().upper().startswith("SELECT")]
+
+
+def _plan(sql):
+    rows = db.get_connection().execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    return [r[3] for r in rows]
+
+
+def test_schema_is_migrated():
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+    assert db.migrate(conn) == len(db.MIGRATIONS)
+
+
+def test_hot_queries_use_indexes():
+    db.create_run("plan-run", 1, "trading", 1, 1.0)
+    db.create_notification(1, "plan-run", "decision", "msg")
+    hot = [
+        (db.get_run, "plan-run"),
+        (db.get_user_runs, 1),
+        (db.get_all_runs, 10),
+        (db.get_features, "plan-run"),
+        (db.get_simulation, "plan-run"),
+        (db.get_decision, "plan-run"),
+        (db.get_intent, "plan-run"),
+        (db.get_notifications, 1, True),
+        (db.get_notifications, 1, False),
+        (db.get_unread_count, 1),
+        (db.get_statistics,),
+    ]
+    checked = 0
+    for fn, *args in hot:
+        for sql in _traced_selects(fn, *args):
+            plan = _plan(sql)
+            scans = [d for d in plan if FULL_SCAN.match(d)]
+            assert not scans, f"{fn.__name__}: {sql.strip()} -> {plan}"
+            checked += 1
+    assert checked >= len(hot)
+
+
+def test_runs_today_range_is_searched():
+    plan = _plan("SELECT COUNT(*) FROM runs WHERE started_at >= date('now') AND started_at < date('now', '+1 day')")
+    assert any(d.startswith("SEARCH runs USING") and "started_at" in d for d in plan), plan
@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from app import database as db
+
+GATES = {"gate1": {"ok": True, "reason": "ok"}, "gate2": {"ok": True, "reason": "ok"},
+         "gate3": {"ok": False, "reason": "dd"}, "decision": "BLOCK", "reason": "gate3"}
+
+
+def _recorder(run_id):
+    rec = db.RunRecorder(run_id, 1, "trading", 42, 10.0)
+    rec.features({"volatility": 0.01, "coherence": 0.7, "friction": 0.1, "regime": "calme"})
+    rec.simulation({"mu": 0.002, "sigma": 0.03, "verdict": "OK", "n_sims": 200, "horizon": 20})
+    rec.decision(GATES).intent({"asset": "BTC", "side": "BUY", "amount": 0.1, "metadata": {"s": 1}})
+    return rec.complete("BLOCK")
+
+
+def test_recorder_matches_individual_saves():
+    assert _recorder("uow-1").commit()
+
+    db.create_run("uow-2", 1, "trading", 42, 10.0)
+    db.save_features("uow-2", {"volatility": 0.01, "coherence": 0.7, "friction": 0.1, "regime": "calme"})
+    db.save_simulation("uow-2", {"mu": 0.002, "sigma": 0.03, "verdict": "OK", "n_sims": 200, "horizon": 20})
+    db.save_decision("uow-2", GATES)
+    db.save_intent("uow-2", {"asset": "BTC", "side": "BUY", "amount": 0.1, "metadata": {"s": 1}})
+    db.complete_run("uow-2", "BLOCK")
+
+    for getter in (db.get_features, db.get_simulation, db.get_decision, db.get_intent):
+        a, b = getter("uow-1"), getter("uow-2")
+        a.pop("computed_at", None), a.pop("decided_at", None), a.pop("created_at", None)
+        b.pop("computed_at", None), b.pop("decided_at", None), b.pop("created_at", None)
+        assert a == b
+    run = db.get_run("uow-1")
+    assert run["status"] == "completed" and run["final_decision"] == "BLOCK" and run["completed_at"]
+
+
+def test_duplicate_run_is_rolled_back():
+    assert _recorder("uow-dup").commit()
+    assert not _recorder("uow-dup").commit()
+    n = db.get_connection().execute("SELECT COUNT(*) FROM features WHERE run_id = 'uow-dup'").fetchone()[0]
+    assert n == 1
+
+
+def test_bulk_import_is_all_or_nothing():
+    assert db.import_runs(_recorder(f"bulk-{i}") for i in range(50)) == 50
+    assert db.get_run("bulk-49")["status"] == "completed"
+    with pytest.raises(sqlite3.IntegrityError):
+        db.import_runs([_recorder("bulk-new"), _recorder("bulk-0")])
+    assert db.get_run("bulk-new") is None
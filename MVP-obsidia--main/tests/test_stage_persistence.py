@@ -0,0 +1,25 @@
+from app import database as db
+
+FEATURES = {"volatility": 0.01, "coherence": 0.7, "friction": 0.1, "regime": "calme"}
+
+
+def _count(table, run_id):
+    return db.get_connection().execute(f"SELECT COUNT(*) FROM {table} WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+
+def test_same_content_is_written_once():
+    db.create_run("stage-1", 1, "trading", 1, 1.0)
+    assert db.persist_stage("stage-1", "features", FEATURES)
+    assert not db.persist_stage("stage-1", "features", dict(reversed(list(FEATURES.items()))))
+    assert _count("features", "stage-1") == 1
+    assert db.get_features("stage-1")["regime"] == "calme"
+
+
+def test_changed_content_or_other_stage_is_written():
+    db.create_run("stage-2", 1, "trading", 1, 1.0)
+    assert db.persist_stage("stage-2", "features", FEATURES)
+    assert db.persist_stage("stage-2", "features", {**FEATURES, "coherence": 0.9})
+    assert db.persist_stage("stage-2", "simulation", {"mu": 0.1, "verdict": "OK"})
+    assert db.persist_stage("stage-3", "features", FEATURES)
+    assert _count("features", "stage-2") == 2
+    assert _count("simulations", "stage-2") == 1
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from src.utils import TraceWriter
+
+
+def _lines(p):
+    return [json.loads(l) for l in p.read_text(encoding="utf-8").splitlines()] if p.exists() else []
+
+
+def test_write_racing_close_is_kept_or_rejected(tmp_path):
+    p = tmp_path / "decision_log.jsonl"
+    w = TraceWriter(flush_interval=0)
+    w.write(p, {"i": 0})
+    real_flush, accepted = w._flush, [0]
+
+    def flush_then_write(fsync):
+        real_flush(fsync)
+        try:  # écriture d'un autre thread juste après le flush final
+            w.write(p, {"i": 1})
+            accepted.append(1)
+        except ValueError:
+            pass
+
+    w._flush = flush_then_write
+    w.close()
+    assert [r["i"] for r in _lines(p)] == accepted
+    w.close()
+    with pytest.raises(ValueError):
+        w.write(p, {"i": 2})